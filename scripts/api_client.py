@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+import io
+import os
+import ssl
+import random
+import json
+import time
+import base64
+import threading
+import http.client
+from urllib.parse import urlsplit
+
+import metrics
+
+# Shared HTTP layer for the image generator scripts: one keep-alive connection pool
+# (so TLS setup is paid once per connection, not once per image), per-host
+# connection limits, request/response hooks, and the error/retry vocabulary.
+
+API_BASE = "https://api.openai.com"
+IMAGES_PATH = "/v1/images/generations"
+# Longest wait between attempts, whatever a Retry-After asks for: a server that wants
+# minutes is better treated as a failed attempt than as a stalled worker
+MAX_BACKOFF_S = 60.0
+
+
+class APIError(RuntimeError):
+    def __init__(self, message: str, status: int = 0, retry_after: float = None):
+        super().__init__(f"HTTP {status}: {message}" if status else message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+def is_retryable(err: Exception) -> bool:
+    # Transport errors, timeouts, rate limits and server errors are worth retrying;
+    # other 4xx (bad prompt, bad key, content policy) will fail the same way again.
+    if isinstance(err, APIError) and err.status:
+        return err.status in (408, 409, 429) or err.status >= 500
+    return True
+
+
+def parse_retry_after(value) -> float:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        from email.utils import parsedate_to_datetime
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by all workers: `rate` tokens/s, up to `burst` banked."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.capacity = max(1, int(burst))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class B64JsonStreamDecoder:
+    """Incrementally pulls every "b64_json" string out of a JSON response body.
+
+    Each image is base64-decoded straight into the writable returned by
+    `sink_factory(index)` as bytes arrive, so the multi-megabyte base64 text is
+    never held in memory as one string.
+    """
+
+    KEY = b'"b64_json"'
+
+    def __init__(self, sink_factory):
+        self.sink_factory = sink_factory
+        self.state = "seek"
+        self.carry = b""
+        self.pending = b""
+        self.sink = None
+        self.count = 0
+
+    def feed(self, chunk: bytes):
+        data = self.carry + chunk
+        self.carry = b""
+        i = 0
+        while i < len(data):
+            if self.state == "seek":
+                j = data.find(self.KEY, i)
+                if j < 0:
+                    self.carry = data[max(i, len(data) - len(self.KEY) + 1):]
+                    return
+                i = j + len(self.KEY)
+                self.state = "colon"
+            elif self.state == "colon":
+                c = data[i:i + 1]
+                i += 1
+                if c in b' \t\r\n:':
+                    continue
+                if c != b'"':
+                    raise APIError("malformed b64_json value in response")
+                self.sink = self.sink_factory(self.count)
+                self.count += 1
+                self.state = "value"
+            else:
+                j = data.find(b'"', i)
+                end = len(data) if j < 0 else j
+                if j < 0 and data.endswith(b'\\'):
+                    # Keep a split escape sequence for the next chunk
+                    end -= 1
+                    self.carry = b'\\'
+                segment = data[i:end]
+                if b'\\' in segment:
+                    segment = segment.replace(b'\\/', b'/').replace(b'\\n', b'').replace(b'\\r', b'')
+                self._decode(segment, final=j >= 0)
+                if j < 0:
+                    return
+                i = j + 1
+                self.state = "seek"
+
+    def _decode(self, segment: bytes, final: bool):
+        self.pending += segment
+        n = len(self.pending) if final else len(self.pending) // 4 * 4
+        if n:
+            self.sink.write(base64.b64decode(self.pending[:n]))
+            self.pending = self.pending[n:]
+        if final:
+            self.sink = None
+
+    @property
+    def completed(self) -> int:
+        # Images fully decoded so far (the last one may still be streaming)
+        return self.count - (1 if self.state == "value" else 0)
+
+    def close(self):
+        if self.state != "seek":
+            raise APIError("response ended inside an image payload")
+
+
+class ConnectionPool:
+    """Keep-alive `http.client` connections, at most `max_per_host` open per host."""
+
+    def __init__(self, max_per_host: int = 4, timeout_s: float = 180, max_idle_s: float = 60):
+        self.max_per_host = max(1, int(max_per_host))
+        self.timeout_s = timeout_s
+        self.max_idle_s = max_idle_s
+        self._idle = {}
+        self._slots = {}
+        self._lock = threading.Lock()
+
+    def _slot(self, key):
+        with self._lock:
+            if key not in self._slots:
+                self._slots[key] = threading.BoundedSemaphore(self.max_per_host)
+            return self._slots[key]
+
+    def acquire(self, key, timeout_s: float = None):
+        # Returns (connection, reused); blocks while the host is at its connection limit
+        if not self._slot(key).acquire(timeout=self.timeout_s if timeout_s is None else timeout_s):
+            raise TimeoutError(f"no free connection to {key[1]}:{key[2]}")
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                conn, last_used = idle.pop()
+                if now - last_used < self.max_idle_s:
+                    return conn, True
+                conn.close()
+        scheme, host, port = key
+        timeout = self.timeout_s if timeout_s is None else timeout_s
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(host, port, timeout=timeout, context=ssl.create_default_context())
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        return conn, False
+
+    def release(self, key, conn, reusable: bool):
+        if reusable:
+            with self._lock:
+                self._idle.setdefault(key, []).append((conn, time.monotonic()))
+        else:
+            conn.close()
+        self._slot(key).release()
+
+    def close(self):
+        with self._lock:
+            for idle in self._idle.values():
+                for conn, _ in idle:
+                    conn.close()
+            self._idle.clear()
+
+
+class HTTPClient:
+    """JSON-over-HTTP client on a shared ConnectionPool.
+
+    `base_url` replaces scheme/host/port for relative paths, so the same code can
+    target a local stand-in server. Hooks are plain callables appended to
+    `on_request` / `on_response`; each receives a dict describing the exchange.
+    """
+
+    def __init__(self, base_url: str = API_BASE, user_agent: str = "recyclehole-asset-gen/1.0", pool: ConnectionPool = None, max_per_host: int = 4, timeout_s: float = 180):
+        self.base_url = base_url.rstrip("/")
+        self.user_agent = user_agent
+        self.timeout_s = timeout_s
+        self.pool = pool or ConnectionPool(max_per_host=max_per_host, timeout_s=timeout_s)
+        self.on_request = []
+        self.on_response = []
+
+    def _emit(self, hooks, info: dict):
+        for hook in hooks:
+            hook(info)
+
+    def _target(self, path_or_url: str):
+        url = path_or_url if "://" in path_or_url else self.base_url + path_or_url
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        return url, (parts.scheme, parts.hostname, port), path
+
+    def post(self, path_or_url: str, payload: dict, headers: dict = None, consume=None, timeout_s: float = None):
+        # POSTs JSON; on 2xx hands the open response to consume(resp) and returns its result.
+        # Non-2xx responses raise APIError carrying the status, message and Retry-After.
+        url, key, path = self._target(path_or_url)
+        body = json.dumps(payload).encode("utf-8")
+        hdrs = {"Content-Type": "application/json", "User-Agent": self.user_agent, "Connection": "keep-alive"}
+        hdrs.update(headers or {})
+        info = {"method": "POST", "url": url, "bytes_out": len(body)}
+        self._emit(self.on_request, info)
+        start = time.perf_counter()
+        for attempt in (0, 1):
+            conn, reused = self.pool.acquire(key, timeout_s)
+            reusable = False
+            try:
+                conn.timeout = self.timeout_s if timeout_s is None else timeout_s
+                if conn.sock is not None:
+                    conn.sock.settimeout(conn.timeout)
+                try:
+                    conn.request("POST", path, body=body, headers=hdrs)
+                    resp = conn.getresponse()
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    # The server dropped an idle keep-alive connection; try once on a fresh one
+                    if reused and attempt == 0:
+                        conn.close()
+                        continue
+                    raise
+                info["status"] = resp.status
+                if 200 <= resp.status < 300:
+                    counted = _CountingReader(resp)
+                    result = consume(counted) if consume else json.loads(counted.read())
+                    counted.read()
+                else:
+                    counted = _CountingReader(resp)
+                    raw = counted.read()
+                    message = resp.reason
+                    try:
+                        message = json.loads(raw.decode("utf-8", errors="ignore")).get("error", {}).get("message", message)
+                    except Exception:
+                        pass
+                    result = APIError(str(message), status=resp.status, retry_after=parse_retry_after(resp.getheader("Retry-After")))
+                reusable = not resp.will_close
+                info["bytes_in"] = counted.count
+                break
+            except Exception as e:
+                info["error"] = repr(e)
+                raise
+            finally:
+                info["elapsed_s"] = time.perf_counter() - start
+                if "status" in info or "error" in info:
+                    self._emit(self.on_response, info)
+                self.pool.release(key, conn, reusable)
+        if isinstance(result, APIError):
+            raise result
+        return result
+
+    def post_json(self, path_or_url: str, payload: dict, headers: dict = None, timeout_s: float = None) -> dict:
+        return self.post(path_or_url, payload, headers, timeout_s=timeout_s)
+
+    def post_stream(self, path_or_url: str, payload: dict, headers: dict, decoder, timeout_s: float = None, chunk_size: int = 1 << 16) -> int:
+        # Feeds the response body to `decoder` chunk by chunk; returns bytes read
+        def consume(resp):
+            total = 0
+            while True:
+                chunk = resp.read(chunk_size)
+                if not chunk:
+                    return total
+                total += len(chunk)
+                decoder.feed(chunk)
+
+        total = self.post(path_or_url, payload, headers, consume=consume, timeout_s=timeout_s)
+        decoder.close()
+        return total
+
+    def close(self):
+        self.pool.close()
+
+
+class _CountingReader:
+    def __init__(self, resp):
+        self.resp = resp
+        self.count = 0
+
+    def read(self, n: int = -1) -> bytes:
+        data = self.resp.read() if n is None or n < 0 else self.resp.read(n)
+        self.count += len(data)
+        return data
+
+
+def request_images(client: HTTPClient, payload: dict, count: int, headers: dict, retries: int = 2, sleep_ms: int = 0, limiter: TokenBucket = None, log=print, label: str = "", timeout_s: float = None):
+    # Asks for `count` images of one prompt, n>1 at a time. Short or failed responses keep
+    # whatever images were fully decoded and retry only for the remainder. Returns
+    # (list of image bytes, last error); the list is shorter than `count` on failure.
+    images = []
+    last_err = None
+    for attempt in range(retries + 1):
+        want = count - len(images)
+        if want <= 0:
+            break
+        if sleep_ms > 0 and attempt == 0:
+            time.sleep(sleep_ms / 1000.0)
+        elif attempt > 0:
+            backoff = getattr(last_err, "retry_after", None)
+            if backoff is None:
+                # exponential backoff with jitter
+                backoff = (2 ** (attempt - 1)) + random.random()
+            backoff = min(backoff, MAX_BACKOFF_S)
+            with metrics.stage("backoff"):
+                time.sleep(backoff)
+        if limiter is not None:
+            limiter.acquire()
+        bufs = []
+        decoder = B64JsonStreamDecoder(lambda i: bufs.append(io.BytesIO()) or bufs[-1])
+        fatal = False
+        try:
+            with metrics.stage("image_request"):
+                client.post_stream(IMAGES_PATH, dict(payload, n=want), headers, decoder, timeout_s=timeout_s)
+            if len(bufs) < want:
+                raise APIError(f"response contained {len(bufs)} of {want} images")
+            metrics.inc("image_requests_total", outcome="ok")
+            if attempt > 0:
+                metrics.inc("image_retries_total", outcome="ok")
+        except Exception as e:
+            last_err = e
+            fatal = not is_retryable(e)
+            metrics.inc("image_requests_total", outcome="fatal" if fatal else "retryable")
+            if attempt > 0:
+                metrics.inc("image_retries_total", outcome="fatal" if fatal else "retryable")
+            log(f"ERR ({attempt+1}/{retries+1}) {label}: {e}")
+        images.extend(b.getvalue() for b in bufs[:min(decoder.completed, want)])
+        if fatal:
+            break
+    return images, last_err
+
+
+def http_post_json(url: str, payload: dict, headers: dict, timeout_s: int = 180, client: HTTPClient = None) -> dict:
+    with metrics.stage("http_post_json"):
+        return (client or metrics.instrument_client(HTTPClient(timeout_s=timeout_s))).post_json(url, payload, headers, timeout_s=timeout_s)
+
+
+def add_client_args(parser):
+    parser.add_argument("--api-base", default=os.environ.get("OPENAI_BASE_URL", API_BASE), help="API base URL, e.g. a local stand-in server; a trailing /v1 is ignored (default: $OPENAI_BASE_URL or https://api.openai.com)")
+    parser.add_argument("--max-connections", type=int, default=0, help="Max keep-alive connections per host (default: 0 = one per worker)")
+
+
+def api_root(base_url: str) -> str:
+    # OPENAI_BASE_URL follows the SDK convention of ending in /v1; IMAGES_PATH carries its
+    # own /v1, so drop it rather than request /v1/v1/images/generations
+    base_url = base_url.rstrip("/")
+    return base_url[:-3] if base_url.endswith("/v1") else base_url
+
+
+def client_from_args(args, user_agent: str = "recyclehole-asset-gen/1.0") -> HTTPClient:
+    max_per_host = args.max_connections or max(1, getattr(args, "concurrency", 1))
+    return metrics.instrument_client(HTTPClient(base_url=api_root(args.api_base), user_agent=user_agent, max_per_host=max_per_host, timeout_s=args.timeout))
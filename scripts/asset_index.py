@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+from pathlib import Path
+
+from asset_refs import DEFAULT_SOURCES, source_files, literals, resolve
+
+# Persistent index of everything under assets/ plus the asset paths the game sources
+# reference, so tools ask one query instead of walking the tree and reopening images.
+#
+# update() stats every file but only re-reads (hash, dimensions, alpha) those whose
+# size or mtime changed, and only re-scans source files that changed. Dimensions and
+# alpha need Pillow; without it those columns stay NULL.
+#
+#   files   path (web path), ext, size, mtime_ns, hash (sha256 hex), format, width,
+#           height, alpha_coverage (share of pixels with alpha > 0; NULL = no alpha)
+#   sources path, size, mtime_ns                 game sources last scanned
+#   refs    source, ref                          literals found in each source
+#   targets ref, path                            files each literal resolves to
+
+DEFAULT_DB = ".cache/assets.sqlite"
+IMAGE_FORMATS = {".png": "png", ".webp": "webp", ".jpg": "jpeg", ".jpeg": "jpeg"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    format TEXT,
+    width INTEGER,
+    height INTEGER,
+    alpha_coverage REAL
+);
+CREATE INDEX IF NOT EXISTS files_ext ON files(ext);
+CREATE TABLE IF NOT EXISTS sources (path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS refs (source TEXT NOT NULL, ref TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS refs_source ON refs(source);
+CREATE TABLE IF NOT EXISTS targets (ref TEXT NOT NULL, path TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS targets_ref ON targets(ref);
+CREATE INDEX IF NOT EXISTS targets_path ON targets(path);
+"""
+
+
+def file_hash(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def image_info(path: Path):
+    # (width, height, alpha coverage or None); all None when Pillow is missing or the
+    # file does not decode
+    try:
+        from PIL import Image
+        with Image.open(path) as im:
+            w, h = im.size
+            if "A" not in im.getbands() and "transparency" not in im.info:
+                return w, h, None
+            hist = im.convert("RGBA").getchannel("A").histogram()
+            return w, h, 1 - hist[0] / (w * h)
+    except Exception:
+        return None, None, None
+
+
+class AssetIndex:
+    def __init__(self, web_root=".", db_path: str = None):
+        self.web_root = Path(web_root)
+        self.db_path = Path(db_path) if db_path else self.web_root / DEFAULT_DB
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.db_path, timeout=30)
+        self.db.row_factory = sqlite3.Row
+        # WAL lets one tool read while another updates
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def web_path(self, path: Path) -> str:
+        return Path(os.path.relpath(path, self.web_root)).as_posix()
+
+    def update(self, assets_dir: str = "assets", sources=DEFAULT_SOURCES) -> dict:
+        stats = {"files": 0, "changed": 0, "removed": 0, "sources": 0, "rescanned": 0}
+        known = {r["path"]: (r["size"], r["mtime_ns"]) for r in self.db.execute("SELECT path, size, mtime_ns FROM files")}
+        seen = set()
+        with self.db:
+            for dirpath, dirnames, filenames in os.walk(self.web_root / assets_dir):
+                dirnames.sort()
+                for name in sorted(filenames):
+                    if name.endswith((".part", ".tmp")):
+                        continue
+                    full = Path(dirpath) / name
+                    try:
+                        st = full.stat()
+                    except FileNotFoundError:
+                        continue
+                    path = self.web_path(full)
+                    seen.add(path)
+                    stats["files"] += 1
+                    if known.get(path) == (st.st_size, st.st_mtime_ns):
+                        continue
+                    ext = full.suffix.lower()
+                    w = h = coverage = None
+                    if ext in IMAGE_FORMATS:
+                        w, h, coverage = image_info(full)
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (path, ext, st.st_size, st.st_mtime_ns, file_hash(full), IMAGE_FORMATS.get(ext), w, h, coverage),
+                    )
+                    stats["changed"] += 1
+            gone = [p for p in known if p not in seen and p.startswith(assets_dir.rstrip("/") + "/")]
+            self.db.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in gone])
+            stats["removed"] = len(gone)
+
+            scanned = {r["path"]: (r["size"], r["mtime_ns"]) for r in self.db.execute("SELECT path, size, mtime_ns FROM sources")}
+            current = set()
+            for f in source_files(self.web_root, sources):
+                st = f.stat()
+                path = self.web_path(f)
+                current.add(path)
+                stats["sources"] += 1
+                if scanned.get(path) == (st.st_size, st.st_mtime_ns):
+                    continue
+                self.db.execute("DELETE FROM refs WHERE source = ?", (path,))
+                self.db.executemany("INSERT INTO refs VALUES (?, ?)", [(path, ref) for ref in sorted(set(literals(f.read_text(errors="replace"))))])
+                self.db.execute("INSERT OR REPLACE INTO sources VALUES (?, ?, ?)", (path, st.st_size, st.st_mtime_ns))
+                stats["rescanned"] += 1
+            # Sources outside the default set (e.g. a pack built from --sources) stay
+            # indexed until the file itself goes away
+            for path in set(scanned) - current:
+                if (self.web_root / path).is_file():
+                    continue
+                self.db.execute("DELETE FROM sources WHERE path = ?", (path,))
+                self.db.execute("DELETE FROM refs WHERE source = ?", (path,))
+
+            # Resolution depends on which files exist, so it is redone against the
+            # indexed file list every time; there are only a few dozen distinct literals
+            files = {r["path"] for r in self.db.execute("SELECT path FROM files")}
+            self.db.execute("DELETE FROM targets")
+            for (ref,) in self.db.execute("SELECT DISTINCT ref FROM refs").fetchall():
+                self.db.executemany("INSERT INTO targets VALUES (?, ?)", [(ref, p) for p in resolve(ref, self.web_root, files)])
+        return stats
+
+    # Queries. Paths are web paths ("assets/tiles/grass_0.webp").
+
+    def get(self, path: str):
+        return self.db.execute("SELECT * FROM files WHERE path = ?", (path,)).fetchone()
+
+    def files(self, prefix: str = "assets/", exts=None) -> list:
+        sql = "SELECT * FROM files WHERE path >= ? AND path < ?"
+        args = [prefix, prefix + "￿"]
+        if exts:
+            sql += f" AND ext IN ({','.join('?' * len(exts))})"
+            args += list(exts)
+        return self.db.execute(sql + " ORDER BY path", args).fetchall()
+
+    def path(self, row) -> Path:
+        return self.web_root / row["path"]
+
+    def _from(self, sources):
+        # SQL condition limiting refs r to the given source files/folders
+        if not sources:
+            return "1", []
+        cond = " OR ".join("r.source = ? OR r.source LIKE ?" for _ in sources)
+        return f"({cond})", [a for s in sources for a in (s.strip("/"), s.strip("/") + "/%")]
+
+    def referenced(self, sources=None) -> list:
+        # Files the game sources point at; `sources` limits to refs from those paths
+        cond, args = self._from(sources)
+        sql = f"SELECT DISTINCT t.path FROM targets t JOIN refs r ON r.ref = t.ref WHERE {cond} ORDER BY t.path"
+        return [r["path"] for r in self.db.execute(sql, args)]
+
+    def missing(self, sources=None) -> dict:
+        # {literal: [sources]} for references that match no indexed file
+        cond, args = self._from(sources)
+        sql = f"SELECT r.ref, r.source FROM refs r LEFT JOIN targets t ON t.ref = r.ref WHERE t.ref IS NULL AND {cond} ORDER BY r.ref, r.source"
+        out = {}
+        for r in self.db.execute(sql, args):
+            if r["source"] not in out.setdefault(r["ref"], []):
+                out[r["ref"]].append(r["source"])
+        return out
+
+    def unreferenced(self, prefix: str = "assets/", exts=None) -> list:
+        sql = "SELECT f.* FROM files f LEFT JOIN targets t ON t.path = f.path WHERE t.path IS NULL AND f.path >= ? AND f.path < ?"
+        args = [prefix, prefix + "￿"]
+        if exts:
+            sql += f" AND f.ext IN ({','.join('?' * len(exts))})"
+            args += list(exts)
+        return self.db.execute(sql + " ORDER BY f.path", args).fetchall()
+
+    def referrers(self, path: str) -> list:
+        return [r["source"] for r in self.db.execute("SELECT DISTINCT r.source FROM targets t JOIN refs r ON r.ref = t.ref WHERE t.path = ? ORDER BY r.source", (path,))]
+
+
+def open_index(web_root=".", db_path: str = None, assets_dir: str = "assets") -> AssetIndex:
+    # The usual entry point for tools: an index brought up to date with the tree
+    index = AssetIndex(web_root, db_path)
+    index.update(assets_dir)
+    return index
+
+
+def add_index_args(parser: argparse.ArgumentParser):
+    parser.add_argument("--index-db", help=f"Asset index database (default: <web root>/{DEFAULT_DB})")
+
+
+def index_from_args(args, assets_dir: Path) -> AssetIndex:
+    # Tools take --assets-dir; the web root is its parent
+    assets_dir = Path(assets_dir)
+    return open_index(assets_dir.parent, args.index_db, assets_dir.name)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Maintain and query the SQLite index of assets/ and their references.")
+    ap.add_argument("--root", default=".", help="Web root holding index.html and assets/ (default: .)")
+    ap.add_argument("--db", help=f"Database file (default: <root>/{DEFAULT_DB})")
+    ap.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    sub = ap.add_subparsers(dest="cmd")
+    sub.add_parser("update", help="Bring the index up to date (default)")
+    sub.add_parser("stats", help="Counts and bytes by file type")
+    q = sub.add_parser("list", help="Indexed files under a prefix")
+    q.add_argument("prefix", nargs="?", default="assets/", help="Web path prefix (default: assets/)")
+    q.add_argument("--ext", help="Comma-separated extensions, e.g. .webp,.png")
+    u = sub.add_parser("unreferenced", help="Files no game source points at")
+    u.add_argument("--ext", default=".webp,.png,.jpg,.jpeg,.wav", help="Comma-separated extensions (default: .webp,.png,.jpg,.jpeg,.wav)")
+    sub.add_parser("missing", help="References that match no file")
+    w = sub.add_parser("who", help="Sources referencing a file")
+    w.add_argument("path", help="Web path of the asset")
+
+    argv = sys.argv[1:]
+    if not any(a in sub.choices for a in argv):
+        argv = argv + ["update"]
+    args = ap.parse_args(argv)
+
+    start = time.perf_counter()
+    index = AssetIndex(args.root, args.db)
+    stats = index.update()
+    took = time.perf_counter() - start
+    exts = lambda s: [e if e.startswith(".") else "." + e for e in s.split(",") if e] if s else None
+    out = None
+    if args.cmd == "update":
+        out = dict(stats, seconds=round(took, 3), db=str(index.db_path))
+        if not args.json:
+            print(f"Indexed {stats['files']} files ({stats['changed']} changed, {stats['removed']} removed), {stats['sources']} sources ({stats['rescanned']} rescanned) in {took:.2f}s -> {index.db_path}")
+    elif args.cmd == "stats":
+        rows = index.db.execute("SELECT ext, COUNT(*) AS n, SUM(size) AS bytes FROM files GROUP BY ext ORDER BY bytes DESC").fetchall()
+        out = {r["ext"]: {"count": r["n"], "bytes": r["bytes"]} for r in rows}
+        if not args.json:
+            for ext, v in out.items():
+                print(f"{ext or '(none)':<8} {v['count']:>5} files {v['bytes']:>11} bytes")
+    elif args.cmd in ("list", "unreferenced"):
+        rows = index.files(args.prefix, exts(args.ext)) if args.cmd == "list" else index.unreferenced(exts=exts(args.ext))
+        out = [dict(r) for r in rows]
+        if not args.json:
+            for r in rows:
+                dims = f"{r['width']}x{r['height']}" if r["width"] else "-"
+                alpha = f"alpha {r['alpha_coverage']:.0%}" if r["alpha_coverage"] is not None else ""
+                print(f"{r['size']:>9} {dims:>9} {r['hash'][:12]} {r['path']} {alpha}".rstrip())
+            print(f"{len(rows)} files")
+    elif args.cmd == "missing":
+        out = index.missing()
+        if not args.json:
+            for ref, where in out.items():
+                print(f"MISSING {ref} (referenced in {', '.join(where)})")
+    elif args.cmd == "who":
+        out = index.referrers(args.path)
+        if not args.json:
+            print("\n".join(out) if out else f"{args.path} is not referenced")
+    if args.json:
+        print(json.dumps(out, indent=2))
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+import re
+import sys
+import fnmatch
+import argparse
+from pathlib import Path
+
+
+DEFAULT_SOURCES = ("index.html", "style.css", "src")
+SOURCE_EXTS = (".js", ".mjs", ".html", ".css")
+ASSET_EXTS = ("webp", "png", "jpg", "jpeg", "json", "wav", "ktx2")
+# '...', "...", `...` or url(...) literals that point under assets/
+LITERAL_RE = re.compile(r"""(['"`(])(assets/[^'"`()\s]+?\.(?:%s))\1?""" % "|".join(ASSET_EXTS))
+TEMPLATE_RE = re.compile(r"\$\{[^}]*\}")
+
+
+def source_files(root: Path, sources=DEFAULT_SOURCES) -> list:
+    files = []
+    for s in sources:
+        p = root / s
+        if p.is_file():
+            files.append(p)
+        elif p.is_dir():
+            files.extend(f for f in sorted(p.rglob("*")) if f.suffix.lower() in SOURCE_EXTS)
+    return files
+
+
+def literals(text: str) -> list:
+    return [m.group(2) for m in LITERAL_RE.finditer(text)]
+
+
+def _glob(root: Path, pattern: str, files) -> list:
+    if files is None:
+        return sorted(p.relative_to(root).as_posix() for p in root.glob(pattern) if p.is_file())
+    # Same match against a known set of web paths; "*" must not cross a "/" like glob's
+    depth = pattern.count("/")
+    return sorted(f for f in files if f.count("/") == depth and fnmatch.fnmatchcase(f, pattern))
+
+
+def resolve(ref: str, root: Path, files=None) -> list:
+    # A literal or template path -> existing files, WebP preferred over PNG the way
+    # TextureLoaderEx.loadTexOrFallback tries it. ${...} segments match as wildcards.
+    # `files` (a set of web paths, e.g. from the asset index) replaces the filesystem.
+    exists = (lambda c: (root / c).is_file()) if files is None else files.__contains__
+    if TEMPLATE_RE.search(ref):
+        pattern = TEMPLATE_RE.sub("*", ref)
+        candidates = _glob(root, pattern, files)
+        # "foo_*.png" also means its WebP siblings
+        if pattern.endswith(".png"):
+            candidates += _glob(root, pattern[:-4] + ".webp", files)
+    else:
+        candidates = [ref]
+    found = []
+    for c in candidates:
+        webp = c[:-4] + ".webp" if c.endswith(".png") else None
+        if webp and exists(webp):
+            found.append(webp)
+        elif exists(c):
+            found.append(c)
+    return found
+
+
+def scan(root: Path, sources=DEFAULT_SOURCES):
+    # Returns (sorted referenced files, {ref: [source files]} for refs that resolved to nothing)
+    refs = {}
+    for f in source_files(root, sources):
+        for ref in literals(f.read_text(errors="replace")):
+            refs.setdefault(ref, []).append(f.relative_to(root).as_posix())
+    found = set()
+    missing = {}
+    for ref, where in sorted(refs.items()):
+        hits = resolve(ref, root)
+        if hits:
+            found.update(hits)
+        else:
+            missing[ref] = sorted(set(where))
+    return sorted(found), missing
+
+
+def main():
+    ap = argparse.ArgumentParser(description="List the asset files referenced by the game sources.")
+    ap.add_argument("--root", default=".", help="Web root holding index.html and assets/ (default: .)")
+    ap.add_argument("--missing", action="store_true", help="Only report references that match no file")
+    args = ap.parse_args()
+
+    root = Path(args.root)
+    found, missing = scan(root)
+    if not args.missing:
+        for path in found:
+            print(path)
+    for ref, where in missing.items():
+        print(f"MISSING {ref} (referenced in {', '.join(where)})", file=sys.stderr if not args.missing else sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+import json
+import argparse
+from pathlib import Path
+
+
+# scripts/asset_spec.json is the one list of generated images (prompt, output path,
+# variation count, model) and of the steps that run after them. The generator scripts
+# read their prompt tables from it; scripts/build_assets.py builds all of it as a graph.
+DEFAULT_SPEC = Path(__file__).with_name("asset_spec.json")
+
+
+def load_spec(path=None) -> dict:
+    return json.loads(Path(path or DEFAULT_SPEC).read_text())
+
+
+def image_tasks(spec: dict, sets=None, counts=None) -> list:
+    # One dict per image (out = path under assets/, prompt, variation, model, size) in
+    # spec order. `sets` picks entries by their "set"; `counts` overrides "count" per set.
+    gen = spec.get("generate", {})
+    tasks = []
+    for entry in spec["images"]:
+        if sets is not None and entry["set"] not in sets:
+            continue
+        n = (counts or {}).get(entry["set"]) or entry.get("count", 1)
+        prompt = entry["prompt"].format(style=spec["style"])
+        for i in range(max(1, n) if "{i}" in entry["out"] else 1):
+            tasks.append({
+                "set": entry["set"],
+                "out": entry["out"].format(i=i),
+                "prompt": prompt,
+                "variation": i,
+                "model": entry.get("model", gen.get("model", "gpt-image-1")),
+                "size": entry.get("size", gen.get("size", "1024x1024")),
+            })
+    return tasks
+
+
+def main():
+    ap = argparse.ArgumentParser(description="List the images the asset spec describes.")
+    ap.add_argument("--spec", help=f"Spec file (default: {DEFAULT_SPEC.name} next to this script)")
+    ap.add_argument("--set", help="Comma-separated sets to list (default: all)")
+    args = ap.parse_args()
+
+    sets = [s.strip() for s in args.set.split(",") if s.strip()] if args.set else None
+    tasks = image_tasks(load_spec(args.spec), sets)
+    for t in tasks:
+        print(f"{t['set']:<10} {t['model']:<12} assets/{t['out']}")
+    print(f"{len(tasks)} images")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import random
+import argparse
+from pathlib import Path
+
+try:
+    import numpy as np
+    from PIL import Image
+except Exception as e:
+    print("NumPy and Pillow are required. Install with: pip install numpy pillow")
+    sys.exit(1)
+
+
+# Mirrors the ground section of src/modules/game.js: a GRID_SIZE x GRID_SIZE grid of
+# TILE_SIZE world units, indexed [i][j] with i along +x and j along +z.
+GRID_SIZE = 12
+TILE_SIZE = 10
+TILE_SETS = {
+    "grass": ["assets/tiles/grass_0.png", "assets/tiles/grass_1.png"],
+    "road": ["assets/tiles/asphalt_0.png", "assets/tiles/asphalt_1.png"],
+    "concrete": ["assets/tiles/concrete_0.png", "assets/tiles/concrete_1.png"],
+}
+FALLBACK_COLORS = {"grass": "#9ae66e", "road": "#666666", "concrete": "#bdbdbd"}
+DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+DEFAULT_SEEDS = "1,2,3,4,5,6,7,8"
+
+
+def plan_layout(seed: int, grid: int = GRID_SIZE, counts=None) -> dict:
+    # Same rules, in the same order, as game.js; Math.random() becomes a seeded stream.
+    # Returns the tile type and texture index per cell plus the chosen road lines.
+    rng = random.Random(seed)
+    pick = lambda n: int(rng.random() * n)
+    counts = counts or {k: len(v) for k, v in TILE_SETS.items()}
+    types = [["grass"] * grid for _ in range(grid)]
+
+    center = grid // 2
+    road_rows, road_cols = {center}, {center}
+    want_rows = 2 + pick(2)
+    want_cols = 2 + pick(2)
+    while len(road_rows) < want_rows:
+        road_rows.add(pick(grid))
+    while len(road_cols) < want_cols:
+        road_cols.add(pick(grid))
+    for i in range(grid):
+        for j in range(grid):
+            if i in road_rows or j in road_cols:
+                types[i][j] = "road"
+
+    def near(i, j, kind):
+        return any(0 <= i + di < grid and 0 <= j + dj < grid and types[i + di][j + dj] == kind for di, dj in DIRECTIONS)
+
+    # Sidewalks along roads, then a second, sparser ring off those sidewalks. The scan
+    # updates in place, so later cells see earlier conversions just like the JS loop.
+    for kind, chance in (("road", 0.6), ("concrete", 0.35)):
+        for i in range(grid):
+            for j in range(grid):
+                if types[i][j] == "grass" and near(i, j, kind) and rng.random() < chance:
+                    types[i][j] = "concrete"
+
+    index = [[-1] * grid for _ in range(grid)]
+    road_by_row, road_by_col = {}, {}
+    for i in range(grid):
+        for j in range(grid):
+            kind = types[i][j]
+            if kind == "road":
+                # Whole road lines share one texture so asphalt doesn't flicker tile to tile
+                idx = -1
+                if i in road_rows:
+                    if i not in road_by_row:
+                        road_by_row[i] = pick(counts["road"])
+                    idx = road_by_row[i]
+                elif j in road_cols:
+                    if j not in road_by_col:
+                        road_by_col[j] = pick(counts["road"])
+                    idx = road_by_col[j]
+                if idx < 0:
+                    idx = pick(counts["road"])
+                index[i][j] = idx % counts["road"]
+            elif kind == "concrete":
+                index[i][j] = pick(counts["concrete"])
+            else:
+                # Grass mostly continues a neighbor's texture to form patches
+                neighbors = []
+                if i > 0 and types[i - 1][j] == "grass" and index[i - 1][j] >= 0:
+                    neighbors.append(index[i - 1][j])
+                if j > 0 and types[i][j - 1] == "grass" and index[i][j - 1] >= 0:
+                    neighbors.append(index[i][j - 1])
+                idx = -1
+                if neighbors and rng.random() < 0.75:
+                    idx = neighbors[pick(len(neighbors))]
+                if idx < 0:
+                    idx = pick(counts["grass"])
+                index[i][j] = idx
+    return {"types": types, "index": index, "roadRows": sorted(road_rows), "roadCols": sorted(road_cols)}
+
+
+def web_path(path: Path, web_root: Path) -> str:
+    return Path(os.path.relpath(path, web_root)).as_posix()
+
+
+def resolve_tile(web_root: Path, path: str) -> Path:
+    # WebP preferred over the PNG the game references, as TextureLoaderEx does
+    png = web_root / path
+    webp = png.with_suffix(".webp")
+    if webp.exists():
+        return webp
+    return png if png.exists() else None
+
+
+def load_tile(web_root: Path, path: str, kind: str, tile_px: int) -> np.ndarray:
+    # RGB tile scaled to tile_px, decoded once per bake. Missing files get the flat
+    # fallback color the game would draw.
+    src = resolve_tile(web_root, path)
+    if src is None:
+        color = tuple(int(FALLBACK_COLORS[kind][k:k + 2], 16) for k in (1, 3, 5))
+        return np.full((tile_px, tile_px, 3), color, dtype=np.uint8)
+    with Image.open(src) as im:
+        im = im.convert("RGB")
+        if im.size != (tile_px, tile_px):
+            im = im.resize((tile_px, tile_px), Image.LANCZOS, reducing_gap=3.0)
+        return np.asarray(im)
+
+
+def composite(layout: dict, tiles: dict, tile_px: int, chunk: int, grid: int = GRID_SIZE) -> list:
+    # One RGB array per chunk x chunk block of cells. Image columns follow i (+x) and
+    # rows follow j (+z): a plane rotated -90deg about x shows its texture's top edge at -z.
+    out = []
+    for ci in range(0, grid, chunk):
+        for cj in range(0, grid, chunk):
+            ni, nj = min(chunk, grid - ci), min(chunk, grid - cj)
+            canvas = np.empty((nj * tile_px, ni * tile_px, 3), dtype=np.uint8)
+            for i in range(ni):
+                for j in range(nj):
+                    kind = layout["types"][ci + i][cj + j]
+                    tile = tiles[kind][layout["index"][ci + i][cj + j]]
+                    canvas[j * tile_px:(j + 1) * tile_px, i * tile_px:(i + 1) * tile_px] = tile
+            out.append((ci, cj, ni, nj, canvas))
+    return out
+
+
+def bake(seed: int, web_root: Path, out_dir: Path, tiles: dict, tile_px: int, chunk: int, quality: int) -> dict:
+    layout = plan_layout(seed, counts={k: len(v) for k, v in tiles.items()})
+    seed_dir = out_dir / f"seed-{seed}"
+    seed_dir.mkdir(parents=True, exist_ok=True)
+    chunks = []
+    for ci, cj, ni, nj, canvas in composite(layout, tiles, tile_px, chunk):
+        path = seed_dir / f"ground_{ci // chunk}_{cj // chunk}.webp"
+        Image.fromarray(canvas, "RGB").save(path, format="WEBP", quality=quality, method=6)
+        chunks.append({
+            "image": web_path(path, web_root),
+            # World-space center and size of the plane, in game units
+            "x": (ci + ni / 2 - GRID_SIZE / 2) * TILE_SIZE,
+            "z": (cj + nj / 2 - GRID_SIZE / 2) * TILE_SIZE,
+            "width": ni * TILE_SIZE,
+            "depth": nj * TILE_SIZE,
+            "bytes": path.stat().st_size,
+        })
+    short = {"grass": "g", "road": "r", "concrete": "c"}
+    layout_json = {
+        "version": 1,
+        "seed": seed,
+        "gridSize": GRID_SIZE,
+        "tileSize": TILE_SIZE,
+        "tilePx": tile_px,
+        "roadRows": layout["roadRows"],
+        "roadCols": layout["roadCols"],
+        # cells[i] is the column at x index i; "r1" = road texture 1
+        "cells": [[f"{short[t]}{n}" for t, n in zip(types, idx)] for types, idx in zip(layout["types"], layout["index"])],
+        "chunks": chunks,
+    }
+    (seed_dir / "layout.json").write_text(json.dumps(layout_json, indent=2) + "\n")
+    return layout_json
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Bake the ground tile grid into a few composited textures per seed.")
+    ap.add_argument("--root", default=".", help="Web root holding index.html and assets/ (default: .)")
+    ap.add_argument("--out-dir", help="Output folder (default: <root>/assets/ground)")
+    ap.add_argument("--seeds", default=DEFAULT_SEEDS, help=f"Comma-separated layout seeds to bake (default: {DEFAULT_SEEDS})")
+    ap.add_argument("--tile-px", type=int, default=256, help="Pixels per tile in the baked textures (default: 256)")
+    ap.add_argument("--chunk", type=int, default=4, help="Tiles per side of each baked texture (default: 4 = nine 1024px textures at the default --tile-px)")
+    ap.add_argument("--quality", type=int, default=85, help="WebP quality (default: 85)")
+    ap.add_argument("--print", action="store_true", help="Print each layout as a character grid")
+    args = ap.parse_args()
+
+    web_root = Path(args.root)
+    out_dir = Path(args.out_dir) if args.out_dir else web_root / "assets" / "ground"
+    seeds = [int(s) for s in args.seeds.split(",") if s.strip()]
+    chunk = max(1, min(args.chunk, GRID_SIZE))
+
+    tiles = {kind: [load_tile(web_root, p, kind, args.tile_px) for p in paths] for kind, paths in TILE_SETS.items()}
+    for kind, paths in TILE_SETS.items():
+        for p in paths:
+            if resolve_tile(web_root, p) is None:
+                print(f"MISSING {p} (baked as flat {FALLBACK_COLORS[kind]})")
+
+    layouts = []
+    for seed in seeds:
+        layout = bake(seed, web_root, out_dir, tiles, args.tile_px, chunk, args.quality)
+        size = sum(c["bytes"] for c in layout["chunks"])
+        print(f"BAKE seed {seed}: roads rows {layout['roadRows']} cols {layout['roadCols']}, {len(layout['chunks'])} textures, {size} bytes")
+        if args.print:
+            for j in range(GRID_SIZE):
+                print("  " + "".join({"g": ".", "r": "#", "c": "o"}[layout["cells"][i][j][0]] for i in range(GRID_SIZE)))
+        layouts.append(web_path(out_dir / f"seed-{seed}" / "layout.json", web_root))
+
+    index = {"version": 1, "layouts": layouts}
+    (out_dir / "ground.json").write_text(json.dumps(index, indent=2) + "\n")
+    print(f"Wrote {out_dir / 'ground.json'} ({len(layouts)} layouts)")
+
+
+if __name__ == "__main__":
+    main()
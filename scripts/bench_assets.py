@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+import io
+import os
+import sys
+import json
+import shutil
+import fnmatch
+import argparse
+import platform
+import resource
+import statistics
+import subprocess
+import tempfile
+import time
+import multiprocessing as mp
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    from PIL import Image
+except Exception as e:
+    print("Pillow is required. Install with: pip install pillow")
+    sys.exit(1)
+
+SCRIPTS = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS))
+
+from fake_image_api import cartoon_image, start_background
+
+
+RESULTS_VERSION = 1
+DEFAULT_OUT_DIR = "logs/bench"
+
+
+def make_fixtures(dest: Path, count: int, size: int) -> list:
+    # Deterministic 1024px stand-ins: even seeds are opaque tiles, odd seeds transparent sprites
+    dest.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(count):
+        p = dest / f"fixture_{i:02d}.png"
+        if not p.exists():
+            cartoon_image(i, size, transparent=i % 2 == 1).save(p, format="PNG")
+        paths.append(p)
+    return paths
+
+
+def dir_bytes(root: Path, pattern: str = "*") -> int:
+    return sum(p.stat().st_size for p in root.rglob(pattern) if p.is_file())
+
+
+def build_cases(cfg: dict) -> dict:
+    # name -> (setup(work_dir) -> state, run(state) -> (items, output bytes or None)).
+    # Only run() is timed; setup copies or decodes inputs in the same worker process.
+    fixtures = [Path(p) for p in cfg["fixtures"]]
+    cases = {}
+
+    def convert_case(quality, method, lossless):
+        def setup(work):
+            return work
+
+        def run(work):
+            from convert_assets_to_webp import convert_png_to_webp
+            for src in fixtures:
+                convert_png_to_webp(src, work / (src.stem + ".webp"), quality=quality, lossless=lossless, method=method)
+            return len(fixtures), dir_bytes(work, "*.webp")
+        return setup, run
+
+    for m in cfg["methods"]:
+        for q in cfg["qualities"]:
+            cases[f"convert/q{q}-m{m}"] = convert_case(q, m, False)
+        cases[f"convert/lossless-m{m}"] = convert_case(100, m, True)
+
+    def rescale_setup(work):
+        copies = []
+        for src in fixtures:
+            dst = work / src.name
+            shutil.copyfile(src, dst)
+            copies.append(dst)
+        return copies
+
+    def rescale_run(copies):
+        from generate_assets import try_rescale_png
+        with redirect_stdout(io.StringIO()):
+            for p in copies:
+                try_rescale_png(p, cfg["rescale"])
+        return len(copies), sum(p.stat().st_size for p in copies)
+
+    cases[f"rescale/{cfg['rescale']}"] = (rescale_setup, rescale_run)
+
+    def tiers_setup(work):
+        images = []
+        for src in fixtures:
+            with Image.open(src) as im:
+                im.load()
+                images.append((im.copy(), work / (src.stem + ".webp")))
+        return images
+
+    def tiers_run(images):
+        from convert_assets_to_webp import write_tiers
+        written = []
+        for im, base in images:
+            written += write_tiers(im, base, cfg["tiers"], quality=85, method=4)
+        return len(written), sum(p.stat().st_size for p in written)
+
+    cases["tiers/" + "-".join(str(t) for t in cfg["tiers"])] = (tiers_setup, tiers_run)
+
+    def trim_setup(work):
+        import numpy as np
+        arrays = []
+        for src in fixtures:
+            with Image.open(src) as im:
+                if "A" in im.getbands():
+                    arrays.append(np.asarray(im.convert("RGBA")))
+        return arrays
+
+    def trim_run(arrays):
+        from trim_sprites import trim_array
+        out = [trim_array(a)[0] for a in arrays]
+        return len(out), sum(a.nbytes for a in out if a is not None)
+
+    cases["trim/bleed"] = (trim_setup, trim_run)
+
+    # rescale -> WebP + tiers -> trim on the same files: once as separate tools, each
+    # decoding from disk, and once through image_pipeline.py's single decode
+    def chain_setup(work):
+        root = work / "assets"
+        copies = []
+        for i, src in enumerate(fixtures):
+            dst = root / ("tiles" if i % 2 == 0 else "trash/items") / src.name
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(src, dst)
+            copies.append(dst)
+        return root, copies
+
+    def chain_separate(state):
+        import numpy as np
+        from generate_assets import try_rescale_png
+        from convert_assets_to_webp import convert_one
+        from trim_sprites import trim_array, save_like
+        root, copies = state
+        with redirect_stdout(io.StringIO()):
+            for p in copies:
+                try_rescale_png(p, cfg["rescale"])
+                tiers = cfg["tiers"] if p.parent.name == "tiles" else ()
+                convert_one(p, 85, False, 4, False, tiers)
+                webp = p.with_suffix(".webp")
+                if p.parent.name != "tiles":
+                    with Image.open(webp) as im:
+                        trimmed = trim_array(np.asarray(im.convert("RGBA")))[0]
+                    if trimmed is not None:
+                        save_like(trimmed, webp, 85, 4)
+        return len(copies), dir_bytes(root, "*.webp")
+
+    def chain_pipeline(state):
+        from image_pipeline import parse_steps, process_file
+        root, copies = state
+        steps = parse_steps(f"rescale:{cfg['rescale']},png,trim,webp,tiers:" + "/".join(str(t) for t in cfg["tiers"]), quality=85, method=4, trim_dirs=["trash"])
+        for p in copies:
+            process_file(p, root, steps)
+        return len(copies), dir_bytes(root, "*.webp")
+
+    cases["chain/separate"] = (chain_setup, chain_separate)
+    cases["chain/pipeline"] = (chain_setup, chain_pipeline)
+
+    def generate_case(extra):
+        def setup(work):
+            return work
+
+        def run(work):
+            cmd = [sys.executable, str(SCRIPTS / "generate_assets.py"), "--out", str(work), "--api-base", cfg["api_base"],
+                   "--tile-variations", "2", "--trash-min", str(cfg["gen_variations"]), "--trash-max", str(cfg["gen_variations"]),
+                   "--no-cache", "--sleep-ms", "0", "--retries", "0"] + extra
+            env = dict(os.environ, OPENAI_API_KEY="bench")
+            proc = subprocess.run(cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+            if proc.returncode != 0:
+                raise RuntimeError(proc.stdout[-2000:])
+            return sum(1 for _ in work.rglob("*.png")), dir_bytes(work, "*.png")
+        return setup, run
+
+    if cfg.get("api_base"):
+        cases["generate/sequential"] = generate_case([])
+        cases["generate/concurrency4"] = generate_case(["--concurrency", "4", "--rate", "0"])
+        cases["generate/batch4"] = generate_case(["--batch-size", "4"])
+    return cases
+
+
+def rss_kb(usage) -> int:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+
+
+def measure(name: str, cfg: dict, conn):
+    # Runs in a fresh spawned process so peak RSS belongs to this case alone
+    try:
+        setup, run = build_cases(cfg)[name]
+        work = Path(tempfile.mkdtemp(dir=cfg["work_root"]))
+        state = setup(work)
+        self0 = resource.getrusage(resource.RUSAGE_SELF)
+        kids0 = resource.getrusage(resource.RUSAGE_CHILDREN)
+        t0 = time.perf_counter()
+        items, out_bytes = run(state)
+        wall = time.perf_counter() - t0
+        self1 = resource.getrusage(resource.RUSAGE_SELF)
+        kids1 = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu = (self1.ru_utime + self1.ru_stime - self0.ru_utime - self0.ru_stime) + (kids1.ru_utime + kids1.ru_stime - kids0.ru_utime - kids0.ru_stime)
+        conn.send({"wall_s": wall, "cpu_s": cpu, "peak_rss_kb": max(rss_kb(self1), rss_kb(kids1)), "output_bytes": out_bytes, "items": items})
+    except Exception as e:
+        conn.send({"error": f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def run_case(ctx, name: str, cfg: dict) -> dict:
+    parent, child = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=measure, args=(name, cfg, child))
+    proc.start()
+    child.close()
+    try:
+        result = parent.recv()
+    except EOFError:
+        result = {"error": f"worker exited with code {proc.exitcode}"}
+    proc.join()
+    return result
+
+
+def summarize(runs: list) -> dict:
+    walls = [r["wall_s"] for r in runs]
+    return {
+        "wall_s": round(statistics.median(walls), 4),
+        "wall_min_s": round(min(walls), 4),
+        "cpu_s": round(statistics.median(r["cpu_s"] for r in runs), 4),
+        "peak_rss_kb": max(r["peak_rss_kb"] for r in runs),
+        "output_bytes": runs[-1]["output_bytes"],
+        "items": runs[-1]["items"],
+        "runs": len(runs),
+    }
+
+
+def host_info() -> dict:
+    info = {"python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count()}
+    try:
+        import PIL
+        info["pillow"] = PIL.__version__
+    except Exception:
+        pass
+    try:
+        import numpy
+        info["numpy"] = numpy.__version__
+    except Exception:
+        pass
+    return info
+
+
+def ints(value: str) -> list:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def cmd_run(args):
+    if args.quick:
+        args.qualities, args.methods, args.repeat, args.fixtures = "85", "4", 1, min(args.fixtures, 4)
+    patterns = [p.strip() for p in args.only.split(",") if p.strip()] if args.only else ["*"]
+
+    work_root = Path(tempfile.mkdtemp(prefix="bench_assets_"))
+    server = None
+    try:
+        fixture_dir = Path(args.fixture_dir) if args.fixture_dir else work_root / "fixtures"
+        t0 = time.perf_counter()
+        fixtures = make_fixtures(fixture_dir, args.fixtures, args.size)
+        print(f"Fixtures: {len(fixtures)} x {args.size}px in {fixture_dir} ({time.perf_counter() - t0:.1f}s)")
+        cfg = {
+            "fixtures": [str(p) for p in fixtures],
+            "work_root": str(work_root),
+            "qualities": ints(args.qualities),
+            "methods": ints(args.methods),
+            "rescale": args.rescale,
+            "tiers": ints(args.tiers),
+            "gen_variations": args.gen_variations,
+            "api_base": None,
+        }
+        names = [n for n in build_cases(dict(cfg, api_base="probe")) if any(fnmatch.fnmatch(n, p) for p in patterns)]
+        if any(n.startswith("generate/") for n in names):
+            server = start_background(pool_size=8)
+            host, port = server.server_address[:2]
+            cfg["api_base"] = f"http://{host}:{port}"
+            server.pool.b64("warm-up", 0, 1024)
+
+        ctx = mp.get_context("spawn")
+        results = {}
+        for name in names:
+            runs = []
+            for _ in range(args.repeat):
+                r = run_case(ctx, name, cfg)
+                if "error" in r:
+                    print(f"FAIL {name}: {r['error']}")
+                    break
+                runs.append(r)
+            if len(runs) != args.repeat:
+                continue
+            results[name] = summarize(runs)
+            s = results[name]
+            out = f"{s['output_bytes']:>10}" if s["output_bytes"] is not None else f"{'-':>10}"
+            print(f"{name:<28} wall {s['wall_s']:8.3f}s  cpu {s['cpu_s']:8.3f}s  rss {s['peak_rss_kb'] / 1024:7.1f}MB  out {out}  items {s['items']}")
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        shutil.rmtree(work_root, ignore_errors=True)
+
+    stamp = datetime.now(timezone.utc)
+    doc = {
+        "version": RESULTS_VERSION,
+        "created": stamp.isoformat(timespec="seconds").replace("+00:00", "Z"),
+        "host": host_info(),
+        "config": {"fixtures": args.fixtures, "size": args.size, "repeat": args.repeat},
+        "results": results,
+    }
+    out_path = Path(args.out) if args.out else Path(DEFAULT_OUT_DIR) / f"bench-{stamp.strftime('%Y%m%dT%H%M%SZ')}.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(doc, indent=2) + "\n")
+    print(f"Wrote {out_path}")
+
+
+def pct(old, new) -> str:
+    if not old:
+        return "    n/a"
+    return f"{(new - old) / old:+7.1%}"
+
+
+def compare(base: dict, new: dict, time_threshold: float, rss_threshold: float, bytes_threshold: float, min_delta_s: float):
+    # Returns (report lines, regression count). Time checks use the median wall and CPU;
+    # tiny absolute changes are ignored so fast cases do not flap on noise.
+    lines = []
+    regressions = 0
+    b_res, n_res = base.get("results", {}), new.get("results", {})
+    for name in sorted(set(b_res) | set(n_res)):
+        if name not in b_res or name not in n_res:
+            lines.append(f"{name:<28} only in {'new' if name in n_res else 'base'}")
+            continue
+        b, n = b_res[name], n_res[name]
+        flags = []
+        for key, threshold in (("wall_s", time_threshold), ("cpu_s", time_threshold)):
+            if n[key] - b[key] > max(min_delta_s, b[key] * threshold):
+                flags.append(key.split("_")[0])
+        if n["peak_rss_kb"] > b["peak_rss_kb"] * (1 + rss_threshold):
+            flags.append("rss")
+        if b.get("output_bytes") is not None and n.get("output_bytes") is not None and n["output_bytes"] > b["output_bytes"] * (1 + bytes_threshold):
+            flags.append("bytes")
+        status = "REGRESSION " + ",".join(flags) if flags else "ok"
+        regressions += bool(flags)
+        size = pct(b["output_bytes"], n["output_bytes"]) if None not in (b.get("output_bytes"), n.get("output_bytes")) else "    n/a"
+        lines.append(
+            f"{name:<28} wall {b['wall_s']:.3f}->{n['wall_s']:.3f}s {pct(b['wall_s'], n['wall_s'])}  "
+            f"cpu {pct(b['cpu_s'], n['cpu_s'])}  rss {pct(b['peak_rss_kb'], n['peak_rss_kb'])}  bytes {size}  {status}"
+        )
+    return lines, regressions
+
+
+def cmd_compare(args):
+    base = json.loads(Path(args.base).read_text())
+    new = json.loads(Path(args.new).read_text())
+    if base.get("host", {}).get("platform") != new.get("host", {}).get("platform"):
+        print("warning: results come from different hosts; timings may not be comparable")
+    lines, regressions = compare(base, new, args.threshold, args.rss_threshold, args.bytes_threshold, args.min_delta)
+    for line in lines:
+        print(line)
+    print(f"{regressions} regression(s)")
+    if regressions:
+        sys.exit(1)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the asset pipeline on deterministic synthetic fixtures.")
+    sub = ap.add_subparsers(dest="cmd")
+
+    r = sub.add_parser("run", help="Run benchmarks and write a JSON result file (default)")
+    r.add_argument("--out", help=f"Result file (default: {DEFAULT_OUT_DIR}/bench-<UTC time>.json)")
+    r.add_argument("--only", help="Comma-separated name patterns, e.g. 'convert/*,rescale/*'")
+    r.add_argument("--fixtures", type=int, default=6, help="Synthetic images to generate (default: 6)")
+    r.add_argument("--fixture-dir", help="Keep fixtures in this folder between runs (default: temporary)")
+    r.add_argument("--size", type=int, default=1024, help="Fixture size in px (default: 1024)")
+    r.add_argument("--repeat", type=int, default=3, help="Runs per case; the median is reported (default: 3)")
+    r.add_argument("--qualities", default="75,85,95", help="WebP qualities to sweep (default: 75,85,95)")
+    r.add_argument("--methods", default="0,4,6", help="WebP methods to sweep (default: 0,4,6)")
+    r.add_argument("--rescale", type=int, default=512, help="Target size for the rescale case (default: 512)")
+    r.add_argument("--tiers", default="128,256,512", help="Tier sizes for the tiers case (default: 128,256,512)")
+    r.add_argument("--gen-variations", type=int, default=4, help="Trash variations per category in generate cases (default: 4)")
+    r.add_argument("--quick", action="store_true", help="One quality/method, one run, at most 4 fixtures")
+
+    c = sub.add_parser("compare", help="Compare two result files and flag regressions")
+    c.add_argument("base", help="Baseline result file")
+    c.add_argument("new", help="New result file")
+    c.add_argument("--threshold", type=float, default=0.10, help="Allowed wall/CPU slowdown (default: 0.10 = 10%%)")
+    c.add_argument("--rss-threshold", type=float, default=0.20, help="Allowed peak RSS growth (default: 0.20)")
+    c.add_argument("--bytes-threshold", type=float, default=0.01, help="Allowed output size growth (default: 0.01)")
+    c.add_argument("--min-delta", type=float, default=0.005, help="Ignore time changes smaller than this many seconds (default: 0.005)")
+
+    argv = sys.argv[1:]
+    if not argv or (argv[0].startswith("-") and argv[0] not in ("-h", "--help")):
+        argv = ["run"] + argv
+    args = ap.parse_args(argv)
+    {"run": cmd_run, "compare": cmd_compare}[args.cmd](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import mmap
+import struct
+import hashlib
+import argparse
+import mimetypes
+from pathlib import Path
+
+from asset_refs import DEFAULT_SOURCES
+from asset_index import AssetIndex, add_index_args
+
+
+# Layout (little-endian):
+#   header  "RHPK" u16 version, u16 align, u32 count, u32 data_start
+#   index   count x (u32 offset, u32 length, 8-byte sha256 prefix, u16 path len, u8 mime len, pad)
+#           followed by the path and MIME bytes of that entry
+#   data    each file starts on an `align` boundary so it can be viewed in place
+MAGIC = b"RHPK"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+ENTRY = struct.Struct("<II8sHBx")
+DEFAULT_ALIGN = 16
+DEFAULT_EXTS = "webp,png,jpg,jpeg,json,ktx2"
+POINTER_NAME = "pack.json"
+
+MIME_TYPES = {".webp": "image/webp", ".ktx2": "image/ktx2", ".json": "application/json"}
+
+
+def mime_type(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    return MIME_TYPES.get(ext) or mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+
+def align_up(n: int, align: int) -> int:
+    return (n + align - 1) // align * align
+
+
+def build_pack(files, root: Path, align: int = DEFAULT_ALIGN) -> bytes:
+    # files: web paths relative to root. Returns the whole pack in memory (it is a few MB).
+    blobs = [(p, (root / p).read_bytes()) for p in files]
+    index_size = sum(ENTRY.size + len(p.encode()) + len(mime_type(p).encode()) for p, _ in blobs)
+    data_start = align_up(HEADER.size + index_size, align)
+
+    index = bytearray()
+    offset = data_start
+    placed = []
+    for path, data in blobs:
+        name, mime = path.encode(), mime_type(path).encode()
+        index += ENTRY.pack(offset, len(data), hashlib.sha256(data).digest()[:8], len(name), len(mime)) + name + mime
+        placed.append((offset, data))
+        offset = align_up(offset + len(data), align)
+
+    end = placed[-1][0] + len(placed[-1][1]) if placed else data_start
+    out = bytearray(end)
+    out[:HEADER.size] = HEADER.pack(MAGIC, VERSION, align, len(blobs), data_start)
+    out[HEADER.size:HEADER.size + len(index)] = index
+    for off, data in placed:
+        out[off:off + len(data)] = data
+    return bytes(out)
+
+
+class PackReader:
+    # Memory-maps a pack; read() returns zero-copy memoryview slices into the mapping
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.file = open(self.path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        magic, self.version, self.align, count, self.data_start = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path}: not an asset pack")
+        if self.version != VERSION:
+            self.close()
+            raise ValueError(f"{path}: unsupported pack version {self.version}")
+        self.entries = {}
+        pos = HEADER.size
+        for _ in range(count):
+            offset, length, digest, name_len, mime_len = ENTRY.unpack_from(self.map, pos)
+            pos += ENTRY.size
+            name = bytes(self.view[pos:pos + name_len]).decode()
+            pos += name_len
+            mime = bytes(self.view[pos:pos + mime_len]).decode()
+            pos += mime_len
+            self.entries[name] = {"offset": offset, "length": length, "hash": digest.hex(), "mime": mime}
+
+    def read(self, name: str) -> memoryview:
+        e = self.entries[name]
+        return self.view[e["offset"]:e["offset"] + e["length"]]
+
+    def verify(self) -> list:
+        problems = []
+        size = len(self.map)
+        for name, e in self.entries.items():
+            if e["offset"] % self.align:
+                problems.append(f"{name}: offset {e['offset']} not aligned to {self.align}")
+            if e["offset"] < self.data_start or e["offset"] + e["length"] > size:
+                problems.append(f"{name}: range {e['offset']}+{e['length']} outside the pack ({size} bytes)")
+                continue
+            if hashlib.sha256(self.read(name)).digest()[:8].hex() != e["hash"]:
+                problems.append(f"{name}: hash mismatch")
+        return problems
+
+    def close(self):
+        # Views must be released before the mapping can close
+        if hasattr(self, "view"):
+            self.view.release()
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def ktx2_files(root: Path, files: list) -> list:
+    # KTX2 files listed in assets/texture-ktx2.json (scripts/ktx2.py) for textures that are
+    # themselves packed; without them the loader skips the KTX2 and uses the packed WebP
+    try:
+        textures = json.loads((root / "assets" / "texture-ktx2.json").read_text())["textures"]
+    except (OSError, ValueError, KeyError):
+        return []
+    packed = set(files)
+    return sorted(e["path"] for src, e in textures.items()
+                  if (src in packed or src[:-5] + ".png" in packed) and e["path"] not in packed and (root / e["path"]).is_file())
+
+
+def cmd_build(args):
+    root = Path(args.root)
+    out_dir = Path(args.out_dir) if args.out_dir else root / "assets" / "pack"
+    exts = tuple("." + e.strip().lower() for e in args.exts.split(",") if e.strip())
+    sources = [s.strip() for s in args.sources.split(",") if s.strip()]
+    with AssetIndex(root, args.index_db) as index:
+        index.update(sources=sorted(set(DEFAULT_SOURCES) | set(sources)))
+        files, missing = index.referenced(sources), index.missing(sources)
+    files = [f for f in files if f.lower().endswith(exts)]
+    if args.ktx2:
+        # KTX2 files are only named in texture-ktx2.json, never in the game sources
+        files += ktx2_files(root, files)
+    for ref, where in missing.items():
+        print(f"MISSING {ref} (referenced in {', '.join(where)})")
+    if not files:
+        print("No referenced assets found.")
+        sys.exit(1)
+
+    data = build_pack(files, root, align=args.align)
+    digest = hashlib.sha256(data).hexdigest()
+    # The hashed name is served as immutable by scripts/serve.py; pack.json is the small,
+    # always-revalidated pointer to it
+    out_dir.mkdir(parents=True, exist_ok=True)
+    pack_path = out_dir / f"assets.{digest[:12]}.pack"
+    tmp = pack_path.with_name(pack_path.name + ".part")
+    tmp.write_bytes(data)
+    os.replace(tmp, pack_path)
+    for old in out_dir.glob("assets.*.pack"):
+        if old != pack_path:
+            old.unlink()
+    pointer = {
+        "version": VERSION,
+        "src": Path(os.path.relpath(pack_path, root)).as_posix(),
+        "bytes": len(data),
+        "hash": digest[:16],
+        "count": len(files),
+    }
+    (out_dir / POINTER_NAME).write_text(json.dumps(pointer, indent=2) + "\n")
+    raw = sum((root / f).stat().st_size for f in files)
+    print(f"Wrote {pack_path} ({len(files)} files, {raw} -> {len(data)} bytes, align {args.align})")
+    print(f"Wrote {out_dir / POINTER_NAME}")
+
+
+def open_pack(path: str) -> PackReader:
+    p = Path(path)
+    if p.suffix == ".json":
+        # The pointer's src is relative to the web root; the pack always sits beside it
+        p = p.parent / Path(json.loads(p.read_text())["src"]).name
+    return PackReader(p)
+
+
+def cmd_list(args):
+    with open_pack(args.pack) as pack:
+        for name, e in pack.entries.items():
+            print(f"{e['offset']:>10} {e['length']:>9} {e['hash']} {e['mime']:<18} {name}")
+        print(f"{len(pack.entries)} entries, {len(pack.map)} bytes, align {pack.align}")
+
+
+def cmd_verify(args):
+    with open_pack(args.pack) as pack:
+        problems = pack.verify()
+        for line in problems:
+            print(f"FAIL {line}")
+        if problems:
+            sys.exit(1)
+        print(f"OK {len(pack.entries)} entries")
+
+
+def cmd_extract(args):
+    out = Path(args.dest)
+    with open_pack(args.pack) as pack:
+        for name in pack.entries:
+            dst = out / name
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            dst.write_bytes(pack.read(name))
+            print(f"EXTRACT {dst}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Bundle the assets the game references into one aligned binary pack.")
+    sub = ap.add_subparsers(dest="cmd")
+
+    b = sub.add_parser("build", help="Build the pack (default)")
+    b.add_argument("--root", default=".", help="Web root holding index.html and assets/ (default: .)")
+    b.add_argument("--out-dir", help="Output folder (default: <root>/assets/pack)")
+    b.add_argument("--sources", default="src", help="Comma-separated files/folders scanned for asset references (default: src)")
+    b.add_argument("--exts", default=DEFAULT_EXTS, help=f"File types to include (default: {DEFAULT_EXTS})")
+    b.add_argument("--ktx2", action="store_true", help="Also pack the KTX2 textures from assets/texture-ktx2.json (several times the size of the WebPs they replace)")
+    b.add_argument("--align", type=int, default=DEFAULT_ALIGN, help=f"Byte alignment of each file (default: {DEFAULT_ALIGN})")
+    add_index_args(b)
+
+    for name, help_text in (("list", "Print the index"), ("verify", "Check alignment, bounds and hashes"), ("extract", "Write every entry back out")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("pack", help="Pack file or its pack.json pointer")
+        if name == "extract":
+            p.add_argument("--dest", default="extracted", help="Destination folder (default: extracted)")
+
+    argv = sys.argv[1:]
+    if not argv or (argv[0].startswith("-") and argv[0] not in ("-h", "--help")):
+        argv = ["build"] + argv
+    args = ap.parse_args(argv)
+    {"build": cmd_build, "list": cmd_list, "verify": cmd_verify, "extract": cmd_extract}[args.cmd](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,530 @@
+#!/usr/bin/env python3
+import io
+import os
+import sys
+import json
+import time
+import runpy
+import fnmatch
+import hashlib
+import argparse
+import threading
+import traceback
+import contextlib
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from asset_spec import load_spec, image_tasks
+from asset_index import AssetIndex, file_hash
+from api_client import TokenBucket, add_client_args, client_from_args
+from image_cache import add_cache_args, cache_from_args
+import metrics
+
+# Builds everything scripts/asset_spec.json describes as one dependency graph:
+#
+#   gen:<png>      one image from the Images API (rescaled in memory if the spec says so)
+#   webp:<webp>    PNG -> WebP plus its tiers; with no PNG left, tiers from the WebP
+#   tier-manifest  assets/texture-tiers.json
+#   <task>         the spec's downstream steps (trash manifest, atlas, ground, pack, ...)
+#
+# A node's key hashes its tool version (the script's source), its parameters and the
+# contents of its input files. It reruns only when that key differs from its last
+# successful build or one of its outputs is gone, and independent nodes run in parallel.
+# Generating costs money: gen nodes only call the API with --generate, and an image that
+# already exists is adopted as built the first time the graph sees it.
+
+STATE_PATH = ".cache/build-state.json"
+STATE_VERSION = 1
+# Bump to regenerate images whose prompt and parameters did not change
+GENERATE_VERSION = 1
+CONVERT_TOOL = "scripts/convert_assets_to_webp.py"
+
+
+class Node:
+    def __init__(self, name: str, kind: str, params: dict, inputs=(), outputs=(), tool: str = None, after=()):
+        self.name = name
+        self.kind = kind
+        self.params = params
+        # Web paths or globs; expanded when the node is checked, after its deps ran
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.tool = tool
+        self.deps = set(after)
+
+
+class Result:
+    def __init__(self, status: str, lines=(), seconds: float = 0.0, error: str = None):
+        self.status = status
+        self.lines = list(lines)
+        self.seconds = seconds
+        self.error = error
+
+    @property
+    def failed(self) -> bool:
+        return self.status in ("failed", "skipped")
+
+
+def is_glob(pattern: str) -> bool:
+    return any(c in pattern for c in "*?[")
+
+
+def overlaps(a: str, b: str) -> bool:
+    # Could a path matching `a` also match `b`? Good enough for wiring task edges;
+    # "**/" also stands for no folder at all
+    variants = lambda p: {p, p.replace("**/", "")}
+    return any(fnmatch.fnmatchcase(x, y) or fnmatch.fnmatchcase(y, x) for x in variants(a) for y in variants(b))
+
+
+def expand(root: Path, patterns, exclude=()) -> list:
+    found = set()
+    for pattern in patterns:
+        if pattern.endswith("**"):
+            # Path.glob's "**" alone only yields folders
+            pattern += "/*"
+        if is_glob(pattern):
+            found.update(Path(os.path.relpath(p, root)).as_posix() for p in root.glob(pattern) if p.is_file())
+        elif (root / pattern).is_file():
+            found.add(pattern)
+    skip = set(exclude)
+    return sorted(p for p in found if p not in skip and not p.endswith(".part"))
+
+
+class Digests:
+    # File content hashes with a (size, mtime) fast path, kept in the build state so a
+    # no-op build only stats its inputs
+    def __init__(self, root: Path, known: dict):
+        self.root = root
+        self.known = known
+        self.lock = threading.Lock()
+
+    def __call__(self, path: str) -> str:
+        st = (self.root / path).stat()
+        with self.lock:
+            k = self.known.get(path)
+        if k and k[0] == st.st_size and k[1] == st.st_mtime_ns:
+            return k[2]
+        digest = file_hash(self.root / path)
+        with self.lock:
+            self.known[path] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+
+class Build:
+    def __init__(self, root: Path, spec: dict, state: dict, args):
+        self.root = root
+        self.spec = spec
+        self.state = state
+        self.args = args
+        self.digest = Digests(root, state.setdefault("files", {}))
+        self.tools = {}
+        self.lock = threading.Lock()
+        self.cpu = threading.Semaphore(args.jobs)
+        self.api = threading.Semaphore(max(1, args.concurrency))
+        self.procs = None
+        # Set when self.procs is a warm pool (scripts/build_daemon.py): tasks then run in
+        # its workers instead of a fresh interpreter each
+        self.warm = False
+        self.client = None
+        self.cache = None
+        self.limiter = None
+
+    # Keys
+
+    def tool_version(self, tool: str) -> str:
+        if tool is None:
+            return None
+        if tool not in self.tools:
+            path = self.root / tool
+            self.tools[tool] = file_hash(path) if path.is_file() else tool
+        return self.tools[tool]
+
+    def sources(self, node: Node) -> list:
+        if node.kind == "webp":
+            # The PNG while there is one; once it's gone the WebP is the source of its tiers
+            webp = node.outputs[0]
+            png = webp[:-5] + ".png"
+            return [png] if (self.root / png).is_file() else [webp] if (self.root / webp).is_file() else None
+        return expand(self.root, node.inputs, exclude=expand(self.root, node.outputs))
+
+    def key(self, node: Node):
+        inputs = self.sources(node)
+        if inputs is None:
+            return None
+        h = hashlib.sha256(json.dumps({"tool": self.tool_version(node.tool), "params": node.params}, sort_keys=True).encode())
+        for p in inputs:
+            h.update(f"\n{p} {self.digest(p)}".encode())
+        return h.hexdigest()
+
+    def outputs_present(self, node: Node, recorded) -> bool:
+        if node.kind == "gen":
+            # A generated PNG may already have been converted and deleted
+            png = node.outputs[0]
+            return (self.root / png).is_file() or (self.root / (png[:-4] + ".webp")).is_file()
+        if recorded:
+            return all((self.root / p).is_file() for p in recorded)
+        return all(expand(self.root, [o]) for o in node.outputs)
+
+    def record(self, node: Node, outputs=None):
+        key = self.key(node)
+        with self.lock:
+            self.state["nodes"][node.name] = {"key": key, "outputs": outputs if outputs is not None else expand(self.root, node.outputs)}
+
+    # Running
+
+    def check(self, node: Node) -> str:
+        # "fresh", "adopt", "want" (image not generated), "nosource" or "stale"
+        key = self.key(node)
+        prev = self.state["nodes"].get(node.name)
+        present = self.outputs_present(node, prev and prev.get("outputs"))
+        if node.kind == "gen":
+            if self.args.regenerate:
+                return "stale"
+            if present and (prev is None or prev["key"] == key):
+                return "fresh" if prev else "adopt"
+            return "stale" if self.args.generate else "want"
+        if key is None:
+            return "nosource"
+        if prev and prev["key"] == key and present and not self.args.force:
+            return "fresh"
+        return "stale"
+
+    def execute(self, node: Node) -> Result:
+        status = self.check(node)
+        if status == "adopt" and not self.args.dry_run:
+            self.record(node)
+        if status != "stale" or self.args.dry_run:
+            return Result(status)
+        lines = []
+        kind = node.kind.replace("-", "_")
+        # API calls and local work have separate limits; timing starts once a slot is free
+        with self.api if node.kind == "gen" else self.cpu:
+            start = time.perf_counter()
+            try:
+                with metrics.stage(f"build_{kind}"):
+                    outputs = getattr(self, f"run_{kind}")(node, lines)
+            except Exception as e:
+                metrics.inc("build_nodes_total", outcome="failed")
+                return Result("failed", lines, time.perf_counter() - start, str(e))
+            seconds = time.perf_counter() - start
+        self.record(node, outputs)
+        metrics.inc("build_nodes_total", outcome="built")
+        return Result("built", lines, seconds)
+
+    def run_gen(self, node: Node, lines: list):
+        from generate_assets import generate_batch
+        api_key = os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("OPENAI_API_KEY not set")
+        p = node.params
+        out = self.root / node.outputs[0]
+        ok = generate_batch(p["prompt"], [(out, p["variation"])], api_key, size=p["size"], retry=self.args.retries, model=p["model"], timeout_s=self.args.timeout, client=self.client, limiter=self.limiter, log=lines.append, cache=self.cache, refresh_cache=self.args.refresh_cache, rescale=p["rescale"])
+        if not ok[0]:
+            raise RuntimeError("generation failed")
+        return [node.outputs[0]]
+
+    def run_webp(self, node: Node, lines: list):
+        from convert_assets_to_webp import run_item
+        p = node.params
+        (src,) = self.sources(node)
+        kind = "png" if src.endswith(".png") else "webp"
+        tiers = tuple(p["tiers"])
+        if kind == "webp" and not tiers:
+            return [node.outputs[0]]
+        with self.lock:
+            if self.procs is None:
+                self.procs = ProcessPoolExecutor(max_workers=self.args.jobs)
+        item = (kind, self.root / src, p["quality"], p["lossless"], p["method"], p["deletePng"] and kind == "png", tiers, None)
+        (_, dst, err, written, _), snapshot = self.procs.submit(run_item, *item).result()
+        metrics.REGISTRY.merge(snapshot)
+        if err is not None:
+            raise RuntimeError(err)
+        rel = lambda q: Path(os.path.relpath(q, self.root)).as_posix()
+        lines.extend(f"{'WEBP' if q == dst else 'TIER'} {rel(q)}" for q in ([dst] if dst else []) + written)
+        return [node.outputs[0]] + [rel(q) for q in written]
+
+    def run_tier_manifest(self, node: Node, lines: list):
+        from convert_assets_to_webp import write_tier_manifest
+        p = node.params
+        count = write_tier_manifest(self.root / "assets", p["dirs"], p["sizes"], self.root / node.outputs[0])
+        lines.append(f"Wrote {node.outputs[0]} ({count} tiered textures)")
+        return list(node.outputs)
+
+    def run_task(self, node: Node, lines: list):
+        script, *rest = node.params["run"]
+        if self.warm:
+            code, output = self.procs.submit(run_script, script, rest).result()
+        else:
+            proc = subprocess.run([sys.executable, script, *rest], cwd=self.root, capture_output=True, text=True)
+            code, output = proc.returncode, proc.stdout + proc.stderr
+        lines.extend(output.splitlines())
+        if code != 0:
+            raise RuntimeError(f"{script} exited with {code}")
+        return None
+
+    def close(self):
+        if self.procs is not None:
+            self.procs.shutdown()
+
+
+def run_script(script: str, argv) -> tuple:
+    # `python script argv...` inside this process, for workers that already have the
+    # script's imports loaded; the cwd must be the web root. Returns (exit code, output).
+    out = io.StringIO()
+    sys.argv = [script, *argv]
+    code = 0
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+        try:
+            runpy.run_path(script, run_name="__main__")
+        except SystemExit as e:
+            if isinstance(e.code, str):
+                print(e.code)
+            code = e.code if isinstance(e.code, int) else 0 if e.code is None else 1
+        except Exception:
+            traceback.print_exc()
+            code = 1
+    return code, out.getvalue()
+
+
+def plan(spec: dict, root: Path) -> list:
+    nodes = []
+    rescale = spec.get("generate", {}).get("rescale", 0)
+    generated = {}
+    for t in image_tasks(spec):
+        png = f"assets/{t['out']}"
+        params = {k: t[k] for k in ("prompt", "model", "size", "variation")}
+        params.update(rescale=rescale, version=GENERATE_VERSION)
+        nodes.append(Node(f"gen:{png}", "gen", params, outputs=[png]))
+        generated[png] = nodes[-1].name
+
+    conv = spec.get("convert", {})
+    tier_sizes = sorted(conv.get("tiers", []))
+    tier_dirs = [d.strip("/") for d in conv.get("tierDirs", [])]
+    # Every PNG gets converted, as convert_assets_to_webp.py does, and WebPs in tier
+    # folders keep their tiers current after their PNG is gone
+    pngs = set(generated)
+    webps = set()
+    with AssetIndex(root) as index:
+        index.update()
+        pngs.update(r["path"] for r in index.files("assets/", [".png"]))
+        for d in tier_dirs:
+            webps.update(r["path"] for r in index.files(f"assets/{d}/", [".webp"]) if "@" not in Path(r["path"]).stem)
+    webps.update(p[:-4] + ".webp" for p in pngs)
+    tiered = []
+    for webp in sorted(webps):
+        in_tier_dir = any(webp.startswith(f"assets/{d}/") for d in tier_dirs)
+        params = {
+            "quality": conv.get("quality", 85),
+            "method": conv.get("method", 6),
+            "lossless": conv.get("lossless", False),
+            "deletePng": conv.get("deletePng", False),
+            "tiers": tier_sizes if in_tier_dir else [],
+        }
+        dep = generated.get(webp[:-5] + ".png")
+        nodes.append(Node(f"webp:{webp}", "webp", params, outputs=[webp], tool=CONVERT_TOOL, after=[dep] if dep else []))
+        if in_tier_dir:
+            tiered.append(nodes[-1].name)
+    if tier_sizes:
+        nodes.append(Node("tier-manifest", "tier-manifest", {"dirs": tier_dirs, "sizes": tier_sizes}, inputs=[f"assets/{d}/**/*.webp" for d in tier_dirs], outputs=["assets/texture-tiers.json"], tool=CONVERT_TOOL, after=tiered))
+
+    tasks = [Node(t["name"], "task", {"run": t["run"]}, inputs=t.get("inputs", []), outputs=t.get("outputs", []), tool=t["run"][0], after=t.get("after", [])) for t in spec.get("tasks", [])]
+    nodes.extend(tasks)
+    for task in tasks:
+        # A task waits for every node that writes something its inputs could match
+        for other in nodes:
+            if other is not task and other.kind != "gen" and any(overlaps(o, i) for o in other.outputs for i in task.inputs):
+                task.deps.add(other.name)
+
+    by_name = {n.name: n for n in nodes}
+    for n in nodes:
+        unknown = n.deps - set(by_name)
+        if unknown:
+            raise ValueError(f"{n.name}: unknown dependency {', '.join(sorted(unknown))}")
+    order = topo_order(nodes)
+    return [by_name[name] for name in order]
+
+
+def topo_order(nodes) -> list:
+    waiting = {n.name: set(n.deps) for n in nodes}
+    order = []
+    while waiting:
+        ready = sorted(name for name, deps in waiting.items() if not deps)
+        if not ready:
+            raise ValueError(f"dependency cycle among {', '.join(sorted(waiting))}")
+        for name in ready:
+            del waiting[name]
+            order.append(name)
+        for deps in waiting.values():
+            deps.difference_update(ready)
+    return order
+
+
+def select(nodes: list, targets) -> list:
+    # The named nodes (globs allowed) and everything they depend on
+    if not targets:
+        return nodes
+    by_name = {n.name: n for n in nodes}
+    wanted = set()
+    stack = [n.name for n in nodes if any(fnmatch.fnmatchcase(n.name, t) for t in targets)]
+    while stack:
+        name = stack.pop()
+        if name not in wanted:
+            wanted.add(name)
+            stack.extend(by_name[name].deps)
+    return [n for n in nodes if n.name in wanted]
+
+
+def run_graph(build: Build, nodes: list, threads: int, report) -> dict:
+    # Nodes start as soon as their deps finish; a failed node skips everything downstream
+    by_name = {n.name: n for n in nodes}
+    waiting = {n.name: set(n.deps) & set(by_name) for n in nodes}
+    results = {}
+    running = {}
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        while waiting or running:
+            for name in sorted(name for name, deps in waiting.items() if not deps):
+                del waiting[name]
+                failed = [d for d in by_name[name].deps if d in results and results[d].failed]
+                if failed:
+                    results[name] = Result("skipped", error=f"{failed[0]} failed")
+                    report(by_name[name], results[name])
+                    for deps in waiting.values():
+                        deps.discard(name)
+                    continue
+                running[pool.submit(build.execute, by_name[name])] = name
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = running.pop(fut)
+                results[name] = fut.result()
+                report(by_name[name], results[name])
+                for deps in waiting.values():
+                    deps.discard(name)
+    return results
+
+
+def describe(name: str, result: Result, verbose: bool = False) -> list:
+    # Output lines for one finished node
+    if result.status == "built":
+        return [f"BUILD {name} ({result.seconds:.2f}s)"] + (["  " + line for line in result.lines] if verbose else [])
+    if result.status == "stale":
+        return [f"STALE {name}"]
+    if result.status == "failed":
+        return [f"FAIL {name}: {result.error}"] + ["  " + line for line in result.lines[-20:]]
+    if result.status == "skipped":
+        return [f"SKIP {name} ({result.error})"]
+    if result.status == "adopt":
+        return [f"ADOPT {name}"]
+    if not verbose:
+        return []
+    label = {"want": "WANT", "fresh": "FRESH"}.get(result.status, "NOSRC")
+    return [f"{label} {name}"]
+
+
+def tally(results: dict) -> dict:
+    counts = {}
+    for r in results.values():
+        counts[r.status] = counts.get(r.status, 0) + 1
+    return counts
+
+
+def summarize(counts: dict, seconds: float) -> str:
+    summary = "".join(f", {v} {k}" for k, v in sorted(counts.items()))
+    return f"{sum(counts.values())} nodes{summary.replace(',', ':', 1)} in {seconds:.2f}s"
+
+
+def load_state(path: Path) -> dict:
+    try:
+        state = json.loads(path.read_text())
+        if state.get("version") == STATE_VERSION:
+            return state
+    except Exception:
+        pass
+    return {"version": STATE_VERSION, "nodes": {}, "files": {}}
+
+
+def save_state(state: dict, path: Path, root: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Forget hashes of files that are gone
+    state["files"] = {p: v for p, v in state["files"].items() if (root / p).is_file()}
+    tmp = path.with_name(path.name + ".part")
+    tmp.write_text(json.dumps(state, separators=(",", ":"), sort_keys=True))
+    os.replace(tmp, path)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build the assets described by scripts/asset_spec.json, rebuilding only what changed.")
+    ap.add_argument("targets", nargs="*", help="Node names or globs to build with their dependencies, e.g. pack 'webp:assets/tiles/*' (default: everything)")
+    ap.add_argument("--root", default=".", help="Web root holding index.html and assets/ (default: .)")
+    ap.add_argument("--spec", help="Asset spec (default: scripts/asset_spec.json)")
+    ap.add_argument("--state", help=f"Build state file (default: <root>/{STATE_PATH})")
+    ap.add_argument("--jobs", type=int, default=0, help="Conversions and steps run at once (default: 0 = all cores)")
+    ap.add_argument("--generate", action="store_true", help="Call the Images API for images that are missing or whose prompt/parameters changed")
+    ap.add_argument("--force", action="store_true", help="Rebuild the selected local nodes even if up to date (never regenerates images)")
+    ap.add_argument("--regenerate", action="store_true", help="Call the Images API again for the selected images even if up to date (implies --generate)")
+    ap.add_argument("--dry-run", action="store_true", help="Report what is out of date without building")
+    ap.add_argument("--list", action="store_true", help="Print the graph (each node with its dependencies) and exit")
+    ap.add_argument("--verbose", "-v", action="store_true", help="Also print up-to-date nodes and each built node's output")
+    ap.add_argument("--timeout", type=int, default=180, help="Per-request timeout seconds for --generate (default: 180)")
+    ap.add_argument("--retries", type=int, default=3, help="Max retries per image for --generate (default: 3)")
+    ap.add_argument("--concurrency", type=int, default=1, help="Image requests in flight at once for --generate (default: 1)")
+    ap.add_argument("--rate", type=float, default=1.0, help="Max image requests per second for --generate (default: 1.0, 0 disables)")
+    add_client_args(ap)
+    add_cache_args(ap)
+    metrics.add_metrics_args(ap)
+    args = ap.parse_args()
+    metrics.metrics_from_args(args)
+    args.generate = args.generate or args.regenerate
+
+    start = time.perf_counter()
+    root = Path(args.root)
+    args.jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    try:
+        spec = load_spec(args.spec)
+        nodes = select(plan(spec, root), args.targets)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Bad asset spec: {e}")
+        sys.exit(2)
+    if args.list:
+        for n in nodes:
+            print(n.name + (f" <- {', '.join(sorted(n.deps))}" if n.deps else ""))
+        print(f"{len(nodes)} nodes")
+        return
+
+    state_path = Path(args.state) if args.state else root / STATE_PATH
+    state = load_state(state_path)
+    build = Build(root, spec, state, args)
+    if args.generate:
+        build.client = client_from_args(args)
+        build.cache = cache_from_args(args)
+        build.limiter = TokenBucket(args.rate)
+
+    wanted = []
+
+    def report(node: Node, result: Result):
+        if result.status == "want":
+            wanted.append(node.name)
+        for line in describe(node.name, result, args.verbose):
+            print(line)
+
+    # Threads mostly wait on worker processes, subprocesses and the API
+    threads = args.jobs + max(1, args.concurrency)
+    try:
+        results = run_graph(build, nodes, threads, report)
+    finally:
+        build.close()
+        if not args.dry_run:
+            save_state(state, state_path, root)
+
+    counts = tally(results)
+    if wanted:
+        print(f"{len(wanted)} images in the spec are not generated yet (build with --generate; -v lists them)")
+    print(summarize(counts, time.perf_counter() - start))
+    metrics.finish(args)
+    if counts.get("failed") or counts.get("skipped"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+import sys
+import json
+import wave
+import argparse
+from pathlib import Path
+
+from asset_index import add_index_args, index_from_args
+
+try:
+    import numpy as np
+except Exception as e:
+    print("NumPy is required. Install with: pip install numpy")
+    sys.exit(1)
+
+
+DEFAULT_RATE = 16000
+SINC_TAPS = 16
+
+
+def read_wav(path: Path):
+    # Returns (mono float32 samples in [-1, 1], sample rate)
+    with wave.open(str(path), "rb") as w:
+        channels, width, rate = w.getnchannels(), w.getsampwidth(), w.getframerate()
+        frames = w.readframes(w.getnframes())
+    if width == 1:
+        x = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        x = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        b = np.frombuffer(frames, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        v = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        x = np.where(v >= 1 << 23, v - (1 << 24), v).astype(np.float32) / float(1 << 23)
+    elif width == 4:
+        x = np.frombuffer(frames, dtype="<i4").astype(np.float32) / float(1 << 31)
+    else:
+        raise ValueError(f"unsupported sample width {width}")
+    if channels > 1:
+        x = x.reshape(-1, channels).mean(axis=1)
+    return x, rate
+
+
+def resample(x: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    # Windowed-sinc interpolation; the kernel is widened when downsampling so it also
+    # acts as the anti-aliasing low-pass
+    if src_rate == dst_rate or not x.size:
+        return x
+    ratio = dst_rate / src_rate
+    cutoff = min(1.0, ratio)
+    half = int(np.ceil(SINC_TAPS / cutoff / 2))
+    n_out = int(round(x.size * ratio))
+    t = np.arange(n_out) / ratio
+    base = np.floor(t).astype(np.int64)
+    out = np.zeros(n_out, dtype=np.float64)
+    padded = np.pad(x.astype(np.float64), (half, half + 1))
+    for k in range(-half + 1, half + 1):
+        d = t - (base + k)
+        # Hann-windowed sinc tap
+        w = cutoff * np.sinc(cutoff * d) * (0.5 + 0.5 * np.cos(np.pi * d / half))
+        out += w * padded[base + k + half]
+    return out.astype(np.float32)
+
+
+def trim_silence(x: np.ndarray, rate: int, threshold_db: float = -45.0, pad_ms: float = 10.0) -> np.ndarray:
+    # Drops leading/trailing samples quieter than threshold_db (relative to full scale),
+    # keeping pad_ms of the original fade on either side
+    level = 10 ** (threshold_db / 20.0)
+    loud = np.flatnonzero(np.abs(x) > level)
+    if not loud.size:
+        return x[:0]
+    pad = int(rate * pad_ms / 1000.0)
+    return x[max(0, loud[0] - pad):min(x.size, loud[-1] + 1 + pad)]
+
+
+def write_wav(path: Path, x: np.ndarray, rate: int):
+    pcm = np.clip(np.rint(x * 32767.0), -32768, 32767).astype("<i2")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm.tobytes())
+
+
+def web_path(path: Path, web_root: Path) -> str:
+    try:
+        return path.resolve().relative_to(web_root.resolve()).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def collect_clips(audio_dir: Path, out_path: Path, index=None) -> list:
+    found = [index.path(r) for r in index.files(f"{index.web_path(audio_dir)}/", (".wav",))] if index is not None else sorted(audio_dir.rglob("*.wav"))
+    return [p for p in found if p.resolve() != out_path.resolve()]
+
+
+def build_sprite(clips, rate: int, gap_ms: float = 50.0, threshold_db: float = -45.0, pad_ms: float = 10.0, web_root: Path = Path(".")):
+    # Returns (sprite samples, {web path: {"start", "duration"}} in seconds, report lines).
+    # Clips are separated by gap_ms of silence so a late stop never bleeds into the next cue.
+    gap = np.zeros(int(rate * gap_ms / 1000.0), dtype=np.float32)
+    parts = []
+    table = {}
+    report = []
+    pos = 0
+    for path in clips:
+        x, src_rate = read_wav(path)
+        before = x.size / src_rate
+        x = trim_silence(resample(x, src_rate, rate), rate, threshold_db, pad_ms)
+        key = web_path(path, web_root)
+        table[key] = {"start": round(pos / rate, 4), "duration": round(x.size / rate, 4)}
+        report.append(f"CLIP {key} {before:.2f}s @ {src_rate}Hz -> {x.size / rate:.2f}s @ {rate}Hz")
+        parts.extend((x, gap))
+        pos += x.size + gap.size
+    sprite = np.concatenate(parts) if parts else np.zeros(0, dtype=np.float32)
+    return sprite, table, report
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Pack assets/audio clips into one mono WAV sprite with a JSON offset table.")
+    ap.add_argument("--audio-dir", default="assets/audio", help="Folder of source WAV clips (default: assets/audio)")
+    ap.add_argument("--out", help="Sprite WAV to write (default: <audio-dir>/sprite.wav)")
+    ap.add_argument("--json", help="Offset table to write (default: next to the sprite as .json)")
+    ap.add_argument("--rate", type=int, default=DEFAULT_RATE, help=f"Output sample rate in Hz (default: {DEFAULT_RATE})")
+    ap.add_argument("--silence-db", type=float, default=-45.0, help="Leading/trailing audio below this level is trimmed (default: -45 dBFS)")
+    ap.add_argument("--pad-ms", type=float, default=10.0, help="Audio kept around the trimmed region (default: 10)")
+    ap.add_argument("--gap-ms", type=float, default=50.0, help="Silence between clips in the sprite (default: 50)")
+    add_index_args(ap)
+    args = ap.parse_args()
+
+    audio_dir = Path(args.audio_dir)
+    if not audio_dir.exists():
+        print(f"Audio dir not found: {audio_dir}")
+        sys.exit(2)
+    out_path = Path(args.out) if args.out else audio_dir / "sprite.wav"
+    json_path = Path(args.json) if args.json else out_path.with_suffix(".json")
+    # Keys and "src" are paths relative to the page, like the URLs in src/main.js
+    web_root = audio_dir.parent.parent
+
+    # The index covers the assets dir above the audio folder
+    with index_from_args(args, audio_dir.parent) as index:
+        clips = collect_clips(audio_dir, out_path, index)
+    if not clips:
+        print(f"No WAV clips under {audio_dir}")
+        sys.exit(1)
+    bytes_before = sum(p.stat().st_size for p in clips)
+    sprite, table, report = build_sprite(clips, args.rate, gap_ms=args.gap_ms, threshold_db=args.silence_db, pad_ms=args.pad_ms, web_root=web_root)
+    for line in report:
+        print(line)
+
+    write_wav(out_path, sprite, args.rate)
+    meta = {"version": 1, "src": web_path(out_path, web_root), "sampleRate": args.rate, "duration": round(sprite.size / args.rate, 4), "clips": table}
+    json_path.write_text(json.dumps(meta, indent=2) + "\n")
+    bytes_after = out_path.stat().st_size
+    print(f"Wrote {out_path} ({len(table)} clips, {bytes_before} -> {bytes_after} bytes)")
+    print(f"Wrote {json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+import sys
+import json
+import time
+import socket
+import argparse
+from pathlib import Path
+
+# Client for scripts/build_daemon.py: sends one job over the daemon's Unix socket and
+# prints its progress as it arrives. Standard library only, so it starts in a few tens
+# of milliseconds; the daemon does the importing once.
+
+SOCKET_PATH = ".cache/build.sock"
+
+
+def request(path: Path, req: dict):
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        s.connect(str(path))
+    except OSError:
+        print(f"No build daemon on {path} (start one with: python3 scripts/build_daemon.py)")
+        sys.exit(2)
+    with s, s.makefile("rwb") as f:
+        f.write((json.dumps(req) + "\n").encode())
+        f.flush()
+        for line in f:
+            yield json.loads(line)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Send a job to the warm asset build daemon (scripts/build_daemon.py).")
+    ap.add_argument("--root", default=".", help="Web root holding index.html and assets/ (default: .)")
+    ap.add_argument("--socket", help=f"Unix socket (default: <root>/{SOCKET_PATH})")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    b = sub.add_parser("build", help="Build graph nodes, like scripts/build_assets.py")
+    b.add_argument("targets", nargs="*", help="Node names or globs (default: everything)")
+    b.add_argument("--generate", action="store_true", help="Call the Images API for images that are missing or changed")
+    b.add_argument("--dry-run", action="store_true", help="Report what is out of date without building")
+
+    c = sub.add_parser("convert", help="Convert (and tier) textures")
+    c.add_argument("paths", nargs="*", help="Web paths or globs, e.g. 'assets/tiles/*' (default: all)")
+
+    r = sub.add_parser("rescale", help="Downscale textures in place, then reconvert them")
+    r.add_argument("max_px", type=int, help="Longest side in pixels")
+    r.add_argument("paths", nargs="*", help="Web paths or globs (default: all)")
+
+    g = sub.add_parser("regenerate", help="Generate a set of images again through the Images API")
+    g.add_argument("sets", nargs="+", help="Sets from the asset spec, e.g. trash tiles")
+
+    for p in (b, c):
+        p.add_argument("--force", action="store_true", help="Rebuild even if up to date")
+    for p in (b, c, r, g):
+        p.add_argument("--priority", type=int, default=0, help="Higher runs sooner (default: 0)")
+        p.add_argument("--verbose", "-v", action="store_true", help="Also print up-to-date nodes and each built node's output")
+    sub.add_parser("status", help="Show the running and queued jobs")
+    sub.add_parser("stop", help="Stop the daemon once the queued jobs have finished")
+    args = ap.parse_args()
+    path = Path(args.socket) if args.socket else Path(args.root) / SOCKET_PATH
+
+    if args.cmd == "status":
+        for event in request(path, {"op": "status"}):
+            running = event["running"]
+            print(f"pid {event['pid']}, {event['workers']} workers, {event['done']} jobs done")
+            print(f"running: {'#%d %s %s' % (running['job'], running['kind'], json.dumps(running['params'])) if running else 'nothing'}")
+            for j in event["queued"]:
+                print(f"queued: #{j['job']} {j['kind']} {json.dumps(j['params'])} (priority {j['priority']}, {j['clients']} clients)")
+        return
+    if args.cmd == "stop":
+        for event in request(path, {"op": "stop"}):
+            print("Stopping once the queued jobs have finished")
+        return
+
+    if args.cmd == "build":
+        params = {"targets": args.targets, "force": args.force, "generate": args.generate, "dryRun": args.dry_run}
+    elif args.cmd == "convert":
+        params = {"paths": args.paths, "force": args.force}
+    elif args.cmd == "rescale":
+        params = {"maxPx": args.max_px, "paths": args.paths}
+    else:
+        params = {"sets": args.sets}
+    start = time.perf_counter()
+    ok = False
+    for event in request(path, {"op": args.cmd, "params": params, "priority": args.priority, "verbose": args.verbose}):
+        kind = event["event"]
+        if kind == "queued":
+            if event["joined"]:
+                print(f"Joined queued job #{event['job']} (position {event['position']})")
+            elif event["position"] > 1:
+                print(f"Queued as job #{event['job']} (position {event['position']})")
+        elif kind == "log":
+            print(event["line"], flush=True)
+        elif kind == "node":
+            for line in event["lines"]:
+                print(line, flush=True)
+        elif kind == "error":
+            print(f"FAIL {event['error']}")
+        elif kind == "done":
+            ok = event["ok"]
+            print(f"{event['summary']} (round trip {time.perf_counter() - start:.3f}s)")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import heapq
+import queue
+import signal
+import socket
+import argparse
+import threading
+import socketserver
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+from asset_spec import load_spec, image_tasks
+from asset_index import AssetIndex
+from api_client import TokenBucket, add_client_args, client_from_args
+from image_cache import add_cache_args, cache_from_args
+from build_client import SOCKET_PATH
+from build_assets import Build, Result, plan, select, run_graph, load_state, save_state, describe, tally, summarize, STATE_PATH
+
+# Keeps the asset build warm between edits: a process pool whose workers have Pillow,
+# NumPy and the pipeline modules imported, taking jobs over a Unix socket from
+# scripts/build_client.py, which sends one job and prints its progress as it streams back.
+#
+# Jobs run one at a time, highest priority first (FIFO within a priority), through the
+# same graph as scripts/build_assets.py, so the two share .cache/build-state.json; the
+# spec's tasks run inside the warm workers instead of a fresh interpreter each. A job
+# identical to one still queued joins it instead of queueing twice. Workers restart
+# when any script under scripts/ changes, so edits to the tools take effect.
+#
+# Protocol: one JSON request line from the client ({"op", "params", "priority",
+# "verbose"}); JSON event lines back, output already formatted like build_assets.py's:
+#   {"event": "queued", "job", "position", "joined"}   {"event": "start", "job"}
+#   {"event": "node", "name", "status", "lines"}   {"event": "log", "line"}
+#   {"event": "done", "ok", "summary"}   {"event": "status", ...}   {"event": "error", "error"}
+
+JOB_KINDS = ("build", "convert", "rescale", "regenerate")
+
+
+def warm_worker(root: str):
+    # Pool initializer: the cwd and imports every job expects, paid once per worker
+    os.chdir(root)
+    sys.path.insert(0, str(Path(root) / "scripts"))
+    import numpy  # noqa: F401
+    from PIL import Image  # noqa: F401
+    import convert_assets_to_webp  # noqa: F401
+    import image_pipeline  # noqa: F401
+
+
+def rescale_file(src: str, assets_dir: str, max_px: int, quality: int, method: int) -> tuple:
+    # Runs in a warm worker: downscale one texture in place (PNG stays PNG, WebP is
+    # re-encoded) and report what happened
+    from image_pipeline import process_file, parse_steps
+    steps = parse_steps(f"rescale:{max_px},png" if src.endswith(".png") else f"rescale:{max_px},webp:{quality}", method=method)
+    _, lines, _, _, err, _ = process_file(Path(src), Path(assets_dir), steps)
+    return lines, err
+
+
+class Job:
+    def __init__(self, seq: int, kind: str, params: dict, priority: int):
+        self.id = seq
+        self.kind = kind
+        self.params = params
+        self.priority = priority
+        self.key = json.dumps([kind, params], sort_keys=True)
+        self.subscribers = []
+        self.lock = threading.Lock()
+
+    def subscribe(self) -> queue.Queue:
+        q = queue.Queue()
+        with self.lock:
+            self.subscribers.append(q)
+        return q
+
+    def emit(self, event: dict):
+        event = dict(event, job=self.id)
+        with self.lock:
+            for q in self.subscribers:
+                q.put(event)
+
+
+class Daemon:
+    def __init__(self, root: Path, args):
+        # Absolute: workers run with the web root as their cwd
+        self.root = root.resolve()
+        self.args = args
+        self.state_path = Path(args.state) if args.state else root / STATE_PATH
+        self.heap = []
+        self.queued = {}
+        self.running = None
+        self.cond = threading.Condition()
+        self.seq = 0
+        self.stopping = False
+        self.pool = None
+        self.pool_stamp = None
+        self.client = None
+        self.cache = None
+        self.limiter = TokenBucket(args.rate)
+        self.done = 0
+
+    # Queue
+
+    def submit(self, kind: str, params: dict, priority: int):
+        # Returns (job, events queue, joined an existing job)
+        with self.cond:
+            if self.stopping:
+                raise RuntimeError("daemon is stopping")
+            key = json.dumps([kind, params], sort_keys=True)
+            job = self.queued.get(key)
+            joined = job is not None
+            if job is None:
+                self.seq += 1
+                job = Job(self.seq, kind, params, priority)
+                self.queued[key] = job
+                heapq.heappush(self.heap, (-priority, job.id, job))
+            elif priority > job.priority:
+                # The joined job moves up to the more urgent request's priority
+                job.priority = priority
+                heapq.heappush(self.heap, (-priority, job.id, job))
+            events = job.subscribe()
+            position = sorted(self.queued.values(), key=lambda j: (-j.priority, j.id)).index(job) + 1
+            # Before the job can start, so it is the client's first event
+            events.put({"event": "queued", "job": job.id, "position": position, "joined": joined})
+            self.cond.notify()
+        return job, events, joined
+
+    def next_job(self):
+        with self.cond:
+            while True:
+                while self.heap:
+                    _, _, job = heapq.heappop(self.heap)
+                    # Entries left behind by a priority bump
+                    if self.queued.get(job.key) is job:
+                        del self.queued[job.key]
+                        self.running = job
+                        return job
+                if self.stopping:
+                    return None
+                self.cond.wait()
+
+    def status(self) -> dict:
+        with self.cond:
+            waiting = sorted(self.queued.values(), key=lambda j: (-j.priority, j.id))
+            return {
+                "event": "status",
+                "pid": os.getpid(),
+                "running": self.running and {"job": self.running.id, "kind": self.running.kind, "params": self.running.params},
+                "queued": [{"job": j.id, "kind": j.kind, "params": j.params, "priority": j.priority, "clients": len(j.subscribers)} for j in waiting],
+                "done": self.done,
+                "workers": self.args.jobs,
+            }
+
+    def stop(self):
+        with self.cond:
+            self.stopping = True
+            self.cond.notify_all()
+
+    # Workers
+
+    def scripts_stamp(self):
+        return sorted((p.name, p.stat().st_mtime_ns) for p in (self.root / "scripts").glob("*.py"))
+
+    def warm_pool(self, log=print) -> ProcessPoolExecutor:
+        stamp = self.scripts_stamp()
+        if self.pool is not None and stamp != self.pool_stamp:
+            log("Scripts changed; restarting workers")
+            self.pool.shutdown()
+            self.pool = None
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.args.jobs, initializer=warm_worker, initargs=(str(self.root),))
+            # Start every worker now rather than on the first job
+            for f in [self.pool.submit(os.getpid) for _ in range(self.args.jobs)]:
+                f.result()
+            self.pool_stamp = stamp
+        return self.pool
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+    # Jobs
+
+    def job_args(self, job: Job) -> argparse.Namespace:
+        a = argparse.Namespace(**vars(self.args))
+        a.force = bool(job.params.get("force"))
+        a.regenerate = job.kind == "regenerate"
+        a.generate = a.regenerate or bool(job.params.get("generate"))
+        a.dry_run = bool(job.params.get("dryRun"))
+        return a
+
+    def targets(self, job: Job, spec: dict, log) -> list:
+        p = job.params
+        if job.kind == "build":
+            return p.get("targets") or []
+        if job.kind == "regenerate":
+            tasks = image_tasks(spec, p["sets"])
+            if not tasks:
+                raise ValueError(f"no images in set(s) {', '.join(p['sets'])}")
+            # The new images get converted (and tiered) as part of the same job
+            return [f"{kind}:assets/{t['out'][:-4]}{ext}" for t in tasks for kind, ext in (("gen", ".png"), ("webp", ".webp"))]
+        # convert / rescale: WebP nodes for the matching files
+        patterns = p.get("paths") or ["assets/**"]
+        webps = [f"webp:{q[:-4]}.webp" if q.endswith(".png") else f"webp:{q}" for q in self.match(patterns, (".png", ".webp"))]
+        if not webps:
+            raise ValueError(f"no textures match {' '.join(patterns)}")
+        if job.kind == "rescale":
+            self.rescale(job, log)
+        return sorted(set(webps))
+
+    def match(self, patterns, exts) -> list:
+        import fnmatch
+        with AssetIndex(self.root) as index:
+            index.update()
+            rows = index.files("assets/", exts)
+        return [r["path"] for r in rows if "@" not in Path(r["path"]).stem and any(fnmatch.fnmatchcase(r["path"], pat) for pat in patterns)]
+
+    def rescale(self, job: Job, log):
+        p = job.params
+        conv = load_spec(self.args.spec).get("convert", {})
+        files = self.match(p.get("paths") or ["assets/**"], (".png", ".webp"))
+        # A WebP whose PNG is still on disk is rebuilt from the PNG afterwards, so the PNG is
+        # what gets rescaled; shrinking the WebP alone would leave its node looking fresh
+        files = sorted({f[:-5] + ".png" if f.endswith(".webp") and (self.root / (f[:-5] + ".png")).is_file() else f for f in files})
+        pool = self.warm_pool(log)
+        futures = [pool.submit(rescale_file, str(self.root / f), str(self.root / "assets"), p["maxPx"], conv.get("quality", 85), conv.get("method", 6)) for f in files]
+        for f, fut in zip(files, futures):
+            lines, err = fut.result()
+            for line in lines:
+                log(line)
+            if err:
+                log(f"FAIL {f}: {err}")
+
+    def run(self, job: Job):
+        start = time.perf_counter()
+        job.emit({"event": "start"})
+        log = lambda line: job.emit({"event": "log", "line": line})
+        results = {}
+        ok = True
+        try:
+            spec = load_spec(self.args.spec)
+            targets = self.targets(job, spec, log)
+            graph = plan(spec, self.root)
+            if job.kind != "build":
+                # Only textures the graph converts (a WebP outside the tier folders with no
+                # PNG has nothing to rebuild); the tier manifest is refreshed without
+                # pulling in every other tiered texture
+                names = {n.name for n in graph}
+                targets = [t for t in targets if t in names]
+                nodes = select(graph, targets) + [n for n in graph if n.kind == "tier-manifest"] if targets else []
+            else:
+                nodes = select(graph, targets)
+                if targets and not nodes:
+                    raise ValueError(f"no nodes match {' '.join(targets)}")
+            args = self.job_args(job)
+            # Re-read every job: a command-line build may have run in between
+            state = load_state(self.state_path)
+            build = Build(self.root, spec, state, args)
+            build.procs = self.warm_pool(log)
+            build.warm = True
+            if args.generate:
+                if self.client is None:
+                    self.client = client_from_args(self.args)
+                    self.cache = cache_from_args(self.args)
+                build.client, build.cache, build.limiter = self.client, self.cache, self.limiter
+
+            def report(node, result: Result):
+                job.emit({"event": "node", "name": node.name, "result": result})
+
+            try:
+                results = run_graph(build, nodes, args.jobs + max(1, args.concurrency), report)
+            finally:
+                if not args.dry_run:
+                    save_state(state, self.state_path, self.root)
+        except Exception as e:
+            ok = False
+            job.emit({"event": "error", "error": str(e)})
+        counts = tally(results)
+        ok = ok and not (counts.get("failed") or counts.get("skipped"))
+        job.emit({"event": "done", "ok": ok, "summary": summarize(counts, time.perf_counter() - start)})
+        with self.cond:
+            self.running = None
+            self.done += 1
+
+    def serve_jobs(self):
+        while True:
+            job = self.next_job()
+            if job is None:
+                return
+            self.run(job)
+
+
+class Handler(socketserver.StreamRequestHandler):
+    def send(self, event: dict):
+        self.wfile.write((json.dumps(event) + "\n").encode())
+        self.wfile.flush()
+
+    def handle(self):
+        daemon = self.server.daemon
+        line = self.rfile.readline()
+        if not line.strip():
+            # A liveness probe: connected and closed without a request
+            return
+        try:
+            req = json.loads(line)
+            verbose = bool(req.get("verbose"))
+            op = req.get("op")
+            if op == "status":
+                self.send(daemon.status())
+                return
+            if op == "stop":
+                daemon.stop()
+                self.send({"event": "stopping"})
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+            if op not in JOB_KINDS:
+                raise ValueError(f"unknown op {op!r}")
+            job, events, _ = daemon.submit(op, req.get("params", {}), int(req.get("priority", 0)))
+        except (ValueError, KeyError, RuntimeError) as e:
+            self.send({"event": "error", "error": str(e)})
+            return
+        while True:
+            event = events.get()
+            if event["event"] == "node":
+                result = event["result"]
+                event = {"event": "node", "job": event["job"], "name": event["name"], "status": result.status, "lines": describe(event["name"], result, verbose)}
+            try:
+                self.send(event)
+            except (BrokenPipeError, ConnectionResetError):
+                # The client went away; the job still runs for everyone else
+                return
+            if event["event"] == "done":
+                return
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Warm asset build daemon; send it jobs with scripts/build_client.py.")
+    ap.add_argument("--root", default=".", help="Web root holding index.html and assets/ (default: .)")
+    ap.add_argument("--socket", help=f"Unix socket (default: <root>/{SOCKET_PATH})")
+    ap.add_argument("--spec", help="Asset spec (default: scripts/asset_spec.json)")
+    ap.add_argument("--state", help=f"Build state file (default: <root>/{STATE_PATH})")
+    ap.add_argument("--jobs", type=int, default=0, help="Warm worker processes (default: 0 = all cores)")
+    ap.add_argument("--timeout", type=int, default=180, help="Per-request timeout seconds for image generation (default: 180)")
+    ap.add_argument("--retries", type=int, default=3, help="Max retries per image (default: 3)")
+    ap.add_argument("--concurrency", type=int, default=1, help="Image requests in flight at once (default: 1)")
+    ap.add_argument("--rate", type=float, default=1.0, help="Max image requests per second (default: 1.0, 0 disables)")
+    add_client_args(ap)
+    add_cache_args(ap)
+    args = ap.parse_args()
+
+    root = Path(args.root)
+    path = Path(args.socket) if args.socket else root / SOCKET_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+                s.connect(str(path))
+            print(f"A build daemon is already listening on {path}")
+            sys.exit(2)
+        except OSError:
+            path.unlink()
+    args.jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    daemon = Daemon(root, args)
+    start = time.perf_counter()
+    daemon.warm_pool()
+    print(f"Warmed {args.jobs} workers in {time.perf_counter() - start:.2f}s")
+    server = Server(str(path), Handler)
+    server.daemon = daemon
+    jobs = threading.Thread(target=daemon.serve_jobs, daemon=True)
+    jobs.start()
+    print(f"Listening on {path} (pid {os.getpid()})")
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown, daemon=True).start())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+        server.server_close()
+        path.unlink(missing_ok=True)
+        # Let queued jobs finish so their clients get an answer and the state is saved
+        jobs.join()
+        daemon.close()
+    print("Stopped")
+
+
+if __name__ == "__main__":
+    main()
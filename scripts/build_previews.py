@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import base64
+import argparse
+from pathlib import Path
+
+from asset_index import add_index_args, index_from_args
+
+try:
+    import numpy as np
+    from PIL import Image
+except Exception as e:
+    print("NumPy and Pillow are required. Install with: pip install numpy pillow")
+    sys.exit(1)
+
+
+# Tiny stand-ins the game shows until a texture's full image has loaded: PREVIEW_SIZE x
+# PREVIEW_SIZE pixels of RGBA4444 (big-endian nibbles R, G, B, A per 16-bit pixel, top row
+# first), base64 encoded. 8x8 is 128 bytes / 172 characters; bilinear upscaling on the GPU
+# does the blurring. src/modules/loader.js decodes the same layout.
+PREVIEW_SIZE = 8
+DEFAULT_DIRS = "trash,tiles,player,interactables"
+DEFAULT_OUT = "previews.json"
+IMAGE_EXTS = (".webp", ".png", ".jpg", ".jpeg")
+VERSION = 1
+
+
+def downsample(path: Path, size: int = PREVIEW_SIZE) -> np.ndarray:
+    # Premultiplied ("RGBa") box filter so transparent pixels don't bleed their color in
+    with Image.open(path) as im:
+        small = im.convert("RGBA").convert("RGBa").resize((size, size), Image.BOX, reducing_gap=2.0)
+        return np.asarray(small, dtype=np.uint8)
+
+
+def encode(stack: np.ndarray) -> list:
+    # (N, size, size, 4) premultiplied RGBa -> one base64 RGBA4444 string per image, the
+    # whole batch at once
+    rgba = stack.astype(np.float32)
+    alpha = rgba[..., 3:4]
+    rgb = np.where(alpha > 0, rgba[..., :3] * 255 / np.maximum(alpha, 1), 0)
+    q = np.clip(np.rint(np.concatenate([rgb, alpha], axis=-1) / 17), 0, 15).astype(np.uint16)
+    packed = (q[..., 0] << 12) | (q[..., 1] << 8) | (q[..., 2] << 4) | q[..., 3]
+    rows = packed.astype(">u2").reshape(len(stack), -1)
+    return [base64.b64encode(row.tobytes()).decode("ascii") for row in rows]
+
+
+def decode(data: str, size: int = PREVIEW_SIZE) -> np.ndarray:
+    # Inverse of encode() for one preview: (size, size, 4) straight RGBA uint8
+    packed = np.frombuffer(base64.b64decode(data), dtype=">u2").reshape(size, size)
+    q = np.stack([(packed >> s) & 15 for s in (12, 8, 4, 0)], axis=-1)
+    return (q * 17).astype(np.uint8)
+
+
+def load_previews(path: Path) -> dict:
+    # {web path: {"hash", "data"}} from a file written by this script
+    try:
+        data = json.loads(path.read_text())
+    except Exception:
+        return {}
+    if data.get("version") != VERSION or data.get("size") != PREVIEW_SIZE:
+        return {}
+    return data.get("previews", {})
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compute tiny placeholder previews for every texture under assets/.")
+    ap.add_argument("--assets-dir", default="assets", help="Assets root directory (default: assets)")
+    ap.add_argument("--dirs", default=DEFAULT_DIRS, help=f"Comma-separated folders under the assets root to cover (default: {DEFAULT_DIRS})")
+    ap.add_argument("--out", help=f"Previews file (default: <assets-dir>/{DEFAULT_OUT})")
+    ap.add_argument("--force", action="store_true", help="Recompute previews whose source is unchanged")
+    ap.add_argument("--show", metavar="PATH", help="Print one stored preview's pixels (rrggbbaa) and exit")
+    add_index_args(ap)
+    args = ap.parse_args()
+
+    root = Path(args.assets_dir)
+    if not root.exists():
+        print(f"Assets dir not found: {root}")
+        sys.exit(2)
+    out_path = Path(args.out) if args.out else root / DEFAULT_OUT
+    previous = {} if args.force else load_previews(out_path)
+
+    if args.show:
+        entry = load_previews(out_path).get(args.show)
+        if entry is None:
+            print(f"No preview for {args.show}")
+            sys.exit(1)
+        px = decode(entry["data"])
+        for row in px:
+            print(" ".join(bytes(p).hex() for p in row))
+        return
+
+    # Hashes come from the asset index, so only new or changed files are decoded
+    with index_from_args(args, root) as index:
+        rows = []
+        for d in (d.strip() for d in args.dirs.split(",") if d.strip()):
+            rows.extend(r for r in index.files(f"{index.web_path(root / d)}/", IMAGE_EXTS) if "@" not in Path(r["path"]).stem)
+        web_root = index.web_root
+
+    previews = {}
+    todo = []
+    for r in rows:
+        digest = r["hash"][:16]
+        prev = previous.get(r["path"])
+        if prev and prev.get("hash") == digest:
+            previews[r["path"]] = prev
+        else:
+            todo.append((r["path"], digest))
+
+    samples = []
+    done = []
+    for path, digest in todo:
+        try:
+            samples.append(downsample(web_root / path))
+            done.append((path, digest))
+        except Exception as e:
+            print(f"FAIL {path}: {e}")
+    if samples:
+        for (path, digest), data in zip(done, encode(np.stack(samples))):
+            previews[path] = {"hash": digest, "data": data}
+            print(f"PREVIEW {path}")
+
+    out = {"version": VERSION, "size": PREVIEW_SIZE, "format": "rgba4444", "previews": dict(sorted(previews.items()))}
+    tmp = out_path.with_name(out_path.name + ".part")
+    tmp.write_text(json.dumps(out, indent=1) + "\n")
+    os.replace(tmp, out_path)
+    print(f"Wrote {out_path} ({len(previews)} previews, {len(done)} computed, {out_path.stat().st_size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
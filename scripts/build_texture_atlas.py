@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+import sys
+import json
+import fnmatch
+import argparse
+from pathlib import Path
+
+from asset_index import add_index_args, index_from_args
+
+try:
+    from PIL import Image
+except Exception as e:
+    print("Pillow is required. Install with: pip install pillow")
+    sys.exit(1)
+
+
+IMAGE_EXTS = (".webp", ".png")
+# Sprites already decoded and fitted by image_pipeline.py's atlas step
+DEFAULT_ATLAS_INPUTS = ".cache/atlas-inputs"
+
+
+def collect_sprites(assets_dir: Path, index=None) -> list:
+    # (key, path) pairs: trash sprites keyed by their TRASH_CATEGORIES key (the folder
+    # name), bin decals keyed by file stem. WebP wins when both formats exist.
+    if index is not None:
+        trash = [index.path(r) for r in index.files(f"{index.web_path(assets_dir / 'trash')}/", IMAGE_EXTS)]
+        player = [index.path(r) for r in index.files(f"{index.web_path(assets_dir / 'player')}/", (".webp",))]
+        bins = [p for p in player if p.parent == assets_dir / "player" and fnmatch.fnmatch(p.name, "*bin*.webp")]
+    else:
+        trash = sorted((assets_dir / "trash").rglob("*"))
+        bins = sorted((assets_dir / "player").glob("*bin*.webp"))
+    found = {}
+    for p in trash:
+        if p.suffix.lower() in IMAGE_EXTS:
+            found.setdefault((p.relative_to(assets_dir / "trash").parts[0], p.with_suffix("")), []).append(p)
+    for p in bins:
+        found.setdefault(("bins", p.with_suffix("")), []).append(p)
+    out = []
+    for (key, _stem), paths in sorted(found.items()):
+        paths.sort(key=lambda p: IMAGE_EXTS.index(p.suffix.lower()))
+        out.append((key, paths[0]))
+    return out
+
+
+class MaxRectsBin:
+    """MaxRects packer (best short side fit) over a fixed-size page."""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.free = [(0, 0, width, height)]
+
+    def insert(self, w: int, h: int):
+        best = None
+        for fx, fy, fw, fh in self.free:
+            if w <= fw and h <= fh:
+                short, long_ = sorted((fw - w, fh - h))
+                score = (short, long_)
+                if best is None or score < best[0]:
+                    best = (score, (fx, fy, w, h))
+        if best is None:
+            return None
+        placed = best[1]
+        self._split(placed)
+        return placed
+
+    def _split(self, used):
+        ux, uy, uw, uh = used
+        new_free = []
+        for fx, fy, fw, fh in self.free:
+            if ux >= fx + fw or ux + uw <= fx or uy >= fy + fh or uy + uh <= fy:
+                new_free.append((fx, fy, fw, fh))
+                continue
+            if ux > fx:
+                new_free.append((fx, fy, ux - fx, fh))
+            if ux + uw < fx + fw:
+                new_free.append((ux + uw, fy, fx + fw - (ux + uw), fh))
+            if uy > fy:
+                new_free.append((fx, fy, fw, uy - fy))
+            if uy + uh < fy + fh:
+                new_free.append((fx, uy + uh, fw, fy + fh - (uy + uh)))
+        # Drop free rects fully contained in another one
+        pruned = []
+        for i, a in enumerate(new_free):
+            contained = False
+            for j, b in enumerate(new_free):
+                if i != j and a[0] >= b[0] and a[1] >= b[1] and a[0] + a[2] <= b[0] + b[2] and a[1] + a[3] <= b[1] + b[3]:
+                    if a != b or i > j:
+                        contained = True
+                        break
+            if not contained:
+                pruned.append(a)
+        self.free = pruned
+
+
+def pack_page(sizes: list, width: int, height: int) -> dict:
+    # Pack as many (index, w, h) as fit; returns {index: (x, y)}
+    bin_ = MaxRectsBin(width, height)
+    placed = {}
+    for idx, w, h in sizes:
+        r = bin_.insert(w, h)
+        if r is not None:
+            placed[idx] = (r[0], r[1])
+    return placed
+
+
+def pot_candidates(max_size: int) -> list:
+    sizes = []
+    s = 64
+    while s <= max_size:
+        sizes.append((s, s // 2) if s > 64 else (s, s))
+        sizes.append((s, s))
+        s *= 2
+    # Smallest area first; prefer square on ties
+    return sorted(set(sizes), key=lambda wh: (wh[0] * wh[1], wh[0] != wh[1]))
+
+
+def pack_all(sizes: list, max_size: int) -> list:
+    # Returns pages as (width, height, {index: (x, y)})
+    remaining = sorted(sizes, key=lambda s: (max(s[1], s[2]), s[1] * s[2]), reverse=True)
+    pages = []
+    while remaining:
+        for w, h in pot_candidates(max_size):
+            placed = pack_page(remaining, w, h)
+            if len(placed) == len(remaining):
+                break
+        else:
+            w = h = max_size
+            placed = pack_page(remaining, w, h)
+            if not placed:
+                raise ValueError(f"sprite larger than {max_size}px atlas page")
+        pages.append((w, h, placed))
+        remaining = [s for s in remaining if s[0] not in placed]
+    return pages
+
+
+def extrude(page: Image.Image, sprite: Image.Image, x: int, y: int, pad: int):
+    # Copy edge texels into the padding so linear filtering/mipmaps never sample neighbors
+    w, h = sprite.size
+    page.paste(sprite, (x, y))
+    if pad <= 0:
+        return
+    page.paste(sprite.crop((0, 0, w, 1)).resize((w, pad)), (x, y - pad))
+    page.paste(sprite.crop((0, h - 1, w, h)).resize((w, pad)), (x, y + h))
+    page.paste(sprite.crop((0, 0, 1, h)).resize((pad, h)), (x - pad, y))
+    page.paste(sprite.crop((w - 1, 0, w, h)).resize((pad, h)), (x + w, y))
+    for cx, cy, dx, dy in ((0, 0, x - pad, y - pad), (w - 1, 0, x + w, y - pad), (0, h - 1, x - pad, y + h), (w - 1, h - 1, x + w, y + h)):
+        page.paste(sprite.crop((cx, cy, cx + 1, cy + 1)).resize((pad, pad)), (dx, dy))
+
+
+def web_path(path: Path, web_root: Path) -> str:
+    # Paths in the map are relative to the folder the game is served from
+    try:
+        return path.resolve().relative_to(web_root.resolve()).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def atlas_input_path(inputs_dir: Path, web_path: str, max_sprite: int) -> Path:
+    return Path(inputs_dir) / f"{web_path}.{max_sprite}.png"
+
+
+def load_sprite(path: Path, max_sprite: int, prepared: Path = None) -> Image.Image:
+    # A prepared input at least as new as the sprite skips the full-size decode and resize
+    if prepared is not None and prepared.exists() and prepared.stat().st_mtime >= path.stat().st_mtime:
+        with Image.open(prepared) as im:
+            return im.convert("RGBA")
+    with Image.open(path) as im:
+        im = im.convert("RGBA")
+        w, h = im.size
+        if max_sprite and max(w, h) > max_sprite:
+            scale = max_sprite / max(w, h)
+            im = im.resize((max(1, round(w * scale)), max(1, round(h * scale))), Image.LANCZOS)
+        return im
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Pack trash sprites and bin decals into power-of-two texture atlases.")
+    ap.add_argument("--assets-dir", default="assets", help="Assets root directory (default: assets)")
+    ap.add_argument("--out-dir", default="assets/atlas", help="Where atlas pages and the UV map go (default: assets/atlas)")
+    ap.add_argument("--name", default="trash_atlas", help="Base name for pages and map (default: trash_atlas)")
+    ap.add_argument("--max-size", type=int, default=2048, help="Max atlas page dimension, power of two (default: 2048)")
+    ap.add_argument("--max-sprite", type=int, default=256, help="Downscale sprites so their longest side fits (default: 256, 0 keeps source size)")
+    ap.add_argument("--padding", type=int, default=4, help="Edge-extruded padding around each sprite in px (default: 4)")
+    ap.add_argument("--quality", type=int, default=90, help="WebP quality for atlas pages (default: 90)")
+    ap.add_argument("--lossless", action="store_true", help="Write lossless WebP pages")
+    ap.add_argument("--inputs", default=DEFAULT_ATLAS_INPUTS, help=f"Prepared sprites from image_pipeline.py's atlas step (default: {DEFAULT_ATLAS_INPUTS})")
+    add_index_args(ap)
+    args = ap.parse_args()
+
+    if args.max_size & (args.max_size - 1):
+        print(f"--max-size must be a power of two, got {args.max_size}")
+        sys.exit(2)
+
+    assets_dir = Path(args.assets_dir)
+    out_dir = Path(args.out_dir)
+    with index_from_args(args, assets_dir) as index:
+        sprites = collect_sprites(assets_dir, index)
+    if not sprites:
+        print(f"No sprites found under {assets_dir}")
+        sys.exit(2)
+
+    images = []
+    web_root = assets_dir.parent
+    for key, path in sprites:
+        try:
+            prepared = atlas_input_path(args.inputs, web_path(path, web_root), args.max_sprite)
+            images.append((key, path, load_sprite(path, args.max_sprite, prepared)))
+        except Exception as e:
+            print(f"FAIL {path}: {e}")
+
+    pad = args.padding
+    sizes = [(i, im.width + 2 * pad, im.height + 2 * pad) for i, (_, _, im) in enumerate(images)]
+    pages = pack_all(sizes, args.max_size)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    atlas = {"version": 1, "padding": pad, "uvOrigin": "bottom-left", "pages": [], "categories": {}, "sprites": {}}
+    for page_idx, (pw, ph, placed) in enumerate(pages):
+        page = Image.new("RGBA", (pw, ph), (0, 0, 0, 0))
+        for idx, (x, y) in sorted(placed.items()):
+            key, path, im = images[idx]
+            sx, sy = x + pad, y + pad
+            extrude(page, im, sx, sy, pad)
+            rel = web_path(path, web_root)
+            atlas["sprites"][rel] = {
+                "page": page_idx,
+                "x": sx, "y": sy, "w": im.width, "h": im.height,
+                # three.js textures are flipped (flipY), so v runs bottom-up
+                "uv": [sx / pw, 1 - (sy + im.height) / ph, (sx + im.width) / pw, 1 - sy / ph],
+            }
+            atlas["categories"].setdefault(key, []).append(rel)
+        page_path = out_dir / f"{args.name}_{page_idx}.webp"
+        page.save(page_path, format="WEBP", quality=args.quality, lossless=args.lossless, method=6)
+        used = sum(sizes[i][1] * sizes[i][2] for i in placed)
+        atlas["pages"].append({"image": web_path(page_path, web_root), "width": pw, "height": ph})
+        print(f"PAGE {page_path} {pw}x{ph} sprites={len(placed)} fill={used / (pw * ph):.0%}")
+
+    for key in atlas["categories"]:
+        atlas["categories"][key].sort()
+    map_path = out_dir / f"{args.name}.json"
+    map_path.write_text(json.dumps(atlas, indent=2) + "\n")
+    print(f"Wrote {map_path} ({len(atlas['sprites'])} sprites on {len(pages)} page(s)).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+import sys
+import json
+import hashlib
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+
+from asset_index import add_index_args, index_from_args
+
+try:
+    from PIL import Image
+except Exception as e:
+    print("Pillow is required. Install with: pip install pillow")
+    sys.exit(1)
+
+
+CATEGORY_META = {
+    "bottles": {"baseSize": 0.7, "binKey": "bottles"},
+    "cans": {"baseSize": 0.6, "binKey": "bottles"},
+    "newspapers": {"baseSize": 0.9, "binKey": "paper"},
+    "plastic_bags": {"baseSize": 1.0, "binKey": "trash"},
+    "coffee_cups": {"baseSize": 0.7, "binKey": "trash"},
+    "food_wrappers": {"baseSize": 0.8, "binKey": "trash"},
+    "fruit_peels": {"baseSize": 0.5, "binKey": "compost"},
+}
+
+# Preferred format first: when a sprite exists as both, only the WebP is shipped
+FORMATS = {".webp": "webp", ".png": "png"}
+
+
+def file_hash(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def describe_texture(path: Path, web_root: Path, row=None) -> dict:
+    # `row` is the file's asset index entry, which already has its size, hash and dimensions
+    if row is not None and row["width"] is not None:
+        width, height, size, digest = row["width"], row["height"], row["size"], row["hash"][:16]
+    else:
+        with Image.open(path) as im:
+            width, height = im.size
+        size, digest = path.stat().st_size, file_hash(path)
+    return {
+        "path": path.relative_to(web_root).as_posix(),
+        "format": FORMATS[path.suffix.lower()],
+        "width": width,
+        "height": height,
+        "bytes": size,
+        "hash": digest,
+    }
+
+
+def load_duplicates(path: Path) -> dict:
+    # {redundant web path: kept web path} from scripts/find_near_duplicates.py; read directly
+    # so the manifest build does not need NumPy
+    data = json.loads(path.read_text())
+    return {d["path"]: c["keep"] for c in data.get("clusters", []) for d in c["duplicates"]}
+
+
+def load_previews(path: Path) -> dict:
+    # {web path: {"hash", "data"}} from scripts/build_previews.py; read directly for the same
+    # reason. A missing or outdated file just means no previews.
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    return data.get("previews", {}) if data.get("format") == "rgba4444" else {}
+
+
+def add_preview(tex: dict, previews: dict) -> dict:
+    # Only attach a preview computed from this exact file
+    entry = (previews or {}).get(tex["path"])
+    if entry and entry.get("hash") == tex["hash"]:
+        tex["preview"] = entry["data"]
+    return tex
+
+
+def scan_category(cat_dir: Path, web_root: Path, problems: list, duplicates: dict = None, index=None, previews: dict = None) -> list:
+    by_stem = {}
+    rows = {}
+    if index is not None:
+        prefix = f"{index.web_path(cat_dir)}/"
+        for r in index.files(prefix, FORMATS):
+            if "/" not in r["path"][len(prefix):]:
+                p = index.path(r)
+                rows[p] = r
+                by_stem.setdefault(p.stem, []).append(p)
+    elif cat_dir.is_dir():
+        for p in sorted(cat_dir.iterdir()):
+            if p.is_file() and p.suffix.lower() in FORMATS:
+                by_stem.setdefault(p.stem, []).append(p)
+    textures = []
+    for stem, paths in sorted(by_stem.items()):
+        paths.sort(key=lambda p: list(FORMATS).index(p.suffix.lower()))
+        keep = (duplicates or {}).get(paths[0].relative_to(web_root).as_posix())
+        if keep:
+            problems.append(f"  duplicate -> {paths[0].relative_to(web_root).as_posix()} (near-duplicate of {keep}, not shipped)")
+            continue
+        for p in paths:
+            try:
+                textures.append(add_preview(describe_texture(p, web_root, rows.get(p)), previews))
+                break
+            except Exception as e:
+                problems.append(f"  unreadable -> {p.relative_to(web_root).as_posix()}: {e}")
+        for p in paths[1:]:
+            problems.append(f"  shadowed -> {p.relative_to(web_root).as_posix()} (not shipped, {paths[0].suffix} preferred)")
+    return textures
+
+
+def build_manifest(assets_dir: Path, report: dict, duplicates: dict = None, index=None, previews: dict = None) -> list:
+    web_root = assets_dir.parent
+    manifest = []
+    for key, meta in CATEGORY_META.items():
+        problems = []
+        textures = scan_category(assets_dir / "trash" / key, web_root, problems, duplicates, index, previews)
+        if not textures:
+            problems.insert(0, "  missing -> no textures listed")
+        if problems:
+            report[key] = problems
+        manifest.append({"key": key, **meta, "textures": textures})
+    return manifest
+
+
+def js_value(v) -> str:
+    if isinstance(v, str):
+        return "'" + v.replace("\\", "\\\\").replace("'", "\\'") + "'"
+    return json.dumps(v)
+
+
+def serialize_manifest(manifest: list) -> str:
+    lines = [
+        "// Generated by scripts/build_trash_manifest.py from the files under assets/trash.",
+        "// Do not edit by hand; re-run the script after adding or removing sprites.",
+        "export const TRASH_CATEGORIES = [",
+    ]
+    for cat in manifest:
+        lines.append("  {")
+        lines.append(f"    key: {js_value(cat['key'])},")
+        lines.append(f"    baseSize: {cat['baseSize']},")
+        lines.append(f"    binKey: {js_value(cat['binKey'])},")
+        lines.append("    textures: [")
+        for tex in cat["textures"]:
+            fields = ", ".join(f"{k}: {js_value(v)}" for k, v in tex.items())
+            lines.append(f"      {{ {fields} }},")
+        lines.append("    ],")
+        lines.append("  },")
+    lines.append("];")
+    lines.append("")
+    lines.append("export default TRASH_CATEGORIES;")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def serialize_report(report: dict) -> str:
+    # No timestamp: the log is committed and a build output, so it only changes when the
+    # report does
+    lines = ["# Missing texture check", ""]
+    for key, problems in report.items():
+        lines.append(f"Category: {key}")
+        lines.extend(problems)
+        lines.append("")
+    if not any("missing ->" in p for problems in report.values() for p in problems):
+        lines.append("All categories have at least one matching texture.")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    # Leaves the file (and its mtime) alone when the content is the same
+    try:
+        if path.read_text() == text:
+            return False
+    except OSError:
+        pass
+    path.write_text(text)
+    return True
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Scan assets/trash and regenerate src/modules/trash-manifest.js.")
+    ap.add_argument("--assets-dir", default="assets", help="Assets root directory (default: assets)")
+    ap.add_argument("--out", default="src/modules/trash-manifest.js", help="Manifest module to write (default: src/modules/trash-manifest.js)")
+    ap.add_argument("--log", default="logs/missing-textures.log", help="Texture report to write (default: logs/missing-textures.log)")
+    ap.add_argument("--exclude-duplicates", nargs="?", const="", metavar="REPORT", help="Leave out sprites listed as redundant in a near-duplicate report (default report: <assets-dir>/near-duplicates.json)")
+    ap.add_argument("--previews", help="Placeholder previews to embed, from scripts/build_previews.py; skipped if the file is missing (default: <assets-dir>/previews.json)")
+    add_index_args(ap)
+    args = ap.parse_args()
+
+    assets_dir = Path(args.assets_dir)
+    if not assets_dir.exists():
+        print(f"Assets dir not found: {assets_dir}")
+        sys.exit(2)
+
+    duplicates = {}
+    if args.exclude_duplicates is not None:
+        dup_path = Path(args.exclude_duplicates) if args.exclude_duplicates else assets_dir / "near-duplicates.json"
+        try:
+            duplicates = load_duplicates(dup_path)
+        except Exception as e:
+            print(f"Could not read near-duplicate report {dup_path}: {e}")
+            sys.exit(2)
+
+    previews = load_previews(Path(args.previews) if args.previews else assets_dir / "previews.json")
+
+    report = {}
+    with index_from_args(args, assets_dir) as index:
+        manifest = build_manifest(assets_dir, report, duplicates, index, previews)
+
+    out_path = Path(args.out)
+    log_path = Path(args.log)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    wrote_out = write_if_changed(out_path, serialize_manifest(manifest))
+    wrote_log = write_if_changed(log_path, serialize_report(report))
+    stamp = datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+    print(f"Missing texture check - {stamp}")
+    for key, problems in report.items():
+        for line in problems:
+            print(f"{key}:{line}")
+    print(f"{'Wrote' if wrote_out else 'Unchanged'} {out_path} ({sum(len(c['textures']) for c in manifest)} textures)")
+    print(f"{'Wrote' if wrote_log else 'Unchanged'} {log_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,14 @@
 import argparse
 import sys
 import os
+import io
+import json
+import hashlib
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+import metrics
+from asset_index import add_index_args, index_from_args
 
 try:
     from PIL import Image
@@ -11,13 +18,260 @@ except Exception as e:
     sys.exit(1)
 
 
-def convert_png_to_webp(src: Path, dst: Path, quality: int = 85, lossless: bool = False):
+DEFAULT_TIERS = "128,256,512,1024"
+# --optimize candidates: lossy qualities, palette sizes for quantized lossless, plus plain lossless
+DEFAULT_SEARCH_QUALITIES = "30,40,50,60,70,80,90"
+DEFAULT_SEARCH_PALETTES = "32,64,128,256"
+DEFAULT_MIN_SSIM = 0.98
+# Ground tiles and building facades are drawn far smaller than their 1024px sources
+DEFAULT_TIER_DIRS = "tiles"
+
+
+def save_webp(im, dst: Path, quality: int = 85, lossless: bool = False, method: int = 6):
     dst.parent.mkdir(parents=True, exist_ok=True)
+    # Ensure RGBA preserved for transparency
+    if im.mode not in ("RGBA", "RGB"):
+        im = im.convert("RGBA")
+    im.save(dst, format="WEBP", quality=quality, lossless=lossless, method=method)
+
+
+@metrics.timed("convert_png_to_webp")
+def convert_png_to_webp(src: Path, dst: Path, quality: int = 85, lossless: bool = False, method: int = 6):
     with Image.open(src) as im:
-        # Ensure RGBA preserved for transparency
-        if im.mode not in ("RGBA", "RGB"):
-            im = im.convert("RGBA")
-        im.save(dst, format="WEBP", quality=quality, lossless=lossless, method=6)
+        save_webp(im, dst, quality=quality, lossless=lossless, method=method)
+    metrics.inc("convert_bytes_in_total", src.stat().st_size)
+    metrics.inc("convert_bytes_out_total", dst.stat().st_size)
+
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+
+
+def encoding_image(im, encoding: dict):
+    # The pixels a given encoding compresses: palette modes are quantized first (no dither,
+    # which suits flat fills and hard outlines), everything else is the source as-is
+    if im.mode not in ("RGBA", "RGB"):
+        im = im.convert("RGBA")
+    if encoding["mode"] == "palette":
+        im = im.quantize(encoding["colors"], method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE).convert(im.mode)
+    return im
+
+
+def encode_webp(im, encoding: dict, method: int = 6) -> bytes:
+    # encoding: {"mode": "lossy", "quality": q} | {"mode": "lossless"} | {"mode": "palette", "colors": n}
+    out = io.BytesIO()
+    lossy = encoding["mode"] == "lossy"
+    encoding_image(im, encoding).save(out, format="WEBP", quality=encoding["quality"] if lossy else 100, lossless=not lossy, method=method)
+    return out.getvalue()
+
+
+def _box_mean(a, r: int):
+    # Mean over a (2r+1)^2 window via summed-area tables; "valid" region only
+    import numpy as np
+    k = 2 * r + 1
+    c = np.pad(a, ((1, 0), (1, 0))).cumsum(0).cumsum(1)
+    return (c[k:, k:] - c[:-k, k:] - c[k:, :-k] + c[:-k, :-k]) / (k * k)
+
+
+def ssim(a, b, r: int = 3) -> float:
+    # Mean SSIM of two single-channel float arrays in [0, 255] over 7x7 windows
+    import numpy as np
+    a = a.astype(np.float64)
+    b = b.astype(np.float64)
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    mu_a, mu_b = _box_mean(a, r), _box_mean(b, r)
+    var_a = _box_mean(a * a, r) - mu_a * mu_a
+    var_b = _box_mean(b * b, r) - mu_b * mu_b
+    cov = _box_mean(a * b, r) - mu_a * mu_b
+    s = ((2 * mu_a * mu_b + c1) * (2 * cov + c2)) / ((mu_a * mu_a + mu_b * mu_b + c1) * (var_a + var_b + c2))
+    return float(s.mean())
+
+
+def image_planes(im):
+    # Luma of the alpha-premultiplied color (what ends up on screen) plus alpha, if any
+    import numpy as np
+    rgba = np.asarray(im.convert("RGBA"), dtype=np.float64)
+    alpha = rgba[..., 3] / 255.0
+    luma = (rgba[..., 0] * 0.299 + rgba[..., 1] * 0.587 + rgba[..., 2] * 0.114) * alpha
+    has_alpha = "A" in im.getbands() and bool((rgba[..., 3] < 255).any())
+    return luma, rgba[..., 3] if has_alpha else None
+
+
+def perceptual_score(ref_planes, im) -> float:
+    luma, alpha = image_planes(im)
+    score = ssim(ref_planes[0], luma)
+    if ref_planes[1] is not None:
+        score = min(score, ssim(ref_planes[1], alpha))
+    return score
+
+
+def search_candidates(qualities, palettes) -> list:
+    return [{"mode": "lossless"}] + [{"mode": "palette", "colors": c} for c in palettes] + [{"mode": "lossy", "quality": q} for q in qualities]
+
+
+def search_encoding(im, min_ssim: float, method: int, qualities, palettes):
+    # Encodes every candidate, then scores from the smallest up; the first one that meets
+    # min_ssim wins, so most candidates are never decoded. Lossless always qualifies.
+    encoded = sorted(((encode_webp(im, enc, method), enc) for enc in search_candidates(qualities, palettes)), key=lambda t: len(t[0]))
+    ref = image_planes(im)
+    for data, enc in encoded:
+        if enc["mode"] == "lossless":
+            return enc, data, 1.0
+        with Image.open(io.BytesIO(data)) as dec:
+            score = perceptual_score(ref, dec)
+        if score >= min_ssim:
+            return enc, data, score
+    return encoded[-1][1], encoded[-1][0], 1.0
+
+
+def tier_path(base: Path, size: int) -> Path:
+    return base.with_name(f"{base.stem}@{size}{base.suffix}")
+
+
+def is_tier(path: Path) -> bool:
+    return "@" in path.stem
+
+
+def write_tiers(im, base: Path, sizes, quality: int = 85, lossless: bool = False, method: int = 6, encoding: dict = None) -> list:
+    # Downsampled variants of an already-decoded image, written next to `base` as name@N.webp.
+    # Tiers at or above the source size are served by the base file itself.
+    written = []
+    w, h = im.size
+    for size in sorted(sizes, reverse=True):
+        if size >= max(w, h):
+            continue
+        scale = size / max(w, h)
+        small = im.resize((max(1, round(w * scale)), max(1, round(h * scale))), Image.LANCZOS, reducing_gap=3.0)
+        dst = tier_path(base, size)
+        if encoding is not None:
+            dst.write_bytes(encode_webp(small, encoding, method))
+        else:
+            save_webp(small, dst, quality=quality, lossless=lossless, method=method)
+        written.append(dst)
+    return written
+
+
+def convert_one(src: Path, quality: int, lossless: bool, method: int, delete_png: bool, tier_sizes=(), optimize: dict = None):
+    # Runs in a worker process: returns (src, dst, error, tiers, choice) instead of printing so
+    # the parent can report results in input order. Tiers come from the same decode as the WebP.
+    # With `optimize`, choice is the sidecar record of the encoding used for this source.
+    dst = src.with_suffix('.webp')
+    tiers = []
+    choice = None
+    try:
+        with Image.open(src) as im:
+            with metrics.stage("decode"):
+                im.load()
+            encoding = None
+            if optimize is not None:
+                digest = file_hash(src)
+                known = optimize.get("known")
+                if known and known.get("hash") == digest:
+                    encoding = {k: known[k] for k in ("mode", "quality", "colors") if k in known}
+                    with metrics.stage("encode"):
+                        data = encode_webp(im, encoding, method)
+                    choice = dict(known, bytes=len(data), searched=False)
+                else:
+                    with metrics.stage("search"):
+                        encoding, data, score = search_encoding(im, optimize["min_ssim"], method, optimize["qualities"], optimize["palettes"])
+                    choice = dict(encoding, hash=digest, ssim=round(score, 5), bytes=len(data), searched=True)
+                dst.write_bytes(data)
+            else:
+                with metrics.stage("encode"):
+                    save_webp(im, dst, quality=quality, lossless=lossless, method=method)
+            if tier_sizes:
+                with metrics.stage("tiers"):
+                    tiers = write_tiers(im, dst, tier_sizes, quality=quality, lossless=lossless, method=method, encoding=encoding)
+        metrics.inc("convert_bytes_in_total", src.stat().st_size)
+        metrics.inc("convert_bytes_out_total", sum(p.stat().st_size for p in [dst] + tiers))
+    except Exception as e:
+        metrics.inc("files_total", outcome="fail")
+        return src, dst, str(e), tiers, None
+    metrics.inc("files_total", outcome="converted")
+    if delete_png:
+        # Only ever delete a PNG whose own WebP was just written
+        try:
+            src.unlink()
+        except Exception:
+            pass
+    return src, dst, None, tiers, choice
+
+
+def tier_one(src: Path, quality: int, lossless: bool, method: int, delete_png: bool, tier_sizes=(), optimize: dict = None):
+    # Tier-only work for WebP sources that have no PNG left to convert
+    try:
+        with Image.open(src) as im:
+            with metrics.stage("decode"):
+                im.load()
+            with metrics.stage("tiers"):
+                tiers = write_tiers(im, src, tier_sizes, quality=quality, lossless=lossless, method=method)
+    except Exception as e:
+        metrics.inc("files_total", outcome="fail")
+        return src, None, str(e), [], None
+    metrics.inc("convert_bytes_in_total", src.stat().st_size)
+    metrics.inc("convert_bytes_out_total", sum(p.stat().st_size for p in tiers))
+    metrics.inc("files_total", outcome="tiered")
+    return src, None, None, tiers, None
+
+
+def run_item(kind: str, *args):
+    # Each item records into its own registry; the parent merges the snapshots, which
+    # works the same whether the item ran here or in a worker process
+    with metrics.scoped() as registry:
+        result = (convert_one if kind == "png" else tier_one)(*args)
+    return result, registry.snapshot()
+
+
+def tiers_stale(base: Path, sizes, row=None) -> bool:
+    # `row` (the base's asset index entry) saves decoding it just to learn its size
+    try:
+        base_mtime = base.stat().st_mtime
+        if row is not None and row["width"] is not None:
+            longest = max(row["width"], row["height"])
+        else:
+            with Image.open(base) as im:
+                longest = max(im.size)
+    except Exception:
+        return True
+    for size in sizes:
+        if size >= longest:
+            continue
+        t = tier_path(base, size)
+        if not t.exists() or t.stat().st_mtime < base_mtime:
+            return True
+    return False
+
+
+def write_tier_manifest(root: Path, tier_dirs, sizes, manifest_path: Path, index=None) -> int:
+    # { "assets/tiles/grass_0.webp": {"width", "height", "tiers": {"128": path, ..., "1024": base}} }
+    # With an up-to-date asset index, dimensions come from it instead of opening every WebP
+    web_root = root.parent
+    manifest = {}
+    for d in tier_dirs:
+        if index is not None:
+            bases = [(index.path(r), (r["width"], r["height"])) for r in index.files(f"{index.web_path(root / d)}/", ['.webp'])]
+        else:
+            bases = [(p, None) for p in sorted((root / d).rglob('*.webp'))]
+        for base, dims in bases:
+            if is_tier(base):
+                continue
+            if dims and dims[0] is not None:
+                w, h = dims
+            else:
+                try:
+                    with Image.open(base) as im:
+                        w, h = im.size
+                except Exception:
+                    continue
+            tiers = {}
+            for size in sorted(sizes):
+                t = base if size >= max(w, h) else tier_path(base, size)
+                if t.exists():
+                    tiers[str(size)] = t.relative_to(web_root).as_posix()
+            manifest[base.relative_to(web_root).as_posix()] = {"width": w, "height": h, "tiers": tiers}
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps(manifest, indent=2) + "\n")
+    return len(manifest)
 
 
 def main():
@@ -25,42 +279,127 @@ def main():
     ap.add_argument("--assets-dir", default="assets", help="Assets root directory to scan (default: assets)")
     ap.add_argument("--quality", type=int, default=85, help="WebP quality (default: 85)")
     ap.add_argument("--lossless", action="store_true", help="Use lossless WebP (may be larger)")
+    ap.add_argument("--method", type=int, default=6, help="WebP encoder effort 0 (fast) .. 6 (smallest, default)")
+    ap.add_argument("--jobs", type=int, default=1, help="Worker processes for encoding (default: 1, 0 = all cores)")
     ap.add_argument("--delete-png", action="store_true", help="Delete PNGs after successful conversion")
+    ap.add_argument("--tiers", default=DEFAULT_TIERS, help=f"Comma-separated max dimensions for downsampled tiers (default: {DEFAULT_TIERS})")
+    ap.add_argument("--tier-dirs", default=DEFAULT_TIER_DIRS, help=f"Comma-separated folders under the assets root that get tiers (default: {DEFAULT_TIER_DIRS})")
+    ap.add_argument("--tier-manifest", help="Where to write the tier manifest (default: <assets-dir>/texture-tiers.json)")
+    ap.add_argument("--no-tiers", action="store_true", help="Skip the tiering stage")
     ap.add_argument("--include-froghole", action="store_true", help="Also convert project-root froghole.png into assets/player/froghole.webp")
+    ap.add_argument("--optimize", action="store_true", help="Per asset, keep the smallest of several encodings (lossy sweep, lossless, palette) that meets --min-ssim")
+    ap.add_argument("--min-ssim", type=float, default=DEFAULT_MIN_SSIM, help=f"Quality floor for --optimize, SSIM vs the PNG (default: {DEFAULT_MIN_SSIM})")
+    ap.add_argument("--search-qualities", default=DEFAULT_SEARCH_QUALITIES, help=f"Lossy qualities tried by --optimize (default: {DEFAULT_SEARCH_QUALITIES})")
+    ap.add_argument("--search-palettes", default=DEFAULT_SEARCH_PALETTES, help=f"Palette sizes tried by --optimize (default: {DEFAULT_SEARCH_PALETTES})")
+    ap.add_argument("--encodings", help="Sidecar of chosen encodings reused by later --optimize runs (default: <assets-dir>/webp-encodings.json)")
+    ap.add_argument("--research", action="store_true", help="Ignore recorded encodings and search again")
+    add_index_args(ap)
+    metrics.add_metrics_args(ap)
     args = ap.parse_args()
+    metrics.metrics_from_args(args)
 
     root = Path(args.assets_dir)
     if not root.exists():
         print(f"Assets dir not found: {root}")
         sys.exit(2)
 
-    converted = 0
-    for p in root.rglob('*.png'):
-        dst = p.with_suffix('.webp')
+    tier_sizes = () if args.no_tiers else tuple(sorted({int(t) for t in args.tiers.split(',') if t.strip()}))
+    tier_dirs = [d.strip().strip('/') for d in args.tier_dirs.split(',') if d.strip()]
+
+    def wants_tiers(p: Path) -> bool:
+        rel = p.relative_to(root).as_posix()
+        return bool(tier_sizes) and any(rel.startswith(d + '/') for d in tier_dirs)
+
+    # Encodings picked by earlier --optimize runs, keyed by web path and source hash
+    encodings_path = Path(args.encodings) if args.encodings else root / 'webp-encodings.json'
+    encodings = {}
+    if args.optimize and encodings_path.exists():
         try:
-            convert_png_to_webp(p, dst, quality=args.quality, lossless=args.lossless)
-            converted += 1
-            print(f"WEBP {dst.relative_to(root)}")
-            if args.delete_png:
-                try:
-                    p.unlink()
-                except Exception:
-                    pass
-        except Exception as e:
-            print(f"FAIL {p}: {e}")
+            encodings = json.loads(encodings_path.read_text())
+        except ValueError:
+            encodings = {}
+
+    def optimize_opts(p: Path):
+        if not args.optimize:
+            return None
+        return {
+            "min_ssim": args.min_ssim,
+            "qualities": [int(q) for q in args.search_qualities.split(',') if q.strip()],
+            "palettes": [int(c) for c in args.search_palettes.split(',') if c.strip()],
+            "known": None if args.research else encodings.get(p.relative_to(root.parent).as_posix()),
+        }
+
+    converted = 0
+    index = index_from_args(args, root)
+    sources = [index.path(r) for r in index.files(f"{index.web_path(root)}/", ['.png'])]
+    work = [("png", p, args.quality, args.lossless, args.method, args.delete_png, tier_sizes if wants_tiers(p) else (), optimize_opts(p)) for p in sources]
+    # WebP-only assets (PNG already converted and deleted) still need their tiers kept current
+    if tier_sizes:
+        indexed = {r["path"] for r in index.files(f"{index.web_path(root)}/", ['.png', '.webp'])}
+        for d in tier_dirs:
+            for r in index.files(f"{index.web_path(root / d)}/", ['.webp']):
+                p = index.path(r)
+                if not is_tier(p) and r["path"][:-5] + '.png' not in indexed and tiers_stale(p, tier_sizes, r):
+                    work.append(("webp", p, args.quality, args.lossless, args.method, False, tier_sizes, None))
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    if args.profile and jobs > 1:
+        # Profilers only see this process
+        print(f"--profile runs the {len(work)} items in this process (ignoring --jobs {jobs})")
+        jobs = 1
+    if jobs <= 1 or len(work) <= 1:
+        results = (run_item(*w) for w in work)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=min(jobs, len(work)))
+        # map() yields in submission order, so output matches a serial run
+        results = pool.map(run_item, *zip(*work))
+    try:
+        for (p, dst, err, tiers, choice), snapshot in results:
+            metrics.REGISTRY.merge(snapshot)
+            if err is not None:
+                print(f"FAIL {p}: {err}")
+                continue
+            if dst is not None:
+                converted += 1
+                if choice is not None:
+                    setting = {"lossy": f"q{choice.get('quality')}", "palette": f"palette{choice.get('colors')}"}.get(choice["mode"], "lossless")
+                    how = f"ssim {choice['ssim']:.4f}" if choice.pop("searched") else "recorded"
+                    print(f"WEBP {dst.relative_to(root)} [{setting}, {choice['bytes']} bytes, {how}]")
+                    encodings[p.relative_to(root.parent).as_posix()] = choice
+                else:
+                    print(f"WEBP {dst.relative_to(root)}")
+            for t in tiers:
+                print(f"TIER {t.relative_to(root)}")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    if args.optimize:
+        encodings_path.write_text(json.dumps(dict(sorted(encodings.items())), indent=2) + "\n")
+        print(f"Wrote {encodings_path} ({len(encodings)} recorded encodings)")
+
+    if tier_sizes:
+        manifest_path = Path(args.tier_manifest) if args.tier_manifest else root / 'texture-tiers.json'
+        index.update(root.name)
+        count = write_tier_manifest(root, tier_dirs, tier_sizes, manifest_path, index)
+        print(f"Wrote {manifest_path} ({count} tiered textures)")
 
     if args.include_froghole:
         src = Path('froghole.png')
         if src.exists():
             dst = root / 'player' / 'froghole.webp'
             try:
-                convert_png_to_webp(src, dst, quality=args.quality, lossless=args.lossless)
+                convert_png_to_webp(src, dst, quality=args.quality, lossless=args.lossless, method=args.method)
                 print(f"WEBP {dst.relative_to(root)} (from project root froghole.png)")
             except Exception as e:
                 print(f"FAIL froghole.png: {e}")
         else:
             print("froghole.png not found in project root; skipping")
 
+    index.update(root.name)
+    index.close()
+    metrics.finish(args)
     print(f"Done. Converted {converted} PNGs under {root}.")
 
 if __name__ == '__main__':
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+import io
+import sys
+import json
+import math
+import time
+import zlib
+import base64
+import random
+import struct
+import hashlib
+import argparse
+import threading
+from email.utils import formatdate
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+try:
+    from PIL import Image, ImageDraw, ImageColor, ImageFilter
+except Exception as e:
+    print("Pillow is required. Install with: pip install pillow")
+    sys.exit(1)
+
+
+IMAGES_PATH = "/v1/images/generations"
+PALETTE = ["#f94144", "#f3722c", "#f8961e", "#f9c74f", "#90be6d", "#43aa8b", "#577590", "#277da1", "#ffffff", "#b5838d"]
+
+
+def cartoon_image(seed: int, size: int = 1024, transparent: bool = False):
+    # Deterministic stand-in for our generated art: flat fills, bold dark outlines, a few
+    # overlapping shapes and little texture, on a flat ground or a transparent canvas
+    rng = random.Random(seed)
+    bg = (0, 0, 0, 0) if transparent else ImageColor.getrgb(rng.choice(PALETTE)) + (255,)
+    im = Image.new("RGBA", (size, size), bg)
+    draw = ImageDraw.Draw(im)
+    outline = (34, 34, 34, 255)
+    width = max(2, size // 128)
+    if not transparent:
+        # faint grid/speckle like the road and pavement tiles
+        step = size // 8
+        for i in range(1, 8):
+            draw.line([(i * step, 0), (i * step, size)], fill=(0, 0, 0, 18), width=max(1, width // 3))
+            draw.line([(0, i * step), (size, i * step)], fill=(0, 0, 0, 18), width=max(1, width // 3))
+        for _ in range(size // 4):
+            x, y = rng.randrange(size), rng.randrange(size)
+            draw.point((x, y), fill=(0, 0, 0, 40))
+    lo, hi = (size // 4, size * 3 // 4) if transparent else (0, size)
+    for _ in range(rng.randint(3, 7)):
+        x0, y0 = rng.randrange(lo, hi), rng.randrange(lo, hi)
+        w, h = rng.randint(size // 12, size // 4), rng.randint(size // 12, size // 4)
+        box = [x0 - w // 2, y0 - h // 2, x0 + w // 2, y0 + h // 2]
+        fill = rng.choice(PALETTE)
+        kind = rng.random()
+        if kind < 0.4:
+            draw.ellipse(box, fill=fill, outline=outline, width=width)
+        elif kind < 0.7:
+            draw.rounded_rectangle(box, radius=w // 6, fill=fill, outline=outline, width=width)
+        else:
+            pts = [(x0 + rng.randint(-w, w) // 2, y0 + rng.randint(-h, h) // 2) for _ in range(rng.randint(3, 6))]
+            draw.polygon(pts, fill=fill, outline=outline, width=width)
+    # Soft painterly grain so encoders see realistic entropy, not perfectly flat fills
+    grain = Image.frombytes("L", (size, size), rng.randbytes(size * size)).filter(ImageFilter.GaussianBlur(1.2))
+    rgb = Image.blend(im.convert("RGB"), Image.merge("RGB", (grain, grain, grain)), 0.08)
+    if not transparent:
+        return rgb
+    rgb.putalpha(im.getchannel("A"))
+    return rgb
+
+
+def encode_png(im) -> bytes:
+    out = io.BytesIO()
+    im.save(out, format="PNG")
+    return out.getvalue()
+
+
+def pad_png(data: bytes, min_bytes: int) -> bytes:
+    # Grows a PNG to at least min_bytes with a private ancillary chunk ("paDd") right
+    # after IHDR; decoders skip it, so the image is unchanged and only the payload grows
+    missing = min_bytes - len(data)
+    if missing <= 0:
+        return data
+    body = random.Random(len(data)).randbytes(max(0, missing - 12))
+    chunk = struct.pack(">I", len(body)) + b"paDd" + body + struct.pack(">I", zlib.crc32(b"paDd" + body))
+    return data[:33] + chunk + data[33:]
+
+
+def parse_size(value: str, default: int = 1024) -> int:
+    try:
+        w, h = (int(v) for v in str(value).lower().split("x"))
+        return max(w, h)
+    except ValueError:
+        return default
+
+
+class ImagePool:
+    # A handful of pre-rendered PNGs per size; requests pick deterministically from them so
+    # serving costs nothing compared to what the client does with the bytes
+    def __init__(self, count: int = 8, size_override: int = 0, min_bytes: int = 0):
+        self.count = max(1, count)
+        self.size_override = size_override
+        self.min_bytes = min_bytes
+        self.lock = threading.Lock()
+        self.pools = {}
+
+    def b64(self, prompt: str, index: int, size: int) -> str:
+        size = self.size_override or size
+        with self.lock:
+            pool = self.pools.get(size)
+            if pool is None:
+                pool = self.pools[size] = [base64.b64encode(pad_png(encode_png(cartoon_image(i, size, transparent=i % 2 == 1)), self.min_bytes)).decode() for i in range(self.count)]
+        pick = int.from_bytes(hashlib.sha256(f"{prompt}\0{index}".encode()).digest()[:4], "big")
+        return pool[pick % self.count]
+
+
+def parse_latency(spec: str):
+    # Latency distribution -> function(rng) -> seconds. Forms: "0.2" or "fixed:0.2",
+    # "uniform:LO,HI", "normal:MEAN,SD", "lognormal:MEDIAN,SIGMA", "exp:MEAN" and
+    # "pareto:MIN,ALPHA" (heavy tail: most requests near MIN, a few far beyond it)
+    kind, _, rest = str(spec).partition(":")
+    if not rest:
+        kind, rest = "fixed", kind
+    try:
+        a = [float(v) for v in rest.split(",")]
+    except ValueError:
+        raise ValueError(f"bad latency {spec!r}")
+    forms = {
+        "fixed": (1, lambda rng: a[0]),
+        "uniform": (2, lambda rng: rng.uniform(a[0], a[1])),
+        "normal": (2, lambda rng: rng.gauss(a[0], a[1])),
+        "lognormal": (2, lambda rng: rng.lognormvariate(math.log(a[0]), a[1]) if a[0] > 0 else 0.0),
+        "exp": (1, lambda rng: rng.expovariate(1 / a[0]) if a[0] > 0 else 0.0),
+        "pareto": (2, lambda rng: a[0] * rng.paretovariate(a[1])),
+    }
+    if kind not in forms or len(a) != forms[kind][0]:
+        raise ValueError(f"bad latency {spec!r} (use S, fixed:S, uniform:LO,HI, normal:MEAN,SD, lognormal:MEDIAN,SIGMA, exp:MEAN or pareto:MIN,ALPHA)")
+    sample = forms[kind][1]
+    return lambda rng: max(0.0, sample(rng))
+
+
+def parse_retry_after(spec: str):
+    # Retry-After on 429/503 answers: seconds, "date:SECONDS" for the HTTP-date form, or
+    # "none" to leave it out. Returns function(seconds override or None) -> header or None
+    spec = str(spec)
+    if spec == "none":
+        return lambda wait=None: None
+    as_date = spec.startswith("date:")
+    try:
+        default = float(spec[5:] if as_date else spec)
+    except ValueError:
+        raise ValueError(f"bad Retry-After {spec!r} (use SECONDS, date:SECONDS or none)")
+
+    def header(wait=None):
+        wait = default if wait is None else wait
+        if as_date:
+            return formatdate(time.time() + math.ceil(wait), usegmt=True)
+        return f"{wait:g}" if wait == int(wait) else f"{wait:.2f}"
+    return header
+
+
+class Faults:
+    # What happens to each request before it is answered: a sampled delay, then possibly
+    # a 429 (random, or because --max-rps is exceeded), a 500/502/503, or a 200 carrying
+    # fewer images than asked for. Draws come from one seeded RNG, so a sequential client
+    # sees the same sequence every run.
+
+    def __init__(self, latency: str = "0", latency_per_image: str = "0", rate_429: float = 0.0, rate_5xx: float = 0.0, rate_short: float = 0.0, retry_after: str = "1", max_rps: float = 0.0, seed: int = 0):
+        self.latency = parse_latency(latency)
+        self.latency_per_image = parse_latency(latency_per_image)
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.rate_short = rate_short
+        self.retry_after = parse_retry_after(retry_after)
+        self.max_rps = max_rps
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        # --max-rps is a token bucket holding one second's worth of requests
+        self.tokens = max(1.0, max_rps)
+        self.updated = time.monotonic()
+
+    def over_limit(self) -> float:
+        # Seconds until the next request would be admitted; 0 takes a token
+        if self.max_rps <= 0:
+            return 0.0
+        now = time.monotonic()
+        self.tokens = min(max(1.0, self.max_rps), self.tokens + (now - self.updated) * self.max_rps)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.max_rps
+
+    def decide(self, n: int) -> tuple:
+        # -> (delay seconds, error status or 0, extra headers, images to return)
+        with self.lock:
+            delay = self.latency(self.rng)
+            wait = self.over_limit()
+            if wait:
+                return delay, 429, self.headers(wait), 0
+            roll = self.rng.random()
+            if roll < self.rate_429:
+                return delay, 429, self.headers(), 0
+            if roll < self.rate_429 + self.rate_5xx:
+                status = self.rng.choice((500, 502, 503))
+                return delay, status, self.headers() if status == 503 else {}, 0
+            if self.rng.random() < self.rate_short:
+                n = self.rng.randrange(n)
+            return delay + sum(self.latency_per_image(self.rng) for _ in range(n)), 0, {}, n
+
+    def headers(self, wait: float = None) -> dict:
+        value = self.retry_after(wait)
+        return {"Retry-After": value} if value is not None else {}
+
+
+ERROR_BODIES = {
+    429: ("Rate limit reached for images per minute. Please try again later.", "requests", "rate_limit_exceeded"),
+    500: ("The server had an error processing your request.", "server_error", None),
+    502: ("Bad gateway.", "server_error", None),
+    503: ("The engine is currently overloaded, please try again later.", "server_error", None),
+}
+
+
+class FakeImageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeImageAPI/1.0"
+    # Headers and body go out as separate writes; with Nagle on, the body waits for the
+    # client's delayed ACK and every response picks up ~40ms that is not in the fault model
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def send_json(self, status: int, body: dict, headers: dict = None):
+        data = json.dumps(body).encode()
+        with self.server.stats_lock:
+            stats = self.server.stats
+            stats["bytes"] += len(data)
+            stats["statuses"][str(status)] = stats["statuses"].get(str(status), 0) + 1
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_api_error(self, status: int, message: str, kind: str = "invalid_request_error", headers: dict = None, code: str = None):
+        self.send_json(status, {"error": {"message": message, "type": kind, "param": None, "code": code}}, headers)
+
+    def do_GET(self):
+        # Not part of the real API: counters for load tests, e.g. diffed around a run
+        if self.path.split("?", 1)[0] != "/stats":
+            self.send_api_error(404, f"Unknown path {self.path}")
+            return
+        with self.server.stats_lock:
+            stats = json.loads(json.dumps(self.server.stats))
+        data = json.dumps(stats).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        if self.path.split("?", 1)[0] != IMAGES_PATH:
+            self.send_api_error(404, f"Unknown path {self.path}")
+            return
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            self.send_api_error(401, "Missing bearer token", kind="authentication_error")
+            return
+        try:
+            req = json.loads(raw or b"{}")
+            prompt = str(req["prompt"])
+        except (ValueError, KeyError):
+            self.send_api_error(400, "Body must be JSON with a 'prompt'")
+            return
+        n = int(req.get("n") or 1)
+        if not 1 <= n <= 10:
+            self.send_api_error(400, "n must be between 1 and 10")
+            return
+        size = parse_size(req.get("size", "1024x1024"))
+        delay, status, headers, served = self.server.faults.decide(n)
+        with self.server.stats_lock:
+            self.server.stats["requests"] += 1
+            self.server.stats["images"] += 0 if status else served
+            self.server.stats["short"] += 0 if status or served == n else 1
+            self.server.stats["delay_s"] = round(self.server.stats["delay_s"] + delay, 6)
+        if delay:
+            time.sleep(delay)
+        if status:
+            message, kind, code = ERROR_BODIES[status]
+            self.send_api_error(status, message, kind=kind, headers=headers, code=code)
+            return
+        data = [{"b64_json": self.server.pool.b64(prompt, i, size)} for i in range(served)]
+        self.send_json(200, {"created": int(time.time()), "data": data})
+
+
+def make_server(host: str = "127.0.0.1", port: int = 0, pool_size: int = 8, image_size: int = 0, quiet: bool = True, faults: Faults = None, min_bytes: int = 0) -> ThreadingHTTPServer:
+    # port=0 binds a free port; read it back from server.server_address
+    server = ThreadingHTTPServer((host, port), FakeImageHandler)
+    server.daemon_threads = True
+    server.quiet = quiet
+    server.pool = ImagePool(pool_size, image_size, min_bytes)
+    server.faults = faults or Faults()
+    server.stats = {"requests": 0, "images": 0, "short": 0, "bytes": 0, "delay_s": 0.0, "statuses": {}}
+    server.stats_lock = threading.Lock()
+    return server
+
+
+def start_background(**kwargs) -> ThreadingHTTPServer:
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_fault_args(parser, image_size: int = 0):
+    parser.add_argument("--pool", type=int, default=8, help="Distinct images rendered per size (default: 8)")
+    parser.add_argument("--image-size", type=int, default=image_size, help=f"Force this image size instead of the requested one (default: {image_size or 'as requested'})")
+    parser.add_argument("--response-kb", type=int, default=0, help="Pad each PNG to at least this many KiB (default: 0 = as encoded)")
+    parser.add_argument("--latency", default="0", help="Delay per request in seconds or a distribution: uniform:LO,HI, normal:MEAN,SD, lognormal:MEDIAN,SIGMA, exp:MEAN, pareto:MIN,ALPHA (default: 0)")
+    parser.add_argument("--latency-per-image", default="0", help="Extra delay per image returned, same forms as --latency (default: 0)")
+    parser.add_argument("--error-429", type=float, default=0.0, help="Fraction of requests answered 429 (default: 0)")
+    parser.add_argument("--error-5xx", type=float, default=0.0, help="Fraction of requests answered 500/502/503 (default: 0)")
+    parser.add_argument("--short", type=float, default=0.0, help="Fraction of successful requests returning fewer images than n (default: 0)")
+    parser.add_argument("--retry-after", default="1", help="Retry-After on 429/503: seconds, date:SECONDS (HTTP-date form) or none (default: 1)")
+    parser.add_argument("--max-rps", type=float, default=0.0, help="Answer 429 beyond this many requests per second, Retry-After set to the wait (default: 0 = no limit)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for latency and fault draws (default: 0)")
+
+
+def server_kwargs(args) -> dict:
+    # make_server() keyword arguments from add_fault_args(); bad specs raise ValueError
+    faults = Faults(args.latency, args.latency_per_image, args.error_429, args.error_5xx, args.short, args.retry_after, args.max_rps, args.seed)
+    return {"pool_size": args.pool, "image_size": args.image_size, "faults": faults, "min_bytes": args.response_kb * 1024}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local stand-in for the OpenAI Images API returning deterministic synthetic images.")
+    ap.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    ap.add_argument("--port", type=int, default=8765, help="Port (default: 8765)")
+    ap.add_argument("--verbose", action="store_true", help="Log every request")
+    add_fault_args(ap)
+    args = ap.parse_args()
+
+    try:
+        kwargs = server_kwargs(args)
+    except ValueError as e:
+        print(f"Bad fault options: {e}")
+        sys.exit(2)
+    server = make_server(args.host, args.port, quiet=not args.verbose, **kwargs)
+    host, port = server.server_address[:2]
+    print(f"Fake image API on http://{host}:{port} (use --api-base http://{host}:{port})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        stats = server.stats
+        print(f"Served {stats['requests']} requests, {stats['images']} images, {stats['bytes']} bytes; statuses {json.dumps(stats['statuses'], sort_keys=True)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+import sys
+import json
+import argparse
+from pathlib import Path
+
+from asset_index import add_index_args, index_from_args
+
+try:
+    import numpy as np
+    from PIL import Image
+except Exception as e:
+    print("NumPy and Pillow are required. Install with: pip install numpy pillow")
+    sys.exit(1)
+
+
+DEFAULT_DIRS = "trash,tiles,player,interactables"
+DEFAULT_REPORT = "near-duplicates.json"
+IMAGE_EXTS = (".webp", ".png", ".jpg", ".jpeg")
+HASH_SIZE = 8
+SAMPLE_SIZE = 32
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    # Orthonormal DCT-II basis: dct(x) = D @ x
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    d = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    d[0] /= np.sqrt(2.0)
+    return d
+
+
+DCT = _dct_matrix(SAMPLE_SIZE)
+
+
+def phash(im) -> int:
+    # 64-bit DCT perceptual hash. Sprites are flattened onto mid gray so the silhouette
+    # counts, not whatever color hides under transparent pixels.
+    if "A" in im.getbands() or "transparency" in im.info:
+        rgba = im.convert("RGBA")
+        bg = Image.new("RGBA", rgba.size, (128, 128, 128, 255))
+        im = Image.alpha_composite(bg, rgba)
+    gray = np.asarray(im.convert("L").resize((SAMPLE_SIZE, SAMPLE_SIZE), Image.LANCZOS), dtype=np.float64)
+    coeffs = (DCT @ gray @ DCT.T)[:HASH_SIZE, :HASH_SIZE].ravel()
+    # DC term only says how bright the image is; compare the rest against their median
+    bits = coeffs > np.median(coeffs[1:])
+    return int("".join("1" if b else "0" for b in bits), 2)
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    # Metric tree over Hamming distance: a radius query only descends into children whose
+    # edge distance lies within [d - radius, d + radius] of the query's distance to the node
+    def __init__(self):
+        self.root = None
+
+    def add(self, value: int, item):
+        node = [value, item, {}]
+        if self.root is None:
+            self.root = node
+            return
+        cur = self.root
+        while True:
+            d = hamming(value, cur[0])
+            child = cur[2].get(d)
+            if child is None:
+                cur[2][d] = node
+                return
+            cur = child
+
+    def query(self, value: int, radius: int) -> list:
+        out = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            node = stack.pop()
+            d = hamming(value, node[0])
+            if d <= radius:
+                out.append((d, node[1]))
+            stack.extend(child for edge, child in node[2].items() if d - radius <= edge <= d + radius)
+        return out
+
+
+def collect_images(root: Path, dirs, index=None) -> list:
+    # One file per stem, WebP preferred, as the manifest would ship it; tiers are skipped
+    by_stem = {}
+    for d in dirs:
+        if index is not None:
+            found = [index.path(r) for r in index.files(f"{index.web_path(root / d)}/", IMAGE_EXTS)]
+        else:
+            found = sorted((root / d).rglob("*"))
+        for p in found:
+            if p.suffix.lower() in IMAGE_EXTS and "@" not in p.stem:
+                by_stem.setdefault(p.with_suffix(""), []).append(p)
+    picked = []
+    for stem, paths in sorted(by_stem.items()):
+        paths.sort(key=lambda p: IMAGE_EXTS.index(p.suffix.lower()))
+        picked.append(paths[0])
+    return picked
+
+
+def cluster(hashes: dict, radius: int) -> list:
+    # Leader clustering: in path order, each unclaimed image keeps itself and claims every
+    # unclaimed image within `radius` of it. Unlike single linkage this never chains, so
+    # every dropped file is close to the one that stays.
+    tree = BKTree()
+    for path, h in hashes.items():
+        tree.add(h, path)
+    claimed = set()
+    clusters = []
+    for keep in sorted(hashes):
+        if keep in claimed:
+            continue
+        claimed.add(keep)
+        dups = sorted((p, d) for d, p in tree.query(hashes[keep], radius) if p not in claimed)
+        claimed.update(p for p, _ in dups)
+        if dups:
+            clusters.append({"keep": keep, "duplicates": [{"path": p, "distance": d} for p, d in dups]})
+    return clusters
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Find near-duplicate images under assets/ with DCT perceptual hashes.")
+    ap.add_argument("--assets-dir", default="assets", help="Assets root directory (default: assets)")
+    ap.add_argument("--dirs", default=DEFAULT_DIRS, help=f"Comma-separated folders under the assets root to scan (default: {DEFAULT_DIRS})")
+    ap.add_argument("--max-distance", type=int, default=8, help="Hashes within this many differing bits (of 64) are near-duplicates (default: 8)")
+    ap.add_argument("--report", help=f"Where to write the cluster report (default: <assets-dir>/{DEFAULT_REPORT})")
+    ap.add_argument("--dry-run", action="store_true", help="Print clusters without writing the report")
+    add_index_args(ap)
+    args = ap.parse_args()
+
+    root = Path(args.assets_dir)
+    if not root.exists():
+        print(f"Assets dir not found: {root}")
+        sys.exit(2)
+    web_root = root.parent
+    dirs = [d.strip() for d in args.dirs.split(",") if d.strip()]
+
+    with index_from_args(args, root) as index:
+        images = collect_images(root, dirs, index)
+    hashes = {}
+    for p in images:
+        key = p.relative_to(web_root).as_posix()
+        try:
+            with Image.open(p) as im:
+                hashes[key] = phash(im)
+        except Exception as e:
+            print(f"FAIL {key}: {e}")
+
+    clusters = cluster(hashes, args.max_distance)
+    redundant = 0
+    saved = 0
+    for c in clusters:
+        print(f"KEEP {c['keep']}")
+        for d in c["duplicates"]:
+            size = (web_root / d["path"]).stat().st_size
+            redundant += 1
+            saved += size
+            print(f"  DUP {d['path']} (distance {d['distance']}, {size} bytes)")
+    print(f"{len(hashes)} images, {len(clusters)} clusters, {redundant} redundant ({saved} bytes)")
+
+    if not args.dry_run:
+        report_path = Path(args.report) if args.report else root / DEFAULT_REPORT
+        report = {
+            "maxDistance": args.max_distance,
+            "hashes": {k: f"{v:016x}" for k, v in sorted(hashes.items())},
+            "clusters": clusters,
+        }
+        report_path.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Wrote {report_path}")
+
+
+if __name__ == "__main__":
+    main()
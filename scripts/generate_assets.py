@@ -1,103 +1,133 @@
 #!/usr/bin/env python3
 import os
 import sys
-import json
-import time
-import base64
+import io
 import argparse
-import random
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
-try:
-    from urllib import request
-except Exception:
-    print("Python stdlib urllib not available; cannot proceed.")
-    sys.exit(1)
-
-
-STYLE = "bright flat 2D cartoon, bold outlines, kid-friendly, no humans"
-
-TILE_PROMPTS = [
-    ("tiles/asphalt_{}.png", "Top-down city asphalt road background tile with subtle worn grid lines and faint road speckles, {}"),
-    ("tiles/concrete_{}.png", "Top-down concrete pavement sidewalk tile with mild texture, {}, seamless"),
-    ("tiles/grass_{}.png", "Top-down park grass background tile with a few scattered bushes, {}, seamless"),
-    ("tiles/building_wall_{}.png", "Top-down compatible building wall texture (flat facade pattern usable as tile), clean stucco or brick, {}, seamless"),
-    ("tiles/bush_{}.png", "Top-down bush cluster patch with soft edges, transparent background, {}"),
-]
-
-PLAYER_PROMPTS = [
-    ("player/hole_decal.png", "Top-down black circular hole decal with soft, subtle outer ring, transparent background, {}"),
-]
-
-TRASH_CATEGORIES = {
-    "bottles": "Assorted plastic bottles (small), top-down small sprite, transparent background, {}",
-    "cans": "Assorted soda cans (small), top-down small sprite, transparent background, {}",
-    "newspapers": "Folded newspapers (small stacks), top-down small sprite, transparent background, {}",
-    "plastic_bags": "Crumpled plastic grocery bags, top-down small sprite, transparent background, {}",
-    "coffee_cups": "Disposable coffee cups with lids, top-down small sprite, transparent background, {}",
-    "food_wrappers": "Candy/chip food wrappers, top-down small sprite, transparent background, {}",
-    "fruit_peels": "Banana/orange fruit peels, top-down small sprite, transparent background, {}",
-}
-
-
-def http_post_json(url: str, payload: dict, headers: dict, timeout_s: int = 180) -> dict:
-    req = request.Request(url, method="POST")
-    req.add_header("Content-Type", "application/json")
-    # Helpful UA for observability
-    req.add_header("User-Agent", "recyclehole-asset-gen/1.0")
-    for k, v in headers.items():
-        req.add_header(k, v)
-    data = json.dumps(payload).encode("utf-8")
-    try:
-        with request.urlopen(req, data=data, timeout=timeout_s) as resp:
-            body = resp.read()
-            return json.loads(body)
-    except Exception as e:
-        # Try to extract response body if present (HTTPError)
-        if hasattr(e, 'read'):
-            try:
-                body = e.read().decode('utf-8', errors='ignore')
-                return json.loads(body)
-            except Exception:
-                pass
-        raise
-
-
-def generate_image(prompt: str, out_path: Path, api_key: str, size: str = "1024x1024", retry: int = 2, model: str = "gpt-image-1", timeout_s: int = 180, sleep_ms: int = 0):
-    out_path.parent.mkdir(parents=True, exist_ok=True)
+from api_client import TokenBucket, HTTPClient, request_images, add_client_args, client_from_args
+from image_cache import cache_key, add_cache_args, cache_from_args
+from asset_spec import load_spec, image_tasks
+import metrics
+
+# Prompts, output paths and variation counts live in scripts/asset_spec.json
+SPEC = load_spec()
+SETS = ("tiles", "player", "trash")
+TRASH_MAX_VARIATIONS = 10
+
+
+def rescale_image_bytes(raw: bytes, max_px: int):
+    # In-memory downscale of an encoded image; returns (png bytes, (w, h)) or None if already small enough
+    from PIL import Image
+    with metrics.stage("rescale"), Image.open(io.BytesIO(raw)) as im:
+        w, h = im.size
+        if max(w, h) <= max_px:
+            return None
+        if w >= h:
+            nw = max_px
+            nh = int(h * (max_px / w))
+        else:
+            nh = max_px
+            nw = int(w * (max_px / h))
+        im = im.resize((nw, nh), Image.LANCZOS)
+        out = io.BytesIO()
+        im.save(out, format="PNG", optimize=True)
+        return out.getvalue(), (nw, nh)
+
+
+def write_output(out_path: Path, raw: bytes, rescale: int, log=print, pipeline=None):
+    if pipeline is not None:
+        # One decode feeds the rescale, the PNG and every derived output
+        from image_pipeline import Rescale, Png
+        for line in pipeline.process_bytes(raw, out_path, before=([Rescale(rescale)] if rescale else []) + [Png()]):
+            log(line)
+        return
+    if rescale:
+        try:
+            scaled = rescale_image_bytes(raw, rescale)
+        except Exception as e:
+            scaled = None
+            log(f"rescale failed for {out_path}: {e}")
+            metrics.inc("rescale_total", outcome="fail")
+        if scaled is not None:
+            raw, (nw, nh) = scaled
+            log(f"rescaled {out_path} -> {nw}x{nh}")
+            metrics.inc("rescale_total", outcome="ok")
+    with metrics.stage("write"):
+        tmp = out_path.with_name(out_path.name + ".part")
+        tmp.write_bytes(raw)
+        os.replace(tmp, out_path)
+
+
+@metrics.timed("generate")
+def generate_batch(prompt: str, slots, api_key: str, size: str = "1024x1024", retry: int = 2, model: str = "gpt-image-1", timeout_s: int = 180, sleep_ms: int = 0, client: HTTPClient = None, limiter: TokenBucket = None, log=print, cache=None, refresh_cache: bool = False, rescale: int = 0, pipeline=None) -> list:
+    # Variations of one prompt share a single request with n=len(slots); slots are
+    # (out_path, variation) pairs and data[i] fills the i-th slot still missing after
+    # the cache. Returns a success flag per slot.
+    ok = [False] * len(slots)
+    keys = [None] * len(slots)
+    missing = []
+    for i, (out_path, variation) in enumerate(slots):
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        if cache is not None:
+            keys[i] = cache_key(model, prompt, size, variation)
+            raw = None if refresh_cache else cache.get(keys[i])
+            if raw is not None:
+                try:
+                    write_output(out_path, raw, rescale, log=log, pipeline=pipeline)
+                except Exception as e:
+                    # Requested again below, like a miss
+                    log(f"FAIL -> {out_path} (cache {keys[i][:12]}): {e}")
+                    missing.append(i)
+                    continue
+                log(f"HIT -> {out_path} (cache {keys[i][:12]})")
+                metrics.inc("images_total", outcome="cache_hit")
+                ok[i] = True
+                continue
+        missing.append(i)
+    if not missing:
+        return ok
+
+    client = client or metrics.instrument_client(HTTPClient(timeout_s=timeout_s))
     payload = {
         "model": model,
         "prompt": prompt,
-        "n": 1,
         "size": size,
     }
+    if model.startswith("dall-e"):
+        # Older models answer with URLs unless asked for the image data
+        payload["response_format"] = "b64_json"
     headers = {"Authorization": f"Bearer {api_key}"}
+    first = slots[missing[0]][0]
+    label = str(first) if len(missing) == 1 else f"{first} (+{len(missing) - 1} more)"
+    images, last_err = request_images(client, payload, len(missing), headers, retries=retry, sleep_ms=sleep_ms, limiter=limiter, log=log, label=label, timeout_s=timeout_s)
 
-    last_err = None
-    for attempt in range(retry + 1):
-        if sleep_ms > 0 and attempt == 0:
-            time.sleep(sleep_ms / 1000.0)
-        elif attempt > 0:
-            # exponential backoff with jitter
-            backoff = (2 ** (attempt - 1)) + random.random()
-            time.sleep(backoff)
+    # Images are decoded while downloading, post-processed in memory and written once
+    for i, raw in zip(missing, images):
+        out_path, variation = slots[i]
         try:
-            resp = http_post_json("https://api.openai.com/v1/images/generations", payload, headers, timeout_s=timeout_s)
-            if 'error' in resp:
-                raise RuntimeError(resp['error'].get('message', 'unknown error'))
-            b64 = resp["data"][0]["b64_json"]
-            raw = base64.b64decode(b64)
-            with open(out_path, "wb") as f:
-                f.write(raw)
-            print(f"OK  -> {out_path}")
-            return True
+            write_output(out_path, raw, rescale, log=log, pipeline=pipeline)
         except Exception as e:
-            last_err = e
-            print(f"ERR ({attempt+1}/{retry+1}) {out_path}: {e}")
-    print(f"FAIL -> {out_path}: {last_err}")
-    return False
+            log(f"FAIL -> {out_path}: {e}")
+            metrics.inc("images_total", outcome="fail")
+            continue
+        log(f"OK  -> {out_path}")
+        metrics.inc("images_total", outcome="ok")
+        ok[i] = True
+        if cache is not None:
+            cache.put(keys[i], raw, {"model": model, "prompt": prompt, "size": size, "variation": variation})
+    for i in missing[len(images):]:
+        log(f"FAIL -> {slots[i][0]}: {last_err}")
+        metrics.inc("images_total", outcome="fail")
+    return ok
+
+
+def generate_image(prompt: str, out_path: Path, api_key: str, size: str = "1024x1024", retry: int = 2, model: str = "gpt-image-1", timeout_s: int = 180, sleep_ms: int = 0, client: HTTPClient = None, limiter: TokenBucket = None, log=print, cache=None, variation: int = 0, refresh_cache: bool = False, rescale: int = 0, pipeline=None):
+    return generate_batch(prompt, [(out_path, variation)], api_key, size=size, retry=retry, model=model, timeout_s=timeout_s, sleep_ms=sleep_ms, client=client, limiter=limiter, log=log, cache=cache, refresh_cache=refresh_cache, rescale=rescale, pipeline=pipeline)[0]
 
 
+@metrics.timed("rescale_file")
 def try_rescale_png(path: Path, max_px: int):
     try:
         from PIL import Image
@@ -105,27 +135,23 @@ def try_rescale_png(path: Path, max_px: int):
         print("Pillow not installed; skipping rescale.")
         return
     try:
-        with Image.open(path) as im:
-            w, h = im.size
-            if max(w, h) <= max_px:
-                return
-            if w >= h:
-                nw = max_px
-                nh = int(h * (max_px / w))
-            else:
-                nh = max_px
-                nw = int(w * (max_px / h))
-            im = im.resize((nw, nh), Image.LANCZOS)
-            im.save(path, optimize=True)
-            print(f"rescaled {path} -> {nw}x{nh}")
+        scaled = rescale_image_bytes(path.read_bytes(), max_px)
+        if scaled is None:
+            metrics.inc("rescale_total", outcome="unchanged")
+            return
+        raw, (nw, nh) = scaled
+        path.write_bytes(raw)
+        print(f"rescaled {path} -> {nw}x{nh}")
+        metrics.inc("rescale_total", outcome="ok")
     except Exception as e:
         print(f"rescale failed for {path}: {e}")
+        metrics.inc("rescale_total", outcome="fail")
 
 
 def main():
     parser = argparse.ArgumentParser(description="Generate 1024x1024 PNG assets via OpenAI Images API.")
     parser.add_argument("--out", default="assets", help="Output directory root (default: assets)")
-    parser.add_argument("--tile-variations", type=int, default=2, help="Variations per tile type (default: 2)")
+    parser.add_argument("--tile-variations", type=int, help="Variations per tile type (default: the spec's count)")
     parser.add_argument("--trash-min", type=int, default=5, help="Min variations per trash category (default: 5)")
     parser.add_argument("--trash-max", type=int, default=8, help="Max variations per trash category (default: 8)")
     parser.add_argument("--rescale", type=int, default=0, help="Optional max dimension to rescale PNGs after generation (e.g., 512). 0 disables")
@@ -133,9 +159,17 @@ def main():
     parser.add_argument("--dry-run", action="store_true", help="Print the files that would be generated without calling the API")
     parser.add_argument("--timeout", type=int, default=180, help="Per-request timeout seconds (default: 180)")
     parser.add_argument("--retries", type=int, default=3, help="Max retries per image (default: 3)")
-    parser.add_argument("--sleep-ms", type=int, default=250, help="Sleep milliseconds before each request (default: 250)")
+    parser.add_argument("--sleep-ms", type=int, default=250, help="Sleep milliseconds before each request (default: 250; sequential mode only)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Number of requests in flight at once (default: 1 = sequential)")
+    parser.add_argument("--rate", type=float, default=1.0, help="Max requests per second across all workers when --concurrency > 1 (default: 1.0, 0 disables)")
+    parser.add_argument("--burst", type=int, default=1, help="Requests allowed back-to-back before --rate applies (default: 1)")
+    parser.add_argument("--batch-size", type=int, default=1, help="Variations of the same prompt fetched per request via n>1 (default: 1; dall-e-3 only supports 1)")
     parser.add_argument("--skip-existing", action="store_true", default=True, help="Skip images that already exist (default: true)")
     parser.add_argument("--overwrite", action="store_true", help="Force re-generate even if file exists")
+    parser.add_argument("--pipeline", metavar="STEPS", help="Also derive outputs from each new image before it leaves memory, e.g. trim,webp,tiers (see scripts/image_pipeline.py; NumPy)")
+    add_client_args(parser)
+    add_cache_args(parser)
+    metrics.add_metrics_args(parser)
     args = parser.parse_args()
 
     api_key = os.environ.get("OPENAI_API_KEY")
@@ -145,45 +179,95 @@ def main():
 
     out_root = Path(args.out)
     out_root.mkdir(parents=True, exist_ok=True)
+    cache = cache_from_args(args)
+    client = client_from_args(args)
+    metrics.metrics_from_args(args)
+    pipeline = None
+    if args.pipeline and not args.dry_run:
+        from image_pipeline import Pipeline, Sidecars, parse_steps
+        sidecars = Sidecars(out_root)
+        try:
+            pipeline = Pipeline(out_root, parse_steps(args.pipeline, previous_trim=dict(sidecars.trim)), sidecars)
+        except ValueError as e:
+            print(f"Bad --pipeline: {e}")
+            sys.exit(2)
 
-    generated = []
+    # Freshly generated images are rescaled in memory; only pre-existing files need a second pass
+    existing = []
 
     # Build task list for deterministic progress
     tasks = []
-    for rel_tmpl, prompt_tmpl in TILE_PROMPTS:
-        for i in range(max(1, args.tile_variations)):
-            rel = rel_tmpl.format(i)
-            styled_prompt = prompt_tmpl.format(STYLE)
-            tasks.append((rel, styled_prompt))
-    for rel, prompt_tmpl in PLAYER_PROMPTS:
-        tasks.append((rel, prompt_tmpl.format(STYLE)))
-    for cat, prompt_tmpl in TRASH_CATEGORIES.items():
-        n = max(args.trash_min, min(args.trash_max, 10))
-        for i in range(n):
-            rel = f"trash/{cat}/{cat}_{i}.png"
-            tasks.append((rel, prompt_tmpl.format(STYLE)))
+    # --trash-min/--trash-max override the spec's count (which matches the default of 8)
+    counts = {"tiles": args.tile_variations, "trash": max(args.trash_min, min(args.trash_max, TRASH_MAX_VARIATIONS))}
+    for t in image_tasks(SPEC, SETS, counts):
+        tasks.append((t["out"], t["prompt"], t["variation"]))
 
     total = len(tasks)
     print(f"Planned {total} assets.")
 
-    # Execute
-    for idx, (rel, prompt) in enumerate(tasks, start=1):
+    # Group what still needs generating into batches: consecutive tasks share a prompt
+    # (the variations of one tile or trash category), existing files drop out per slot
+    batch_size = max(1, args.batch_size)
+    batches = []
+    skipped = set()
+    for idx, (rel, prompt, variation) in enumerate(tasks, start=1):
         full = out_root / rel
-        generated.append(full)
         if args.dry_run:
-            print(f"[{idx}/{total}] DRY: {full} <- {prompt}")
             continue
         if full.exists() and args.skip_existing and not args.overwrite:
-            print(f"[{idx}/{total}] SKIP existing {full}")
+            skipped.add(idx)
             continue
-        print(f"[{idx}/{total}] gen -> {full}")
-        generate_image(prompt, full, api_key, size="1024x1024", model=args.model, timeout_s=args.timeout, retry=args.retries, sleep_ms=args.sleep_ms)
+        if batches and batches[-1][0][2] == prompt and len(batches[-1]) < batch_size:
+            batches[-1].append((idx, full, prompt, variation))
+        else:
+            batches.append([(idx, full, prompt, variation)])
+    by_start = {batch[0][0]: batch for batch in batches}
+    if batch_size > 1 and batches:
+        print(f"{sum(len(b) for b in batches)} images in {len(batches)} requests (batch size {batch_size}).")
+
+    def run(batch, log, limiter=None, sleep_ms=0):
+        for idx, full, _, _ in batch:
+            log(f"[{idx}/{total}] gen -> {full}")
+        generate_batch(batch[0][2], [(full, variation) for _, full, _, variation in batch], api_key, size="1024x1024", model=args.model, timeout_s=args.timeout, retry=args.retries, sleep_ms=sleep_ms, client=client, limiter=limiter, log=log, cache=cache, refresh_cache=args.refresh_cache, rescale=args.rescale, pipeline=pipeline)
+
+    def run_buffered(batch):
+        lines = []
+        run(batch, lines.append, limiter=limiter)
+        return lines
+
+    # Execute. In concurrent mode workers buffer their own log lines and results are
+    # printed in task order, so the output is identical to a sequential run regardless
+    # of completion order.
+    limiter = TokenBucket(args.rate, burst=args.burst)
+    pool = None
+    futures = {}
+    if args.concurrency > 1 and batches:
+        pool = ThreadPoolExecutor(max_workers=args.concurrency)
+        futures = {batch[0][0]: pool.submit(run_buffered, batch) for batch in batches}
+    try:
+        for idx, (rel, prompt, variation) in enumerate(tasks, start=1):
+            full = out_root / rel
+            if args.dry_run:
+                print(f"[{idx}/{total}] DRY: {full} <- {prompt}")
+            elif idx in skipped:
+                print(f"[{idx}/{total}] SKIP existing {full}")
+                existing.append(full)
+            elif idx in futures:
+                print("\n".join(futures[idx].result()), flush=True)
+            elif idx in by_start:
+                run(by_start[idx], print, sleep_ms=args.sleep_ms)
+    finally:
+        if pool is not None:
+            pool.shutdown()
 
     # Optional rescale/compress
     if args.rescale and not args.dry_run:
-        for p in generated:
+        for p in existing:
             try_rescale_png(Path(p), args.rescale)
 
+    if pipeline is not None:
+        pipeline.save()
+    metrics.finish(args)
     print("Done.")
 
 
@@ -1,82 +1,18 @@
 #!/usr/bin/env python3
 import os
 import sys
-import json
-import time
-import base64
 import argparse
-import random
 from pathlib import Path
 
-try:
-    from urllib import request
-except Exception:
-    print("Python stdlib urllib not available; cannot proceed.")
-    sys.exit(1)
+from api_client import add_client_args, client_from_args
+from image_cache import add_cache_args, cache_from_args
+from generate_assets import generate_batch
+from asset_spec import load_spec, image_tasks
+import metrics
 
 
-STYLE = "bright flat 2D cartoon, bold outlines, kid-friendly, no humans"
-
-FAUCET_PROMPT = (
-    "assets/interactables/faucet.png",
-    "A simple, cartoonish leaky faucet, top-down view, with a water drop falling from it. Transparent background. {}".format(STYLE)
-)
-
-
-def http_post_json(url: str, payload: dict, headers: dict, timeout_s: int = 180) -> dict:
-    req = request.Request(url, method="POST")
-    req.add_header("Content-Type", "application/json")
-    req.add_header("User-Agent", "recyclehole-asset-gen/1.0")
-    for k, v in headers.items():
-        req.add_header(k, v)
-    data = json.dumps(payload).encode("utf-8")
-    try:
-        with request.urlopen(req, data=data, timeout=timeout_s) as resp:
-            body = resp.read()
-            return json.loads(body)
-    except Exception as e:
-        if hasattr(e, 'read'):
-            try:
-                body = e.read().decode('utf-8', errors='ignore')
-                return json.loads(body)
-            except Exception:
-                pass
-        raise
-
-
-def generate_image(prompt: str, out_path: Path, api_key: str, size: str = "1024x1024", retry: int = 2, model: str = "dall-e-3", timeout_s: int = 180, sleep_ms: int = 0):
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    payload = {
-        "model": model,
-        "prompt": prompt,
-        "n": 1,
-        "size": size,
-        "response_format": "b64_json",
-    }
-    headers = {"Authorization": f"Bearer {api_key}"}
-
-    last_err = None
-    for attempt in range(retry + 1):
-        if sleep_ms > 0 and attempt == 0:
-            time.sleep(sleep_ms / 1000.0)
-        elif attempt > 0:
-            backoff = (2 ** (attempt - 1)) + random.random()
-            time.sleep(backoff)
-        try:
-            resp = http_post_json("https://api.openai.com/v1/images/generations", payload, headers, timeout_s=timeout_s)
-            if 'error' in resp:
-                raise RuntimeError(resp['error'].get('message', 'unknown error'))
-            b64 = resp["data"][0]["b64_json"]
-            raw = base64.b64decode(b64)
-            with open(out_path, "wb") as f:
-                f.write(raw)
-            print(f"OK  -> {out_path}")
-            return True
-        except Exception as e:
-            last_err = e
-            print(f"ERR ({attempt+1}/{retry+1}) {out_path}: {e}")
-    print(f"FAIL -> {out_path}: {last_err}")
-    return False
+# Prompt and output path live in scripts/asset_spec.json
+SPEC = load_spec()
 
 
 def main():
@@ -88,7 +24,11 @@ def main():
     parser.add_argument("--retries", type=int, default=3, help="Max retries per image (default: 3)")
     parser.add_argument("--sleep-ms", type=int, default=250, help="Sleep milliseconds before each request (default: 250)")
     parser.add_argument("--overwrite", action="store_true", help="Force re-generate even if file exists")
+    add_client_args(parser)
+    add_cache_args(parser)
+    metrics.add_metrics_args(parser)
     args = parser.parse_args()
+    metrics.metrics_from_args(args)
 
     api_key = os.environ.get("OPENAI_API_KEY")
     if not args.dry_run and not api_key:
@@ -98,7 +38,8 @@ def main():
     out_root = Path(args.out)
     out_root.mkdir(parents=True, exist_ok=True)
 
-    rel, prompt = FAUCET_PROMPT
+    task = image_tasks(SPEC, ["faucet"])[0]
+    rel, prompt = "assets/" + task["out"], task["prompt"]
     full_path = out_root / rel
 
     if args.dry_run:
@@ -107,8 +48,9 @@ def main():
         print(f"SKIP existing {full_path}")
     else:
         print(f"gen -> {full_path}")
-        generate_image(prompt, full_path, api_key, size="1024x1024", model=args.model, timeout_s=args.timeout, retry=args.retries, sleep_ms=args.sleep_ms)
+        generate_batch(prompt, [(full_path, 0)], api_key, size="1024x1024", model=args.model, timeout_s=args.timeout, retry=args.retries, sleep_ms=args.sleep_ms, client=client_from_args(args, user_agent="recyclehole-asset-gen/1.0"), cache=cache_from_args(args), refresh_cache=args.refresh_cache)
 
+    metrics.finish(args)
     print("Done.")
 
 
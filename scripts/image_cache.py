@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+
+# On-disk cache of generated images keyed by what was asked for, so re-runs (or a
+# wiped output tree) are served locally instead of paying for the same request.
+#
+# Layout: <dir>/<key[:2]>/<key>.png   decoded image bytes (mtime = last use, for LRU)
+#         <dir>/<key[:2]>/<key>.json  request metadata
+#         <dir>/<key[:2]>/<key>.pin   present when the entry must never be evicted
+
+DEFAULT_CACHE_DIR = ".cache/images"
+DEFAULT_MAX_MB = 2048
+PRUNE_TO = 0.9
+
+
+def cache_key(model: str, prompt: str, size: str, variation: int = 0) -> str:
+    blob = json.dumps([model, prompt, size, int(variation)], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _atomic_write(path: Path, data: bytes):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{time.monotonic_ns()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _unlink(path: Path):
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class ImageCache:
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes: int = 0):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        # Bytes of cached images: one scan on the first put, then kept up to date so a
+        # put only prunes (and re-reads every entry) once the cap is actually exceeded
+        self.total = None
+        self.lock = threading.Lock()
+
+    def _scan_total(self) -> int:
+        total = 0
+        for data_path in self.root.glob("*/*.png"):
+            try:
+                total += data_path.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
+
+    def _path(self, key: str, ext: str) -> Path:
+        return self.root / key[:2] / f"{key}{ext}"
+
+    def get(self, key: str):
+        data_path = self._path(key, ".png")
+        try:
+            data = data_path.read_bytes()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(data_path)
+        except OSError:
+            pass
+        return data
+
+    def put(self, key: str, data: bytes, meta: dict = None):
+        data_path = self._path(key, ".png")
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+        info = dict(meta or {})
+        info.update({"key": key, "bytes": len(data), "created": int(time.time())})
+        with self.lock:
+            if self.max_bytes and self.total is None:
+                self.total = self._scan_total()
+            try:
+                replaced = data_path.stat().st_size
+            except FileNotFoundError:
+                replaced = 0
+            _atomic_write(data_path, data)
+            _atomic_write(self._path(key, ".json"), json.dumps(info, indent=2).encode("utf-8"))
+            if self.total is not None:
+                self.total += len(data) - replaced
+            if self.max_bytes and self.total > self.max_bytes:
+                # Down to 90% of the cap, so a full cache does not rescan on every put
+                self.prune(max_bytes=int(self.max_bytes * PRUNE_TO))
+
+    def remove(self, key: str):
+        if self.total is not None:
+            try:
+                self.total -= self._path(key, ".png").stat().st_size
+            except FileNotFoundError:
+                pass
+        for ext in (".png", ".json", ".pin"):
+            _unlink(self._path(key, ext))
+
+    def pin(self, key: str, pinned: bool = True):
+        pin_path = self._path(key, ".pin")
+        if pinned:
+            pin_path.touch()
+        else:
+            _unlink(pin_path)
+
+    def resolve(self, prefix: str) -> str:
+        matches = [e["key"] for e in self.entries() if e["key"].startswith(prefix)]
+        if len(matches) != 1:
+            raise KeyError(f"{prefix}: {'no' if not matches else 'ambiguous'} cache entry")
+        return matches[0]
+
+    def entries(self) -> list:
+        out = []
+        if not self.root.exists():
+            return out
+        for data_path in self.root.glob("*/*.png"):
+            key = data_path.stem
+            try:
+                st = data_path.stat()
+            except FileNotFoundError:
+                continue
+            try:
+                meta = json.loads(self._path(key, ".json").read_text())
+            except Exception:
+                meta = {}
+            out.append({
+                "key": key,
+                "bytes": st.st_size,
+                "last_used": st.st_mtime,
+                "pinned": self._path(key, ".pin").exists(),
+                "meta": meta,
+            })
+        out.sort(key=lambda e: e["last_used"])
+        return out
+
+    def prune(self, max_bytes: int = None, older_than_s: float = None) -> list:
+        # Least-recently-used first; pinned entries are never evicted
+        entries = self.entries()
+        total = sum(e["bytes"] for e in entries)
+        now = time.time()
+        removed = []
+        for e in entries:
+            if e["pinned"]:
+                continue
+            too_old = older_than_s is not None and now - e["last_used"] > older_than_s
+            too_big = max_bytes is not None and total > max_bytes
+            if not (too_old or too_big):
+                continue
+            self.remove(e["key"])
+            total -= e["bytes"]
+            removed.append(e)
+        self.total = total
+        return removed
+
+
+def add_cache_args(parser: argparse.ArgumentParser):
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help=f"Generated image cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_MB, help=f"Evict least-recently-used cache entries beyond this size (default: {DEFAULT_MAX_MB}, 0 = unbounded)")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the image cache")
+    parser.add_argument("--refresh-cache", action="store_true", help="Ignore cached images and pay for fresh ones (results are still cached)")
+
+
+def cache_from_args(args):
+    if args.no_cache:
+        return None
+    return ImageCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024)
+
+
+def _fmt_bytes(n: int) -> str:
+    return f"{n / (1024 * 1024):.1f} MB"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Inspect and maintain the generated image cache.")
+    ap.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help=f"Cache directory (default: {DEFAULT_CACHE_DIR})")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("stats", help="Show entry count and total size")
+    ls = sub.add_parser("list", help="List entries, least recently used first")
+    ls.add_argument("--json", action="store_true", help="Print machine-readable JSON")
+    pr = sub.add_parser("prune", help="Evict unpinned entries (LRU first)")
+    pr.add_argument("--max-mb", type=float, help="Shrink the cache to at most this many MB")
+    pr.add_argument("--older-than-days", type=float, help="Drop entries unused for this many days")
+    for name, help_text in (("pin", "Protect entries from eviction"), ("unpin", "Allow entries to be evicted again"), ("rm", "Delete entries")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("keys", nargs="+", help="Cache keys or unique key prefixes")
+    args = ap.parse_args()
+
+    cache = ImageCache(args.cache_dir)
+
+    if args.cmd == "stats":
+        entries = cache.entries()
+        pinned = [e for e in entries if e["pinned"]]
+        print(f"{cache.root}: {len(entries)} entries, {_fmt_bytes(sum(e['bytes'] for e in entries))}")
+        print(f"pinned: {len(pinned)} entries, {_fmt_bytes(sum(e['bytes'] for e in pinned))}")
+    elif args.cmd == "list":
+        entries = cache.entries()
+        if args.json:
+            print(json.dumps(entries, indent=2))
+            return
+        for e in entries:
+            meta = e["meta"]
+            used = time.strftime("%Y-%m-%d %H:%M", time.localtime(e["last_used"]))
+            flag = "P" if e["pinned"] else " "
+            print(f"{flag} {e['key'][:16]}  {e['bytes']:>9}  {used}  {meta.get('model', '?')} #{meta.get('variation', 0)}  {meta.get('prompt', '')[:60]}")
+    elif args.cmd == "prune":
+        if args.max_mb is None and args.older_than_days is None:
+            print("prune: pass --max-mb and/or --older-than-days")
+            sys.exit(2)
+        removed = cache.prune(
+            max_bytes=None if args.max_mb is None else int(args.max_mb * 1024 * 1024),
+            older_than_s=None if args.older_than_days is None else args.older_than_days * 86400,
+        )
+        print(f"Removed {len(removed)} entries ({_fmt_bytes(sum(e['bytes'] for e in removed))}).")
+    else:
+        for prefix in args.keys:
+            try:
+                key = cache.resolve(prefix)
+            except KeyError as e:
+                print(f"ERR {e.args[0]}")
+                continue
+            if args.cmd == "rm":
+                cache.remove(key)
+            else:
+                cache.pin(key, pinned=args.cmd == "pin")
+            print(f"{args.cmd} {key}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+import io
+import os
+import sys
+import json
+import argparse
+import threading
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+    from PIL import Image
+except Exception as e:
+    print("NumPy and Pillow are required. Install with: pip install numpy pillow")
+    sys.exit(1)
+
+import metrics
+from convert_assets_to_webp import write_tiers, write_tier_manifest, file_hash, DEFAULT_TIERS, DEFAULT_TIER_DIRS
+from trim_sprites import trim_array, load_metadata, DEFAULT_DIRS as DEFAULT_TRIM_DIRS
+from build_texture_atlas import atlas_input_path, DEFAULT_ATLAS_INPUTS
+from asset_index import add_index_args, index_from_args
+
+# Decode each source once and derive every output from that one buffer. A chain is a
+# list of steps run in order over a Frame: transforms (rescale, trim) replace the
+# current image, encoders (png, webp, tiers, atlas) write it out. Without this each
+# tool reopens and re-decodes the file, and trimming re-encodes an already lossy WebP.
+#
+#   rescale:N        downscale to fit N px
+#   trim[:MARGIN]    crop to the alpha bounding box and bleed edge colors (sprite dirs)
+#   png              write the current image back over the source PNG
+#   webp[:Q|lossless] write name.webp
+#   tiers[:A/B/C]    write name@N.webp tiers (tier dirs)
+#   atlas[:N]        write the atlas input (RGBA fitted to N px) to .cache/atlas-inputs
+
+DEFAULT_STEPS = "trim,webp,tiers"
+DEFAULT_ATLAS_SPRITE = 256
+
+
+def in_dirs(rel: str, dirs) -> bool:
+    # rel is relative to the assets root
+    return any(rel == d or rel.startswith(d + "/") for d in dirs)
+
+
+class Frame:
+    # One decoded source shared by every step. `rel` is relative to the assets root,
+    # `raw` the encoded source bytes while the image is still untouched.
+
+    def __init__(self, im, src: Path, root: Path, raw: bytes = None):
+        self.im = im
+        self.src = src
+        self.root = root
+        self.rel = src.relative_to(root).as_posix()
+        self.raw = raw
+        self.webp = None
+        self.trim = None
+        self.lines = []
+        self.trim_records = {}
+        self.tiered = False
+
+    def web_path(self, path: Path) -> str:
+        return path.relative_to(self.root.parent).as_posix()
+
+    def replace(self, im):
+        self.im = im
+        self.raw = None
+
+    def has_alpha(self) -> bool:
+        return "A" in self.im.getbands() or "transparency" in self.im.info
+
+
+class Rescale:
+    def __init__(self, max_px: int):
+        self.max_px = max_px
+
+    def run(self, f: Frame):
+        w, h = f.im.size
+        if max(w, h) <= self.max_px:
+            return
+        scale = self.max_px / max(w, h)
+        size = (max(1, round(w * scale)), max(1, round(h * scale)))
+        with metrics.stage("rescale"):
+            f.replace(f.im.resize(size, Image.LANCZOS))
+        f.lines.append(f"rescaled {f.src} -> {size[0]}x{size[1]}")
+
+
+class Trim:
+    def __init__(self, margin: int = 2, threshold: int = 0, bleed: bool = True, dirs=None, previous: dict = None):
+        self.margin = margin
+        self.threshold = threshold
+        self.bleed = bleed
+        self.dirs = dirs or [d.strip() for d in DEFAULT_TRIM_DIRS.split(",")]
+        self.previous = previous or {}
+
+    def run(self, f: Frame):
+        if not in_dirs(f.rel, self.dirs) or not f.has_alpha():
+            return
+        with metrics.stage("trim"):
+            rgba = np.asarray(f.im.convert("RGBA"))
+            trimmed, box = trim_array(rgba, margin=self.margin, threshold=self.threshold, bleed_edges=self.bleed)
+        if trimmed is None:
+            return
+        h, w = rgba.shape[:2]
+        x, y, tw, th = box
+        sw, sh = w, h
+        # A source that was trimmed before keeps its original size, like trim_sprites.py
+        prev = self.previous.get(f.web_path(f.src.with_suffix(".webp")))
+        if prev and (prev.get("w"), prev.get("h")) == (w, h):
+            x, y, sw, sh = x + prev["x"], y + prev["y"], prev["sw"], prev["sh"]
+        f.replace(Image.fromarray(trimmed, "RGBA"))
+        f.trim = {"x": x, "y": y, "w": tw, "h": th, "sw": sw, "sh": sh}
+        f.lines.append(f"TRIM {f.rel} {w}x{h} -> {tw}x{th} at ({x},{y})")
+
+
+class Png:
+    def run(self, f: Frame):
+        # An untouched image is written back as the bytes it came from, never re-encoded
+        tmp = f.src.with_name(f.src.name + ".part")
+        with metrics.stage("encode_png"):
+            if f.raw is not None:
+                tmp.write_bytes(f.raw)
+            else:
+                f.im.save(tmp, format="PNG", optimize=True)
+        os.replace(tmp, f.src)
+
+
+class WebP:
+    def __init__(self, quality: int = 85, lossless: bool = False, method: int = 6):
+        self.quality = quality
+        self.lossless = lossless
+        self.method = method
+
+    def run(self, f: Frame):
+        dst = f.src.with_suffix(".webp")
+        im = f.im if f.im.mode in ("RGBA", "RGB") else f.im.convert("RGBA")
+        with metrics.stage("encode"):
+            # exact=True keeps bled colors under transparent pixels
+            im.save(dst, format="WEBP", quality=self.quality, lossless=self.lossless, method=self.method, exact=f.trim is not None)
+        f.webp = dst
+        f.lines.append(f"WEBP {f.web_path(dst)}")
+        if f.trim is not None:
+            f.trim_records[f.web_path(dst)] = dict(f.trim, hash=file_hash(dst))
+
+
+class Tiers:
+    def __init__(self, sizes, quality: int = 85, lossless: bool = False, method: int = 6, dirs=None):
+        self.sizes = tuple(sizes)
+        self.quality = quality
+        self.lossless = lossless
+        self.method = method
+        self.dirs = dirs or [DEFAULT_TIER_DIRS]
+
+    def run(self, f: Frame):
+        if not in_dirs(f.rel, self.dirs):
+            return
+        base = f.webp or f.src.with_suffix(".webp")
+        with metrics.stage("tiers"):
+            written = write_tiers(f.im, base, self.sizes, quality=self.quality, lossless=self.lossless, method=self.method)
+        f.tiered = True
+        f.lines.extend(f"TIER {f.web_path(t)}" for t in written)
+
+
+class Atlas:
+    def __init__(self, max_sprite: int = DEFAULT_ATLAS_SPRITE, inputs_dir: Path = DEFAULT_ATLAS_INPUTS):
+        self.max_sprite = max_sprite
+        self.inputs_dir = Path(inputs_dir)
+
+    def run(self, f: Frame):
+        # Same sprites build_texture_atlas.collect_sprites picks: trash and bin decals
+        name = f.src.name
+        if not (in_dirs(f.rel, ["trash"]) or (f.rel.startswith("player/") and "bin" in name)):
+            return
+        im = f.im.convert("RGBA")
+        w, h = im.size
+        if self.max_sprite and max(w, h) > self.max_sprite:
+            scale = self.max_sprite / max(w, h)
+            im = im.resize((max(1, round(w * scale)), max(1, round(h * scale))), Image.LANCZOS)
+        # Keyed by the file the atlas will pick for this sprite, WebP when there is one
+        sprite = f.webp or (f.src.with_suffix(".webp") if f.src.with_suffix(".webp").exists() else f.src)
+        dst = atlas_input_path(self.inputs_dir, f.web_path(sprite), self.max_sprite)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        with metrics.stage("atlas_input"):
+            # Scratch data read back once per atlas build: fast compression over small files
+            im.save(dst, format="PNG", compress_level=1)
+        f.lines.append(f"ATLAS {dst}")
+
+
+def parse_steps(spec: str, quality: int = 85, lossless: bool = False, method: int = 6, tier_dirs=None, trim_dirs=None, previous_trim: dict = None, atlas_inputs: Path = DEFAULT_ATLAS_INPUTS) -> list:
+    steps = []
+    for item in (s.strip() for s in spec.split(",") if s.strip()):
+        name, _, arg = item.partition(":")
+        if name == "rescale":
+            steps.append(Rescale(int(arg)))
+        elif name == "trim":
+            steps.append(Trim(margin=int(arg) if arg else 2, dirs=trim_dirs, previous=previous_trim))
+        elif name == "png":
+            steps.append(Png())
+        elif name == "webp":
+            if arg == "lossless":
+                steps.append(WebP(quality, True, method))
+            else:
+                steps.append(WebP(int(arg) if arg else quality, lossless, method))
+        elif name == "tiers":
+            sizes = sorted({int(t) for t in (arg or DEFAULT_TIERS.replace(",", "/")).split("/") if t})
+            steps.append(Tiers(sizes, quality, lossless, method, dirs=tier_dirs))
+        elif name == "atlas":
+            steps.append(Atlas(int(arg) if arg else DEFAULT_ATLAS_SPRITE, atlas_inputs))
+        else:
+            raise ValueError(f"unknown pipeline step {name!r}")
+    return steps
+
+
+def run_steps(im, src: Path, root: Path, steps, raw: bytes = None) -> Frame:
+    frame = Frame(im, src, root, raw=raw)
+    for step in steps:
+        step.run(frame)
+    return frame
+
+
+def run_bytes(raw: bytes, src: Path, root: Path, steps) -> Frame:
+    with Image.open(io.BytesIO(raw)) as im:
+        with metrics.stage("decode"):
+            im.load()
+        return run_steps(im, src, root, steps, raw=raw)
+
+
+def process_file(src: Path, root: Path, steps, delete_png: bool = False):
+    # Worker entry point: returns (src, lines, trim records, tiered, error, metrics snapshot)
+    with metrics.scoped() as registry:
+        try:
+            frame = run_bytes(src.read_bytes(), src, root, steps)
+            metrics.inc("files_total", outcome="processed")
+        except Exception as e:
+            metrics.inc("files_total", outcome="fail")
+            return src, [], {}, False, str(e), registry.snapshot()
+        if delete_png and frame.webp is not None and src.suffix.lower() == ".png":
+            src.unlink()
+    return src, frame.lines, frame.trim_records, frame.tiered, None, registry.snapshot()
+
+
+class Sidecars:
+    # Thread-safe collector for the JSON files steps contribute to; save() once at the end
+    def __init__(self, root: Path, trim_path: Path = None, tier_manifest: Path = None):
+        self.root = root
+        self.trim_path = trim_path or root / "sprite-trim.json"
+        self.tier_manifest = tier_manifest or root / "texture-tiers.json"
+        self.trim = load_metadata(self.trim_path)
+        self.trim_updates = 0
+        self.tiered = False
+        self.lock = threading.Lock()
+
+    def add(self, trim_records: dict, tiered: bool = False):
+        with self.lock:
+            self.trim.update(trim_records)
+            self.trim_updates += len(trim_records)
+            self.tiered = self.tiered or tiered
+
+    def save(self, steps, log=print):
+        if self.trim_updates:
+            self.trim_path.write_text(json.dumps(dict(sorted(self.trim.items())), indent=2) + "\n")
+            log(f"Wrote {self.trim_path} ({self.trim_updates} trimmed)")
+        tiers = next((s for s in steps if isinstance(s, Tiers)), None)
+        if tiers is not None and self.tiered:
+            count = write_tier_manifest(self.root, tiers.dirs, tiers.sizes, self.tier_manifest)
+            log(f"Wrote {self.tier_manifest} ({count} tiered textures)")
+
+
+class Pipeline:
+    # In-process use by the generators: freshly downloaded bytes go through `before`
+    # (rescale, write the PNG) and then the configured chain, all from one decode
+    def __init__(self, root: Path, steps, sidecars: Sidecars):
+        self.root = root
+        self.steps = steps
+        self.sidecars = sidecars
+
+    def process_bytes(self, raw: bytes, src: Path, before=()) -> list:
+        frame = run_bytes(raw, src, self.root, list(before) + self.steps)
+        self.sidecars.add(frame.trim_records, frame.tiered)
+        return frame.lines
+
+    def save(self, log=print):
+        self.sidecars.save(self.steps, log=log)
+
+
+def add_pipeline_args(parser, default_steps: str = DEFAULT_STEPS):
+    parser.add_argument("--steps", default=default_steps, help=f"Comma-separated chain, e.g. rescale:1024,trim,webp:85,tiers:128/256/512,atlas:256 (default: {default_steps})")
+    parser.add_argument("--tier-dirs", default=DEFAULT_TIER_DIRS, help=f"Folders under the assets root that get tiers (default: {DEFAULT_TIER_DIRS})")
+    parser.add_argument("--trim-dirs", default=DEFAULT_TRIM_DIRS, help=f"Folders under the assets root whose sprites get trimmed (default: {DEFAULT_TRIM_DIRS})")
+    parser.add_argument("--atlas-inputs", default=DEFAULT_ATLAS_INPUTS, help=f"Where the atlas step writes prepared sprites (default: {DEFAULT_ATLAS_INPUTS})")
+
+
+def steps_from_args(args, sidecars: Sidecars, quality: int = 85, lossless: bool = False, method: int = 6) -> list:
+    split = lambda s: [d.strip().strip("/") for d in s.split(",") if d.strip()]
+    return parse_steps(args.steps, quality=quality, lossless=lossless, method=method, tier_dirs=split(args.tier_dirs), trim_dirs=split(args.trim_dirs), previous_trim=dict(sidecars.trim), atlas_inputs=Path(args.atlas_inputs))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Decode each PNG under assets/ once and write every derived output from it.")
+    ap.add_argument("--assets-dir", default="assets", help="Assets root directory to scan (default: assets)")
+    ap.add_argument("--quality", type=int, default=85, help="WebP quality for webp and tiers steps without their own (default: 85)")
+    ap.add_argument("--lossless", action="store_true", help="Use lossless WebP")
+    ap.add_argument("--method", type=int, default=6, help="WebP encoder effort 0 (fast) .. 6 (smallest, default)")
+    ap.add_argument("--jobs", type=int, default=1, help="Worker processes (default: 1, 0 = all cores)")
+    ap.add_argument("--delete-png", action="store_true", help="Delete each PNG once its WebP is written")
+    add_pipeline_args(ap)
+    add_index_args(ap)
+    metrics.add_metrics_args(ap)
+    args = ap.parse_args()
+    metrics.metrics_from_args(args)
+
+    root = Path(args.assets_dir)
+    if not root.exists():
+        print(f"Assets dir not found: {root}")
+        sys.exit(2)
+    sidecars = Sidecars(root)
+    try:
+        steps = steps_from_args(args, sidecars, quality=args.quality, lossless=args.lossless, method=args.method)
+    except ValueError as e:
+        print(f"Bad --steps: {e}")
+        sys.exit(2)
+
+    with index_from_args(args, root) as index:
+        sources = [index.path(r) for r in index.files(f"{index.web_path(root)}/", (".png",))]
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    if args.profile and jobs > 1:
+        print(f"--profile runs the {len(sources)} files in this process (ignoring --jobs {jobs})")
+        jobs = 1
+    if jobs <= 1 or len(sources) <= 1:
+        pool = None
+        results = (process_file(p, root, steps, args.delete_png) for p in sources)
+    else:
+        pool = ProcessPoolExecutor(max_workers=min(jobs, len(sources)))
+        # map() yields in submission order, so output matches a serial run
+        results = pool.map(process_file, sources, [root] * len(sources), [steps] * len(sources), [args.delete_png] * len(sources))
+    processed = 0
+    try:
+        for src, lines, trim_records, tiered, err, snapshot in results:
+            metrics.REGISTRY.merge(snapshot)
+            if err is not None:
+                print(f"FAIL {src}: {err}")
+                continue
+            processed += 1
+            for line in lines:
+                print(line)
+            sidecars.add(trim_records, tiered)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    sidecars.save(steps)
+    metrics.finish(args)
+    print(f"Done. Processed {processed} PNGs under {root} in one decode each.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import zlib
+import struct
+import argparse
+from pathlib import Path
+
+from asset_index import add_index_args, index_from_args
+
+try:
+    import numpy as np
+    from PIL import Image
+except Exception as e:
+    print("NumPy and Pillow are required. Install with: pip install numpy pillow")
+    sys.exit(1)
+
+
+# KTX2 textures the GPU can take as-is: uncompressed RGBA8 with the whole mip chain built
+# here, so the browser neither decodes an image nor generates mipmaps at startup.
+# src/modules/loader.js reads the same subset.
+#
+# Layout (KTX 2.0, little endian): identifier, header, index, level index (level 0 first),
+# data format descriptor, key/value data, then the levels, smallest first. With zlib
+# supercompression (scheme 3) each level is one zlib stream; otherwise levels are raw
+# RGBA8 rows, top row first, aligned to 4 bytes.
+#
+# Mips are filtered in linear light on premultiplied alpha: averaging sRGB values
+# directly darkens every level, and straight alpha bleeds the color of transparent
+# pixels into sprite edges.
+
+IDENTIFIER = b"\xabKTX 20\xbb\r\n\x1a\n"
+HEADER = struct.Struct("<9I")   # vkFormat, typeSize, width, height, depth, layers, faces, levels, scheme
+INDEX = struct.Struct("<4I2Q")  # dfd offset/length, kvd offset/length, sgd offset/length
+LEVEL = struct.Struct("<3Q")    # byteOffset, byteLength, uncompressedByteLength
+VK_FORMAT_R8G8B8A8_UNORM = 37
+VK_FORMAT_R8G8B8A8_SRGB = 43
+SCHEME_NONE = 0
+SCHEME_ZLIB = 3
+DEFAULT_DIRS = "tiles"
+DEFAULT_MANIFEST = "texture-ktx2.json"
+DEFAULT_ZLIB_LEVEL = 6
+WRITER = "recycle-io scripts/ktx2.py"
+
+# sRGB <-> linear
+_TO_LINEAR = np.where(
+    np.arange(256) / 255 <= 0.04045,
+    np.arange(256) / 255 / 12.92,
+    ((np.arange(256) / 255 + 0.055) / 1.055) ** 2.4,
+).astype(np.float32)
+
+
+def _to_srgb(linear: np.ndarray) -> np.ndarray:
+    linear = np.clip(linear, 0, 1)
+    return np.where(linear <= 0.0031308, linear * 12.92, 1.055 * np.power(linear, 1 / 2.4) - 0.055)
+
+
+def level_count(width: int, height: int) -> int:
+    return max(width, height).bit_length()
+
+
+def level_size(width: int, height: int, level: int):
+    return max(1, width >> level), max(1, height >> level)
+
+
+def _halve(a: np.ndarray, axis: int) -> np.ndarray:
+    # Box filter to floor(n / 2) samples along one axis. An odd length uses three taps
+    # per output (weights (m - i, m, i + 1) / n) so every input sample counts equally.
+    n = a.shape[axis]
+    if n == 1:
+        return a
+    a = np.moveaxis(a, axis, 0)
+    if n % 2 == 0:
+        out = (a[0::2] + a[1::2]) * 0.5
+    else:
+        m = n // 2
+        i = np.arange(m, dtype=np.float32).reshape((m,) + (1,) * (a.ndim - 1))
+        out = a[0:-1:2] * ((m - i) / n) + a[1::2] * (m / n) + a[2::2] * ((i + 1) / n)
+    return np.moveaxis(out, 0, axis)
+
+
+def build_mips(rgba: np.ndarray, srgb: bool = True) -> list:
+    # (H, W, 4) uint8 -> [level 0, level 1, ...] uint8 arrays down to 1x1. Each level is
+    # filtered from the previous one in float, so rounding does not accumulate.
+    levels = [np.ascontiguousarray(rgba, dtype=np.uint8)]
+    alpha = rgba[..., 3:4].astype(np.float32) / 255
+    color = _TO_LINEAR[rgba[..., :3]] if srgb else rgba[..., :3].astype(np.float32) / 255
+    work = np.concatenate([color * alpha, alpha], axis=-1)
+    while work.shape[0] > 1 or work.shape[1] > 1:
+        work = _halve(_halve(work, 0), 1)
+        a = work[..., 3:4]
+        color = np.where(a > 0, work[..., :3] / np.maximum(a, 1e-8), 0)
+        color = _to_srgb(color) if srgb else np.clip(color, 0, 1)
+        out = np.concatenate([color, a], axis=-1)
+        levels.append(np.rint(out * 255).astype(np.uint8))
+    return levels
+
+
+def _dfd(srgb: bool, supercompressed: bool) -> bytes:
+    # One basic descriptor block: RGBSDA color model, BT.709 primaries, four 8-bit samples
+    samples = b""
+    for i, channel in enumerate((0, 1, 2, 15)):
+        # Alpha is always linear; the "linear" qualifier marks it in an sRGB texture
+        qualifiers = 0x10 if channel == 15 and srgb else 0
+        samples += struct.pack("<HBB4BII", i * 8, 7, channel | qualifiers, 0, 0, 0, 0, 0, 255)
+    # A supercompressed texture has no fixed bytes per block
+    bytes_plane = bytes([0 if supercompressed else 4]) + bytes(7)
+    block = struct.pack("<IHHBBBB4B", 0, 2, 24 + len(samples), 1, 1, 2 if srgb else 1, 0, 0, 0, 0, 0) + bytes_plane + samples
+    return struct.pack("<I", 4 + len(block)) + block
+
+
+def _kvd(pairs: dict) -> bytes:
+    out = b""
+    for key in sorted(pairs):
+        kv = key.encode() + b"\0" + pairs[key].encode() + b"\0"
+        out += struct.pack("<I", len(kv)) + kv + bytes(-len(kv) % 4)
+    return out
+
+
+def _align(n: int, to: int) -> int:
+    return n + (-n % to)
+
+
+def assemble(width: int, height: int, srgb: bool, scheme: int, blocks: list, kvd: dict) -> bytes:
+    # The file around already encoded level blocks (level 0 first)
+    dfd = _dfd(srgb, scheme != SCHEME_NONE)
+    kvd = _kvd(kvd)
+    dfd_offset = len(IDENTIFIER) + HEADER.size + INDEX.size + LEVEL.size * len(blocks)
+    kvd_offset = dfd_offset + len(dfd)
+    pos = kvd_offset + len(kvd)
+    # Smallest level first, so a reader streaming the file gets a usable chain early
+    offsets = [0] * len(blocks)
+    for i in reversed(range(len(blocks))):
+        pos = _align(pos, 4) if scheme == SCHEME_NONE else pos
+        offsets[i] = pos
+        pos += len(blocks[i])
+
+    out = bytearray(pos)
+    vk_format = VK_FORMAT_R8G8B8A8_SRGB if srgb else VK_FORMAT_R8G8B8A8_UNORM
+    header = IDENTIFIER + HEADER.pack(vk_format, 1, width, height, 0, 0, 1, len(blocks), scheme)
+    header += INDEX.pack(dfd_offset, len(dfd), kvd_offset, len(kvd), 0, 0)
+    for i, block in enumerate(blocks):
+        lw, lh = level_size(width, height, i)
+        header += LEVEL.pack(offsets[i], len(block), lw * lh * 4)
+    out[:len(header)] = header
+    out[dfd_offset:kvd_offset] = dfd
+    out[kvd_offset:kvd_offset + len(kvd)] = kvd
+    for i, block in enumerate(blocks):
+        out[offsets[i]:offsets[i] + len(block)] = block
+    return bytes(out)
+
+
+def encode_ktx2(levels: list, srgb: bool = True, zlib_level: int = DEFAULT_ZLIB_LEVEL) -> bytes:
+    # levels from build_mips(); zlib_level 0 stores the levels uncompressed
+    h, w = levels[0].shape[:2]
+    if len(levels) != level_count(w, h):
+        raise ValueError(f"{len(levels)} levels for {w}x{h}, expected {level_count(w, h)}")
+    blocks = []
+    for i, level in enumerate(levels):
+        if level.shape != (*level_size(w, h, i)[::-1], 4):
+            raise ValueError(f"level {i} is {level.shape[1]}x{level.shape[0]}, expected {level_size(w, h, i)}")
+        raw = np.ascontiguousarray(level, dtype=np.uint8).tobytes()
+        blocks.append(zlib.compress(raw, zlib_level) if zlib_level else raw)
+    scheme = SCHEME_ZLIB if zlib_level else SCHEME_NONE
+    return assemble(w, h, srgb, scheme, blocks, {"KTXorientation": "rd", "KTXwriter": WRITER})
+
+
+def write_ktx2(path: Path, rgba: np.ndarray, srgb: bool = True, zlib_level: int = DEFAULT_ZLIB_LEVEL) -> int:
+    data = encode_ktx2(build_mips(rgba, srgb), srgb, zlib_level)
+    tmp = path.with_name(path.name + ".part")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+def parse_ktx2(data: bytes) -> dict:
+    # Reads the subset encode_ktx2() writes and checks every structural rule it relies
+    # on; raises ValueError naming the first problem
+    if data[:12] != IDENTIFIER:
+        raise ValueError("not a KTX2 file")
+    if len(data) < 12 + HEADER.size + INDEX.size:
+        raise ValueError("truncated header")
+    vk_format, type_size, w, h, depth, layers, faces, count, scheme = HEADER.unpack_from(data, 12)
+    if vk_format not in (VK_FORMAT_R8G8B8A8_UNORM, VK_FORMAT_R8G8B8A8_SRGB):
+        raise ValueError(f"unsupported vkFormat {vk_format} (only RGBA8)")
+    if type_size != 1 or depth != 0 or layers != 0 or faces != 1:
+        raise ValueError(f"unsupported layout (typeSize {type_size}, depth {depth}, layers {layers}, faces {faces})")
+    if not w or not h or count != level_count(w, h):
+        raise ValueError(f"{count} levels for {w}x{h}, expected a full chain of {level_count(w, h) if w and h else '?'}")
+    if scheme not in (SCHEME_NONE, SCHEME_ZLIB):
+        raise ValueError(f"unsupported supercompression scheme {scheme}")
+    dfd_offset, dfd_len, kvd_offset, kvd_len, sgd_offset, sgd_len = INDEX.unpack_from(data, 12 + HEADER.size)
+    if sgd_len:
+        raise ValueError("unexpected supercompression global data")
+    srgb = vk_format == VK_FORMAT_R8G8B8A8_SRGB
+
+    if dfd_offset + dfd_len > len(data) or dfd_len < 4 or struct.unpack_from("<I", data, dfd_offset)[0] != dfd_len:
+        raise ValueError("bad data format descriptor length")
+    if data[dfd_offset:dfd_offset + dfd_len] != _dfd(srgb, scheme != SCHEME_NONE):
+        raise ValueError("data format descriptor does not match vkFormat")
+
+    kvd = {}
+    pos, end = kvd_offset, kvd_offset + kvd_len
+    if end > len(data):
+        raise ValueError("key/value data out of range")
+    while pos < end:
+        (n,) = struct.unpack_from("<I", data, pos)
+        kv = data[pos + 4:pos + 4 + n]
+        if len(kv) != n or b"\0" not in kv:
+            raise ValueError("malformed key/value entry")
+        key, _, value = kv.partition(b"\0")
+        kvd[key.decode()] = value.rstrip(b"\0").decode()
+        pos = _align(pos + 4 + n, 4)
+    if list(kvd) != sorted(kvd):
+        raise ValueError("key/value entries not sorted")
+
+    levels = []
+    blocks = []
+    spans = []
+    table = 12 + HEADER.size + INDEX.size
+    for i in range(count):
+        offset, length, raw_len = LEVEL.unpack_from(data, table + i * LEVEL.size)
+        lw, lh = level_size(w, h, i)
+        if raw_len != lw * lh * 4:
+            raise ValueError(f"level {i}: uncompressed length {raw_len}, expected {lw * lh * 4}")
+        if offset + length > len(data) or offset < kvd_offset + kvd_len:
+            raise ValueError(f"level {i}: range {offset}+{length} outside the level data")
+        if scheme == SCHEME_NONE and (offset % 4 or length != raw_len):
+            raise ValueError(f"level {i}: misaligned or wrong length")
+        block = data[offset:offset + length]
+        blocks.append(block)
+        if scheme == SCHEME_ZLIB:
+            try:
+                block = zlib.decompress(block)
+            except zlib.error as e:
+                raise ValueError(f"level {i}: {e}")
+            if len(block) != raw_len:
+                raise ValueError(f"level {i}: inflated to {len(block)} bytes, expected {raw_len}")
+        levels.append(np.frombuffer(block, dtype=np.uint8).reshape(lh, lw, 4))
+        spans.append((offset, offset + length))
+    spans.sort()
+    if any(a[1] > b[0] for a, b in zip(spans, spans[1:])):
+        raise ValueError("level data overlaps")
+    return {"width": w, "height": h, "srgb": srgb, "scheme": scheme, "levels": levels, "blocks": blocks, "kvd": kvd}
+
+
+def read_ktx2(path: Path) -> dict:
+    return parse_ktx2(Path(path).read_bytes())
+
+
+def validate(path: Path, source: Path = None) -> list:
+    # Problems found in one file (empty when it is good): structure, every level inflated,
+    # the mip chain against one rebuilt from level 0, a byte-exact re-assembly, and level
+    # 0 against the source image when given
+    data = Path(path).read_bytes()
+    try:
+        tex = parse_ktx2(data)
+    except ValueError as e:
+        return [str(e)]
+    problems = []
+    rebuilt = build_mips(tex["levels"][0], tex["srgb"])
+    for i, (stored, fresh) in enumerate(zip(tex["levels"], rebuilt)):
+        diff = int(np.abs(stored.astype(np.int16) - fresh).max())
+        if diff > 1:
+            problems.append(f"level {i}: differs from a rebuilt mip by up to {diff}")
+    # Writing the parsed pieces back out must give the same bytes: nothing in the file
+    # is outside what the reader understood
+    if assemble(tex["width"], tex["height"], tex["srgb"], tex["scheme"], tex["blocks"], tex["kvd"]) != data:
+        problems.append("re-assembling the parsed levels does not reproduce the file")
+    if source is not None:
+        with Image.open(source) as im:
+            rgba = np.asarray(im.convert("RGBA"))
+        if rgba.shape != tex["levels"][0].shape:
+            problems.append(f"level 0 is {tex['width']}x{tex['height']}, source {source} is {rgba.shape[1]}x{rgba.shape[0]}")
+        elif not np.array_equal(rgba, tex["levels"][0]):
+            problems.append(f"level 0 differs from {source}")
+    return problems
+
+
+def ktx2_path(src: Path) -> Path:
+    return src.with_suffix(".ktx2")
+
+
+def load_manifest(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text()).get("textures", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def cmd_build(args):
+    root = Path(args.assets_dir)
+    if not root.exists():
+        print(f"Assets dir not found: {root}")
+        sys.exit(2)
+    manifest_path = Path(args.manifest) if args.manifest else root / DEFAULT_MANIFEST
+    previous = {} if args.force else load_manifest(manifest_path)
+    zlib_level = 0 if args.no_zlib else args.zlib_level
+
+    # The file the game loads for each texture (WebP over PNG, no tiers), hashed by the index
+    with index_from_args(args, root) as index:
+        sources = {}
+        for d in (d.strip() for d in args.dirs.split(",") if d.strip()):
+            for r in index.files(f"{index.web_path(root / d)}/", (".webp", ".png")):
+                stem = r["path"].rsplit(".", 1)[0]
+                if "@" in Path(stem).name:
+                    continue
+                if stem not in sources or r["ext"] == ".webp":
+                    sources[stem] = r
+        web_root = index.web_root
+        textures = {}
+        written = 0
+        for stem, r in sorted(sources.items()):
+            src = index.path(r)
+            dst = ktx2_path(src)
+            prev = previous.get(r["path"])
+            fresh = prev and prev.get("hash") == r["hash"][:16] and prev.get("zlib") == zlib_level and dst.exists()
+            if fresh:
+                textures[r["path"]] = prev
+                continue
+            try:
+                with Image.open(src) as im:
+                    rgba = np.asarray(im.convert("RGBA"))
+                size = write_ktx2(dst, rgba, srgb=True, zlib_level=zlib_level)
+            except Exception as e:
+                print(f"FAIL {r['path']}: {e}")
+                continue
+            written += 1
+            h, w = rgba.shape[:2]
+            textures[r["path"]] = {
+                "path": Path(os.path.relpath(dst, web_root)).as_posix(),
+                "hash": r["hash"][:16],
+                "width": w,
+                "height": h,
+                "levels": level_count(w, h),
+                "zlib": zlib_level,
+                "bytes": size,
+            }
+            print(f"KTX2 {textures[r['path']]['path']} ({w}x{h}, {level_count(w, h)} levels, {r['size']} -> {size} bytes)")
+        index.update(root.name)
+
+    out = {"version": 1, "textures": textures}
+    tmp = manifest_path.with_name(manifest_path.name + ".part")
+    tmp.write_text(json.dumps(out, indent=2) + "\n")
+    os.replace(tmp, manifest_path)
+    print(f"Wrote {manifest_path} ({len(textures)} textures, {written} written)")
+
+
+def cmd_verify(args):
+    root = Path(args.assets_dir)
+    manifest_path = Path(args.manifest) if args.manifest else root / DEFAULT_MANIFEST
+    # Manifest entries are checked against their source; loose files only structurally
+    checks = {}
+    for src, entry in load_manifest(manifest_path).items():
+        checks[root.parent / entry["path"]] = root.parent / src
+    paths = [Path(p) for p in args.files] if args.files else sorted(set(checks) | set(root.rglob("*.ktx2")))
+    bad = 0
+    for p in paths:
+        problems = validate(p, checks.get(p) if args.source else None)
+        if problems:
+            bad += 1
+            for problem in problems:
+                print(f"FAIL {p}: {problem}")
+        elif args.verbose:
+            print(f"OK {p}")
+    print(f"{len(paths) - bad}/{len(paths)} KTX2 files valid")
+    sys.exit(1 if bad else 0)
+
+
+def cmd_info(args):
+    for p in args.files:
+        try:
+            tex = read_ktx2(p)
+        except (OSError, ValueError) as e:
+            print(f"FAIL {p}: {e}")
+            continue
+        scheme = {SCHEME_NONE: "none", SCHEME_ZLIB: "zlib"}[tex["scheme"]]
+        print(f"{p}: {tex['width']}x{tex['height']} RGBA8 {'sRGB' if tex['srgb'] else 'linear'}, {len(tex['levels'])} levels, supercompression {scheme}")
+        for key, value in tex["kvd"].items():
+            print(f"  {key} = {value}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Write and check KTX2 textures with precomputed mip chains.")
+    sub = ap.add_subparsers(dest="cmd")
+
+    b = sub.add_parser("build", help="Write name.ktx2 next to each texture (default)")
+    b.add_argument("--dirs", default=DEFAULT_DIRS, help=f"Comma-separated folders under the assets root to convert (default: {DEFAULT_DIRS})")
+    b.add_argument("--zlib-level", type=int, default=DEFAULT_ZLIB_LEVEL, help=f"zlib supercompression level per mip (default: {DEFAULT_ZLIB_LEVEL})")
+    b.add_argument("--no-zlib", action="store_true", help="Store levels uncompressed")
+    b.add_argument("--force", action="store_true", help="Rewrite files whose source is unchanged")
+    add_index_args(b)
+
+    v = sub.add_parser("verify", help="Validate KTX2 files (all under the assets dir by default)")
+    v.add_argument("files", nargs="*", help="Files to check")
+    v.add_argument("--no-source", dest="source", action="store_false", help="Skip comparing level 0 with the source image")
+    v.add_argument("-v", "--verbose", action="store_true", help="Also list files that pass")
+
+    for p in (b, v):
+        p.add_argument("--assets-dir", default="assets", help="Assets root directory (default: assets)")
+        p.add_argument("--manifest", help=f"Source -> KTX2 manifest (default: <assets-dir>/{DEFAULT_MANIFEST})")
+
+    i = sub.add_parser("info", help="Print the header of KTX2 files")
+    i.add_argument("files", nargs="+", help="Files to describe")
+
+    argv = sys.argv[1:]
+    if not argv or (argv[0].startswith("-") and argv[0] not in ("-h", "--help")):
+        argv = ["build"] + argv
+    args = ap.parse_args(argv)
+    {"build": cmd_build, "verify": cmd_verify, "info": cmd_info}[args.cmd](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import itertools
+import subprocess
+import tempfile
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+
+SCRIPTS = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPTS))
+
+from fake_image_api import add_fault_args, server_kwargs, start_background
+from bench_assets import host_info, ints
+from api_client import api_root
+
+# Load test for the generators' request path: runs generate_assets.py against the local
+# stand-in API (scripts/fake_image_api.py) with injected latency and errors, once per
+# combination of --concurrency, --batch-size and --rate, and reports what the run got
+# out of it: images per second, request and per-batch tail latency, and how many
+# attempts and seconds of backoff went to retries that failed again.
+#
+# Client-side numbers come from the generator's own --metrics file; the server's
+# /stats are diffed around each run for status counts and bytes sent.
+
+RESULTS_VERSION = 1
+DEFAULT_OUT_DIR = "logs/loadtest"
+
+
+def floats(value: str) -> list:
+    return [float(v) for v in value.split(",") if v.strip()]
+
+
+def server_stats(api_base: str):
+    # None when the server is not the stand-in (no /stats)
+    try:
+        with urllib.request.urlopen(f"{api_base}/stats", timeout=5) as resp:
+            return json.loads(resp.read())
+    except Exception:
+        return None
+
+
+def stats_delta(before, after):
+    if before is None or after is None:
+        return None
+    statuses = {k: v - before["statuses"].get(k, 0) for k, v in after["statuses"].items()}
+    return {
+        "requests": after["requests"] - before["requests"],
+        "images": after["images"] - before["images"],
+        "short": after["short"] - before["short"],
+        "bytes": after["bytes"] - before["bytes"],
+        "delay_s": round(after["delay_s"] - before["delay_s"], 3),
+        "statuses": {k: v for k, v in sorted(statuses.items()) if v},
+    }
+
+
+def counter(summary: dict, name: str, **labels) -> float:
+    # Sum of a counter's series whose labels include `labels`
+    rows = summary["counters"].get(name, [])
+    return sum(r["value"] for r in rows if all(str(r.get(k)) == str(v) for k, v in labels.items()))
+
+
+def timing(summary: dict, name: str, **labels):
+    for r in summary["timings"].get(name, []):
+        if all(str(r.get(k)) == str(v) for k, v in labels.items()):
+            return {k: r[k] for k in ("count", "sum", "p50", "p90", "p99", "max")}
+    return None
+
+
+def run_scenario(work: Path, api_base: str, args, concurrency: int, batch_size: int, rate: float) -> dict:
+    out_dir = work / "out"
+    shutil.rmtree(out_dir, ignore_errors=True)
+    metrics_path = work / "metrics.json"
+    cmd = [sys.executable, str(SCRIPTS / "generate_assets.py"), "--out", str(out_dir), "--api-base", api_base,
+           "--tile-variations", str(args.variations), "--trash-min", str(args.variations), "--trash-max", str(args.variations),
+           "--no-cache", "--sleep-ms", "0", "--retries", str(args.retries), "--timeout", str(args.timeout),
+           "--concurrency", str(concurrency), "--batch-size", str(batch_size), "--rate", str(rate), "--burst", str(max(1, concurrency)),
+           "--metrics", str(metrics_path)] + args.generator_args
+    env = dict(os.environ, OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY") or "load-test")
+    before = server_stats(api_base)
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    wall = time.perf_counter() - t0
+    after = server_stats(api_base)
+    if proc.returncode != 0 or not metrics_path.exists():
+        raise RuntimeError(proc.stdout[-2000:])
+    planned = next((int(line.split()[1]) for line in proc.stdout.splitlines() if line.startswith("Planned ")), 0)
+    m = json.loads(metrics_path.read_text())
+
+    ok = counter(m, "images_total", outcome="ok")
+    retries = counter(m, "image_retries_total")
+    backoff = timing(m, "stage_seconds", stage="backoff")
+    return {
+        "concurrency": concurrency,
+        "batch_size": batch_size,
+        "rate": rate,
+        "planned": planned,
+        "images_ok": int(ok),
+        "images_failed": int(counter(m, "images_total", outcome="fail")),
+        "wall_s": round(wall, 3),
+        "images_per_s": round(ok / wall, 3) if wall else 0.0,
+        "attempts": int(counter(m, "image_requests_total")),
+        "failed_attempts": int(counter(m, "image_requests_total") - counter(m, "image_requests_total", outcome="ok")),
+        "retries": int(retries),
+        # Retries that failed again: an attempt and its backoff bought nothing
+        "wasted_retries": int(retries - counter(m, "image_retries_total", outcome="ok")),
+        "backoff_s": round(backoff["sum"], 3) if backoff else 0.0,
+        "request_s": timing(m, "http_request_seconds"),
+        "batch_s": timing(m, "stage_seconds", stage="generate"),
+        "server": stats_delta(before, after),
+    }
+
+
+def fmt(t) -> str:
+    return f"p50 {t['p50']:.3f}s p99 {t['p99']:.3f}s max {t['max']:.3f}s" if t else "-"
+
+
+def report(r: dict) -> str:
+    name = f"c={r['concurrency']} b={r['batch_size']} rate={r['rate']:g}"
+    line = (f"{name:<22} {r['images_ok']:>4}/{r['planned']:<4} in {r['wall_s']:7.2f}s {r['images_per_s']:7.2f} img/s  "
+            f"request {fmt(r['request_s'])}  batch {fmt(r['batch_s'])}  "
+            f"attempts {r['attempts']} retries {r['retries']} wasted {r['wasted_retries']} backoff {r['backoff_s']:.2f}s")
+    if r["server"]:
+        line += f"  statuses {json.dumps(r['server']['statuses'], sort_keys=True)}"
+    return line
+
+
+def main():
+    argv = sys.argv[1:]
+    generator_args = []
+    if "--" in argv:
+        i = argv.index("--")
+        argv, generator_args = argv[:i], argv[i + 1:]
+    ap = argparse.ArgumentParser(description="Load-test generate_assets.py against the local stand-in Images API with injected latency and errors.",
+                                 epilog="Arguments after -- are passed to generate_assets.py.")
+    ap.add_argument("--concurrency", default="1,4,8", help="Comma-separated --concurrency values to try (default: 1,4,8)")
+    ap.add_argument("--batch-size", default="1", help="Comma-separated --batch-size values to try (default: 1)")
+    ap.add_argument("--rate", default="0", help="Comma-separated client --rate values in requests/s, 0 = unlimited (default: 0)")
+    ap.add_argument("--retries", type=int, default=3, help="Generator --retries (default: 3)")
+    ap.add_argument("--timeout", type=int, default=60, help="Generator per-request timeout seconds (default: 60)")
+    ap.add_argument("--variations", type=int, default=2, help="Variations per tile type and trash category, which sets the workload size (default: 2)")
+    ap.add_argument("--api-base", help="Test against this server instead of starting the stand-in (fault options then do nothing)")
+    ap.add_argument("--out", help=f"Result file (default: {DEFAULT_OUT_DIR}/load-<UTC time>.json)")
+    # Small images by default: the request path is under test, not PNG encoding
+    add_fault_args(ap, image_size=256)
+    args = ap.parse_args(argv)
+    args.generator_args = generator_args
+
+    server = None
+    api_base = api_root(args.api_base) if args.api_base else None
+    if not api_base:
+        try:
+            kwargs = server_kwargs(args)
+        except ValueError as e:
+            print(f"Bad fault options: {e}")
+            sys.exit(2)
+        server = start_background(**kwargs)
+        host, port = server.server_address[:2]
+        api_base = f"http://{host}:{port}"
+        # Render the image pool before the first timed run
+        server.pool.b64("warm-up", 0, 1024)
+        print(f"Stand-in API on {api_base}")
+
+    work = Path(tempfile.mkdtemp(prefix="load_test_api_"))
+    results = []
+    try:
+        for c, b, rate in itertools.product(ints(args.concurrency), ints(args.batch_size), floats(args.rate)):
+            try:
+                r = run_scenario(work, api_base, args, c, b, rate)
+            except RuntimeError as e:
+                print(f"FAIL c={c} b={b} rate={rate:g}: {e}")
+                continue
+            results.append(r)
+            print(report(r), flush=True)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        shutil.rmtree(work, ignore_errors=True)
+
+    stamp = datetime.now(timezone.utc)
+    faults = {k: getattr(args, k) for k in ("image_size", "response_kb", "latency", "latency_per_image", "error_429", "error_5xx", "short", "retry_after", "max_rps", "seed")}
+    doc = {
+        "version": RESULTS_VERSION,
+        "created": stamp.isoformat(timespec="seconds").replace("+00:00", "Z"),
+        "host": host_info(),
+        "config": {"api_base": args.api_base, "faults": None if args.api_base else faults, "retries": args.retries, "variations": args.variations, "generator_args": generator_args},
+        "results": results,
+    }
+    out_path = Path(args.out) if args.out else Path(DEFAULT_OUT_DIR) / f"load-{stamp.strftime('%Y%m%dT%H%M%SZ')}.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(doc, indent=2) + "\n")
+    print(f"Wrote {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+import os
+import json
+import time
+import pstats
+import cProfile
+import argparse
+import functools
+import threading
+import tracemalloc
+from pathlib import Path
+from contextlib import contextmanager
+
+# In-process instrumentation for the asset scripts: counters and timing histograms kept
+# in memory, written at exit as a JSON summary plus a Prometheus text-format file
+# (node_exporter's textfile collector or promtool can read it).
+#
+# Recording is always on and costs a dict update per event; nothing is written unless
+# a script was run with --metrics. --profile additionally wraps every timed stage in
+# cProfile (cpu) or tracemalloc (memory).
+
+PREFIX = "recyclehole_"
+# Seconds; spans a cached write (ms) up to a slow image request (minutes)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+HELP = {
+    "stage_seconds": "Wall time spent in each instrumented stage",
+    "stage_peak_alloc_bytes": "Largest Python allocation peak seen inside a stage (--profile memory)",
+    "http_requests_total": "HTTP exchanges by status (0 = transport error)",
+    "http_request_seconds": "HTTP request latency including the streamed body",
+    "http_bytes_sent_total": "Request body bytes sent",
+    "http_bytes_received_total": "Response body bytes received",
+    "http_errors_total": "Failed HTTP exchanges by error class",
+    "image_requests_total": "Image API attempts by outcome",
+    "image_retries_total": "Image API attempts after the first for the same images, by outcome",
+    "images_total": "Image slots by outcome (ok, fail, cache_hit)",
+    "rescale_total": "Rescale attempts by outcome",
+    "convert_bytes_in_total": "Source bytes read by WebP conversion",
+    "convert_bytes_out_total": "WebP bytes written, tiers included",
+    "files_total": "Files processed by outcome",
+}
+
+
+def _key(name: str, labels: dict):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Registry:
+    # Counters, maxima and raw timing samples keyed by (name, sorted label pairs). Runs
+    # are small (hundreds of events) so samples are kept whole and quantiles are exact.
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.maxima = {}
+        self.samples = {}
+        self.started = time.time()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        k = _key(name, labels)
+        with self.lock:
+            self.counters[k] = self.counters.get(k, 0) + value
+
+    def maximum(self, name: str, value: float, **labels):
+        k = _key(name, labels)
+        with self.lock:
+            self.maxima[k] = max(self.maxima.get(k, value), value)
+
+    def observe(self, name: str, value: float, **labels):
+        k = _key(name, labels)
+        with self.lock:
+            self.samples.setdefault(k, []).append(value)
+
+    def snapshot(self) -> dict:
+        # Picklable form, so worker processes can hand their metrics back to the parent
+        with self.lock:
+            return {
+                "counters": [[n, list(l), v] for (n, l), v in self.counters.items()],
+                "maxima": [[n, list(l), v] for (n, l), v in self.maxima.items()],
+                "samples": [[n, list(l), list(v)] for (n, l), v in self.samples.items()],
+            }
+
+    def merge(self, snap: dict):
+        with self.lock:
+            for n, l, v in snap["counters"]:
+                k = (n, tuple(map(tuple, l)))
+                self.counters[k] = self.counters.get(k, 0) + v
+            for n, l, v in snap["maxima"]:
+                k = (n, tuple(map(tuple, l)))
+                self.maxima[k] = max(self.maxima.get(k, v), v)
+            for n, l, v in snap["samples"]:
+                self.samples.setdefault((n, tuple(map(tuple, l))), []).extend(v)
+
+    def summary(self) -> dict:
+        def series(items, value):
+            out = {}
+            for (n, l), v in sorted(items):
+                out.setdefault(n, []).append(dict(dict(l), **value(v)))
+            return out
+
+        with self.lock:
+            return {
+                "started": self.started,
+                "elapsed_s": round(time.time() - self.started, 3),
+                "counters": series(self.counters.items(), lambda v: {"value": v}),
+                "maxima": series(self.maxima.items(), lambda v: {"value": v}),
+                "timings": series(self.samples.items(), describe),
+            }
+
+    def prometheus(self) -> str:
+        lines = []
+        seen = set()
+
+        def head(name: str, kind: str):
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# HELP {PREFIX}{name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+        with self.lock:
+            for (n, l), v in sorted(self.counters.items()):
+                head(n, "counter")
+                lines.append(f"{PREFIX}{n}{_labels(l)} {_num(v)}")
+            for (n, l), v in sorted(self.maxima.items()):
+                head(n, "gauge")
+                lines.append(f"{PREFIX}{n}{_labels(l)} {_num(v)}")
+            for (n, l), v in sorted(self.samples.items()):
+                head(n, "histogram")
+                for le in BUCKETS:
+                    lines.append(f"{PREFIX}{n}_bucket{_labels(l + (('le', _num(le)),))} {sum(1 for x in v if x <= le)}")
+                lines.append(f"{PREFIX}{n}_bucket{_labels(l + (('le', '+Inf'),))} {len(v)}")
+                lines.append(f"{PREFIX}{n}_sum{_labels(l)} {_num(sum(v))}")
+                lines.append(f"{PREFIX}{n}_count{_labels(l)} {len(v)}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    esc = lambda s: str(s).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in pairs) + "}"
+
+
+def _num(v) -> str:
+    return repr(float(v)) if isinstance(v, float) and not v.is_integer() else str(int(v))
+
+
+def describe(values) -> dict:
+    s = sorted(values)
+    q = lambda p: s[min(len(s) - 1, int(p * len(s)))]
+    return {
+        "count": len(s),
+        "sum": round(sum(s), 6),
+        "min": round(s[0], 6),
+        "p50": round(q(0.50), 6),
+        "p90": round(q(0.90), 6),
+        "p99": round(q(0.99), 6),
+        "max": round(s[-1], 6),
+    }
+
+
+REGISTRY = Registry()
+
+
+def inc(name: str, value: float = 1, **labels):
+    REGISTRY.inc(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels):
+    REGISTRY.observe(name, value, **labels)
+
+
+class Profiler:
+    # cpu: a cProfile per stage entry, merged per stage at the end. Only the outermost
+    # stage on a thread profiles, since nested profilers would fight over the interpreter
+    # hook; inner stages are attributed to the stage that encloses them. Interpreters
+    # with one process-wide profiler slot (3.12+) skip stages that overlap on threads.
+    # memory: tracemalloc runs for the whole process; each outermost stage records its
+    # allocation peak, and the top allocation sites are dumped at the end. Peaks of
+    # stages running on several threads at once overlap.
+
+    def __init__(self, mode: str, out_dir: Path):
+        self.mode = mode
+        self.out_dir = Path(out_dir)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.profiles = {}
+        if mode == "memory":
+            tracemalloc.start(16)
+
+    @contextmanager
+    def stage(self, name: str):
+        if getattr(self.local, "active", None) is not None:
+            yield
+            return
+        self.local.active = name
+        try:
+            if self.mode == "cpu":
+                prof = cProfile.Profile()
+                try:
+                    prof.enable()
+                except ValueError:
+                    prof = None
+                try:
+                    yield
+                finally:
+                    if prof is not None:
+                        prof.disable()
+                        with self.lock:
+                            self.profiles.setdefault(name, []).append(prof)
+            else:
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                try:
+                    yield
+                finally:
+                    REGISTRY.maximum("stage_peak_alloc_bytes", tracemalloc.get_traced_memory()[1] - base, stage=name)
+        finally:
+            self.local.active = None
+
+    def write(self, top: int = 30) -> list:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+        if self.mode == "cpu":
+            for name, profs in sorted(self.profiles.items()):
+                stats = pstats.Stats(profs[0])
+                for p in profs[1:]:
+                    stats.add(p)
+                dump = self.out_dir / f"profile-{name}.pstats"
+                stats.dump_stats(dump)
+                with open(self.out_dir / f"profile-{name}.txt", "w") as f:
+                    pstats.Stats(str(dump), stream=f).sort_stats("cumulative").print_stats(top)
+                written += [dump, self.out_dir / f"profile-{name}.txt"]
+        else:
+            snap = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+            current, peak = tracemalloc.get_traced_memory()
+            path = self.out_dir / "profile-memory.txt"
+            lines = [f"# traced now {current} bytes, peak {peak} bytes", ""]
+            lines += [str(s) for s in snap.statistics("lineno")[:top]]
+            path.write_text("\n".join(lines) + "\n")
+            written.append(path)
+        return written
+
+
+PROFILER = None
+
+
+@contextmanager
+def stage(name: str, **labels):
+    # Times a block into stage_seconds{stage=...} and, under --profile, profiles it
+    start = time.perf_counter()
+    try:
+        if PROFILER is None:
+            yield
+        else:
+            with PROFILER.stage(name):
+                yield
+    finally:
+        REGISTRY.observe("stage_seconds", time.perf_counter() - start, stage=name, **labels)
+
+
+def timed(name: str):
+    # Decorator form of stage() for functions that are a stage as a whole
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+@contextmanager
+def scoped():
+    # Collects into a fresh registry for the duration (one work item in a worker process)
+    # and yields it; the caller ships registry.snapshot() to the parent to merge.
+    global REGISTRY
+    outer, REGISTRY = REGISTRY, Registry()
+    try:
+        yield REGISTRY
+    finally:
+        REGISTRY = outer
+
+
+def instrument_client(client):
+    # Latency, status, byte and error metrics from HTTPClient's response hook
+    def on_response(info: dict):
+        status = info.get("status", 0)
+        REGISTRY.inc("http_requests_total", status=status)
+        REGISTRY.observe("http_request_seconds", info.get("elapsed_s", 0.0))
+        REGISTRY.inc("http_bytes_sent_total", info.get("bytes_out", 0))
+        REGISTRY.inc("http_bytes_received_total", info.get("bytes_in", 0))
+        if "error" in info:
+            REGISTRY.inc("http_errors_total", kind=info["error"].split("(", 1)[0])
+        elif status >= 400:
+            REGISTRY.inc("http_errors_total", kind=f"http_{status}")
+
+    client.on_response.append(on_response)
+    return client
+
+
+def add_metrics_args(parser: argparse.ArgumentParser):
+    parser.add_argument("--metrics", metavar="PATH", help="Write a JSON metrics summary to PATH and Prometheus text format beside it (.prom)")
+    parser.add_argument("--profile", choices=("cpu", "memory"), help="Profile the timed stages with cProfile (cpu) or tracemalloc (memory)")
+    parser.add_argument("--profile-dir", default="logs/profile", help="Where --profile output goes (default: logs/profile)")
+
+
+def metrics_from_args(args):
+    global PROFILER
+    if getattr(args, "profile", None):
+        PROFILER = Profiler(args.profile, args.profile_dir)
+    return REGISTRY
+
+
+def finish(args, log=print):
+    # Writes whatever the run asked for; call once at the end of main()
+    if getattr(args, "metrics", None):
+        path = Path(args.metrics)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(REGISTRY.summary(), indent=2) + "\n")
+        prom = path.with_suffix(".prom")
+        tmp = prom.with_name(prom.name + ".part")
+        tmp.write_text(REGISTRY.prometheus())
+        # textfile collectors may read at any moment; never expose a half-written file
+        os.replace(tmp, prom)
+        log(f"Wrote {path} and {prom}")
+    if PROFILER is not None:
+        for p in PROFILER.write():
+            log(f"Wrote {p}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Print a metrics summary written by --metrics.")
+    ap.add_argument("summary", help="JSON file written by --metrics")
+    args = ap.parse_args()
+    data = json.loads(Path(args.summary).read_text())
+    print(f"elapsed {data['elapsed_s']}s")
+    for name, rows in data["timings"].items():
+        for r in rows:
+            labels = ",".join(f"{k}={v}" for k, v in r.items() if k not in ("count", "sum", "min", "p50", "p90", "p99", "max"))
+            print(f"{name}{{{labels}}} n={r['count']} sum={r['sum']:.3f}s p50={r['p50']:.4f}s p90={r['p90']:.4f}s p99={r['p99']:.4f}s max={r['max']:.4f}s")
+    for kind in ("counters", "maxima"):
+        for name, rows in data[kind].items():
+            for r in rows:
+                labels = ",".join(f"{k}={v}" for k, v in r.items() if k != "value")
+                print(f"{name}{{{labels}}} {r['value']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+import os
+import re
+import sys
+import gzip
+import shutil
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+
+# Text-like files worth shipping gzipped; images and audio sprites are already compressed
+COMPRESSIBLE = (".html", ".js", ".mjs", ".css", ".json", ".txt", ".svg", ".wav", ".ico", ".map")
+MIN_GZIP_BYTES = 512
+# name.<8+ hex>.ext or name-<8+ hex>.ext: content-addressed, safe to cache forever
+HASHED_NAME = re.compile(r"[.-][0-9a-f]{8,}\.[A-Za-z0-9]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+SKIP_DIRS = {".git", ".cache", "__pycache__", "node_modules", "logs"}
+# What the game loads; everything else under the root (scripts, build state, logs, the
+# repo itself) is 404
+PUBLIC_FILES = {"index.html", "style.css", "favicon.ico", "environmental_tips.txt"}
+PUBLIC_DIRS = {"src", "assets"}
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def file_etag(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return '"' + h.hexdigest()[:32] + '"'
+
+
+class ETagCache:
+    # Content-hash ETags, recomputed only when a file's size or mtime changes
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def get(self, path: Path, st: os.stat_result) -> str:
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self.lock:
+            hit = self.entries.get(path)
+        if hit and hit[0] == stamp:
+            return hit[1]
+        etag = file_etag(path)
+        with self.lock:
+            self.entries[path] = (stamp, etag)
+        return etag
+
+
+def gzip_path(path: Path) -> Path:
+    return path.with_name(path.name + ".gz")
+
+
+def precompress(root: Path, level: int = 9, min_bytes: int = MIN_GZIP_BYTES, log=print) -> int:
+    # Writes name.ext.gz next to every compressible file that is missing or stale one.
+    # Variants that do not save at least 10% are removed so the server sends the original.
+    written = 0
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS and not d.startswith("."))
+        for name in sorted(filenames):
+            src = Path(dirpath) / name
+            if src.suffix.lower() not in COMPRESSIBLE:
+                continue
+            st = src.stat()
+            gz = gzip_path(src)
+            if st.st_size < min_bytes:
+                continue
+            if gz.exists() and gz.stat().st_mtime_ns >= st.st_mtime_ns:
+                continue
+            tmp = gz.with_name(gz.name + ".part")
+            with open(src, "rb") as fin, open(tmp, "wb") as fout:
+                # mtime=0 keeps the output byte-identical across runs
+                with gzip.GzipFile(filename="", mode="wb", fileobj=fout, compresslevel=level, mtime=0) as z:
+                    shutil.copyfileobj(fin, z)
+            size = tmp.stat().st_size
+            if size > st.st_size * 0.9:
+                tmp.unlink()
+                if gz.exists():
+                    gz.unlink()
+                continue
+            os.replace(tmp, gz)
+            written += 1
+            log(f"GZIP {src.relative_to(root).as_posix()} {st.st_size} -> {size} bytes")
+    return written
+
+
+def parse_range(header: str, size: int):
+    # Single byte range -> (start, end inclusive); None to ignore the header; "unsatisfiable" for 416
+    m = RANGE_RE.match(header.strip())
+    if not m:
+        return None
+    first, last = m.groups()
+    if not first and not last:
+        return None
+    if not first:
+        n = int(last)
+        if n == 0:
+            return "unsatisfiable"
+        return max(0, size - n), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        return "unsatisfiable"
+    return start, end
+
+
+class AssetHandler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "RecycleHoleAssets/1.0"
+    extensions_map = {
+        **SimpleHTTPRequestHandler.extensions_map,
+        ".js": "text/javascript",
+        ".mjs": "text/javascript",
+        ".json": "application/json",
+        ".webp": "image/webp",
+        ".wav": "audio/wav",
+        ".ktx2": "image/ktx2",
+        ".wasm": "application/wasm",
+    }
+    etags = ETagCache()
+    quiet = False
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self.serve(head_only=False)
+
+    def do_HEAD(self):
+        self.serve(head_only=True)
+
+    def is_public(self, path: Path) -> bool:
+        try:
+            parts = path.relative_to(self.directory).parts
+        except ValueError:
+            return False
+        if any(p in SKIP_DIRS or p.startswith(".") for p in parts):
+            return False
+        if len(parts) == 1:
+            return parts[0] in PUBLIC_FILES
+        return parts[0] in PUBLIC_DIRS
+
+    def serve(self, head_only: bool):
+        path = Path(self.translate_path(self.path))
+        if path.is_dir():
+            if not self.path.split("?", 1)[0].endswith("/"):
+                self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+                self.send_header("Location", self.path.split("?", 1)[0] + "/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            path = path / "index.html"
+        if path.name.endswith(".gz") or path.name.endswith(".part") or not self.is_public(path) or not path.is_file():
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+
+        try:
+            st = path.stat()
+            etag = self.etags.get(path, st)
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+        cache_control = IMMUTABLE if HASHED_NAME.search(path.name) else REVALIDATE
+        ctype = self.guess_type(str(path))
+
+        # The gzip variant is a different representation, so it gets its own strong ETag
+        range_header = self.headers.get("Range")
+        body = path
+        encoding = None
+        gz = gzip_path(path)
+        if range_header is None and "gzip" in self.headers.get("Accept-Encoding", "") and gz.is_file():
+            gst = gz.stat()
+            if gst.st_mtime_ns >= st.st_mtime_ns:
+                body, encoding, st = gz, "gzip", gst
+                etag = etag[:-1] + '.gz"'
+
+        def common_headers():
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", formatdate(path.stat().st_mtime, usegmt=True))
+            self.send_header("Cache-Control", cache_control)
+            self.send_header("Accept-Ranges", "bytes")
+            if path.suffix.lower() in COMPRESSIBLE:
+                self.send_header("Vary", "Accept-Encoding")
+
+        if self.not_modified(etag, path):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            common_headers()
+            self.end_headers()
+            return
+
+        size = st.st_size
+        start, end = 0, size - 1
+        status = HTTPStatus.OK
+        if range_header is not None and self.range_applies(etag, path):
+            rng = parse_range(range_header, size)
+            if rng == "unsatisfiable":
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if rng is not None:
+                start, end = rng
+                status = HTTPStatus.PARTIAL_CONTENT
+
+        length = max(0, end - start + 1)
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(length))
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        if status == HTTPStatus.PARTIAL_CONTENT:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        common_headers()
+        self.end_headers()
+        if head_only or not length:
+            return
+        with open(body, "rb") as f:
+            try:
+                # Zero-copy from the page cache straight to the socket
+                self.connection.sendfile(f, offset=start, count=length)
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+
+    def not_modified(self, etag: str, path: Path) -> bool:
+        inm = self.headers.get("If-None-Match")
+        if inm is not None:
+            tags = [t.strip().removeprefix("W/") for t in inm.split(",")]
+            return "*" in tags or etag in tags
+        ims = self.headers.get("If-Modified-Since")
+        if ims:
+            try:
+                return int(path.stat().st_mtime) <= parsedate_to_datetime(ims).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def range_applies(self, etag: str, path: Path) -> bool:
+        # If-Range: only honor the range when the client's copy is still current
+        cond = self.headers.get("If-Range")
+        if not cond:
+            return True
+        cond = cond.strip()
+        if cond.startswith('"') or cond.startswith("W/"):
+            return cond == etag
+        try:
+            return int(path.stat().st_mtime) <= parsedate_to_datetime(cond).timestamp()
+        except (TypeError, ValueError):
+            return False
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve the game with precompressed variants, ETags, caching headers and range support.")
+    ap.add_argument("--root", default=".", help="Directory to serve (default: current directory)")
+    ap.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    ap.add_argument("--port", type=int, default=8000, help="Port (default: 8000)")
+    ap.add_argument("--no-precompress", action="store_true", help="Do not build missing or stale .gz variants before serving")
+    ap.add_argument("--precompress-only", action="store_true", help="Build .gz variants and exit")
+    ap.add_argument("--quiet", action="store_true", help="Do not log requests")
+    args = ap.parse_args()
+
+    root = Path(args.root).resolve()
+    if not root.is_dir():
+        print(f"Root not found: {root}")
+        sys.exit(2)
+    if not args.no_precompress or args.precompress_only:
+        count = precompress(root)
+        print(f"Precompressed {count} files under {root}")
+        if args.precompress_only:
+            return
+
+    AssetHandler.quiet = args.quiet
+
+    def handler(*a, **kw):
+        return AssetHandler(*a, directory=str(root), **kw)
+
+    httpd = ThreadingHTTPServer((args.host, args.port), handler)
+    httpd.daemon_threads = True
+    print(f"Serving {root} at http://{args.host}:{args.port}/")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+import sys
+import json
+import hashlib
+import argparse
+from pathlib import Path
+
+from asset_index import add_index_args, index_from_args
+
+try:
+    import numpy as np
+    from PIL import Image
+except Exception as e:
+    print("NumPy and Pillow are required. Install with: pip install numpy pillow")
+    sys.exit(1)
+
+
+DEFAULT_DIRS = "trash,player,interactables"
+IMAGE_EXTS = (".webp", ".png")
+
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:16]
+
+
+def alpha_bbox(alpha: np.ndarray, threshold: int = 0):
+    # (x0, y0, x1, y1) of pixels with alpha > threshold, or None when fully transparent
+    mask = alpha > threshold
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    if not rows.size:
+        return None
+    return int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
+
+
+def _pool2x2(a: np.ndarray) -> np.ndarray:
+    # Sum of each 2x2 block (edge-padded to even size)
+    h, w = a.shape[:2]
+    if h % 2 or w % 2:
+        pad = [(0, h % 2), (0, w % 2)] + [(0, 0)] * (a.ndim - 2)
+        a = np.pad(a, pad, mode="edge")
+    return a[0::2, 0::2] + a[1::2, 0::2] + a[0::2, 1::2] + a[1::2, 1::2]
+
+
+def bleed(rgba: np.ndarray) -> np.ndarray:
+    # Push-pull fill: average opaque colors down a 2x2 pyramid, then pull the coarse
+    # averages back up into transparent pixels. Edge colors spread outward so bilinear
+    # filtering and mipmaps never blend towards black. Alpha is untouched.
+    known = rgba[..., 3] > 0
+    if known.all() or not known.any():
+        return rgba
+    weight = known.astype(np.float32)
+    color = rgba[..., :3].astype(np.float32) * weight[..., None]
+    levels = [(color, weight)]
+    # Down to 1x1 on both axes: stopping at the short side leaves the middle of a wide
+    # or tall sprite with nothing to pull from
+    while max(color.shape[:2]) > 1:
+        color, weight = _pool2x2(color), _pool2x2(weight)
+        levels.append((color, weight))
+    fill = reached = None
+    for color, weight in reversed(levels):
+        h, w = weight.shape
+        avg = color / np.maximum(weight, 1e-6)[..., None]
+        if fill is None:
+            fill, reached = avg, weight > 0
+            continue
+        up = np.repeat(np.repeat(fill, 2, axis=0), 2, axis=1)[:h, :w]
+        fill = np.where((weight > 0)[..., None], avg, up)
+        reached = (weight > 0) | np.repeat(np.repeat(reached, 2, axis=0), 2, axis=1)[:h, :w]
+    # Every transparent pixel must have pulled a color from some level; one that did not
+    # would keep the zero color this is meant to remove
+    if not reached.all():
+        raise RuntimeError(f"bleed left {int((~reached).sum())} pixels unfilled")
+    out = rgba.copy()
+    out[~known, :3] = np.clip(np.rint(fill[~known]), 0, 255).astype(np.uint8)
+    return out
+
+
+def trim_array(rgba: np.ndarray, margin: int = 2, threshold: int = 0, bleed_edges: bool = True):
+    # Returns (trimmed rgba, (x, y, w, h) in source pixels) or (None, None) when fully transparent
+    box = alpha_bbox(rgba[..., 3], threshold)
+    if box is None:
+        return None, None
+    h, w = rgba.shape[:2]
+    x0, y0 = max(0, box[0] - margin), max(0, box[1] - margin)
+    x1, y1 = min(w, box[2] + margin), min(h, box[3] + margin)
+    cropped = rgba[y0:y1, x0:x1]
+    if bleed_edges:
+        cropped = bleed(cropped)
+    return cropped, (x0, y0, x1 - x0, y1 - y0)
+
+
+def save_like(arr: np.ndarray, path: Path, quality: int, method: int = 4):
+    im = Image.fromarray(arr, "RGBA")
+    if path.suffix.lower() == ".webp":
+        # exact=True keeps the bled RGB under transparent pixels instead of letting the encoder zero it
+        im.save(path, format="WEBP", quality=quality, exact=True, method=method)
+    else:
+        im.save(path, format="PNG", optimize=True)
+
+
+def load_metadata(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except Exception:
+        return {}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Crop transparent sprites to their alpha bounding box and bleed edge colors.")
+    ap.add_argument("--assets-dir", default="assets", help="Assets root directory (default: assets)")
+    ap.add_argument("--dirs", default=DEFAULT_DIRS, help=f"Comma-separated folders under the assets root to process (default: {DEFAULT_DIRS})")
+    ap.add_argument("--margin", type=int, default=2, help="Transparent pixels kept around the opaque area (default: 2)")
+    ap.add_argument("--alpha-threshold", type=int, default=0, help="Alpha values at or below this count as empty (default: 0)")
+    ap.add_argument("--no-bleed", action="store_true", help="Leave the color of transparent pixels as-is")
+    ap.add_argument("--quality", type=int, default=90, help="WebP quality when re-encoding (default: 90)")
+    ap.add_argument("--method", type=int, default=4, help="WebP encoder effort 0..6 when re-encoding (default: 4)")
+    ap.add_argument("--metadata", help="Trim metadata file (default: <assets-dir>/sprite-trim.json)")
+    ap.add_argument("--dry-run", action="store_true", help="Report what would be trimmed without writing")
+    add_index_args(ap)
+    args = ap.parse_args()
+
+    root = Path(args.assets_dir)
+    if not root.exists():
+        print(f"Assets dir not found: {root}")
+        sys.exit(2)
+    meta_path = Path(args.metadata) if args.metadata else root / "sprite-trim.json"
+    metadata = load_metadata(meta_path)
+
+    # The index has every candidate's hash and whether it has alpha at all, so sprites that
+    # are already trimmed or opaque are settled without reading them
+    index = index_from_args(args, root)
+    rows = []
+    for d in (d.strip() for d in args.dirs.split(",") if d.strip()):
+        rows.extend(r for r in index.files(f"{index.web_path(root / d)}/", IMAGE_EXTS) if "@" not in Path(r["path"]).stem)
+
+    pixels_before = pixels_after = 0
+    for row in rows:
+        path = index.path(row)
+        key = row["path"]
+        prev = metadata.get(key)
+        if prev and prev.get("hash") == row["hash"][:16]:
+            print(f"KEEP {key} (already trimmed)")
+            continue
+        if row["width"] is not None and row["alpha_coverage"] is None:
+            print(f"SKIP {key} (no alpha)")
+            continue
+        try:
+            with Image.open(path) as im:
+                if "A" not in im.getbands() and "transparency" not in im.info:
+                    print(f"SKIP {key} (no alpha)")
+                    continue
+                rgba = np.asarray(im.convert("RGBA"))
+        except Exception as e:
+            print(f"FAIL {key}: {e}")
+            continue
+
+        h, w = rgba.shape[:2]
+        trimmed, box = trim_array(rgba, margin=args.margin, threshold=args.alpha_threshold, bleed_edges=not args.no_bleed)
+        if trimmed is None:
+            print(f"SKIP {key} (fully transparent)")
+            continue
+        x, y, tw, th = box
+        src_w, src_h = w, h
+        if prev and (prev.get("w"), prev.get("h")) == (w, h):
+            # Re-encoded copy of an already trimmed sprite: offsets compose, original size sticks
+            x, y = x + prev["x"], y + prev["y"]
+            src_w, src_h = prev["sw"], prev["sh"]
+        pixels_before += w * h
+        pixels_after += tw * th
+        print(f"TRIM {key} {w}x{h} -> {tw}x{th} at ({x},{y}) [{1 - (tw * th) / (w * h):.0%} fewer pixels]")
+        if args.dry_run:
+            continue
+        save_like(trimmed, path, args.quality, args.method)
+        metadata[key] = {"x": x, "y": y, "w": tw, "h": th, "sw": src_w, "sh": src_h, "hash": file_hash(path)}
+
+    if not args.dry_run:
+        index.update(root.name)
+        meta_path.write_text(json.dumps(dict(sorted(metadata.items())), indent=2) + "\n")
+        print(f"Wrote {meta_path}")
+    if pixels_before:
+        print(f"Done. {pixels_before} -> {pixels_after} pixels ({1 - pixels_after / pixels_before:.0%} fewer).")
+    else:
+        print("Done. Nothing to trim.")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
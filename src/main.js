@@ -69,8 +69,51 @@ import { startGame } from './modules/game.js';
     },
   };
 
+  // All cues packed into one file by scripts/build_audio_sprite.py: one request, one decode.
+  // Clips missing from the sprite (or browsers without Web Audio) fall back to their own WAV.
+  let audioSprite = null;
+  let audioSpriteLoading = null;
+
+  function loadAudioSprite() {
+    if (audioSpriteLoading) return audioSpriteLoading;
+    const Ctx = window.AudioContext || window.webkitAudioContext;
+    if (!Ctx) return Promise.resolve(null);
+    audioSpriteLoading = (async () => {
+      try {
+        const meta = await (await fetch('assets/audio/sprite.json')).json();
+        const data = await (await fetch(meta.src)).arrayBuffer();
+        const ctx = new Ctx();
+        const buffer = await new Promise((res, rej) => ctx.decodeAudioData(data, res, rej));
+        audioSprite = { ctx, buffer, clips: meta.clips || {} };
+      } catch (err) {
+        console.warn('Audio sprite unavailable, using individual clips:', err);
+      }
+      return audioSprite;
+    })();
+    return audioSpriteLoading;
+  }
+
+  function playSpriteClip(clip) {
+    return new Promise((resolve) => {
+      try {
+        const { ctx, buffer } = audioSprite;
+        if (ctx.state === 'suspended') ctx.resume();
+        const source = ctx.createBufferSource();
+        source.buffer = buffer;
+        source.connect(ctx.destination);
+        source.onended = () => resolve();
+        source.start(0, clip.start, clip.duration);
+      } catch (err) {
+        console.error('Audio play failed:', err);
+        resolve();
+      }
+    });
+  }
+
   function playUrl(url) {
     if (!audioCuesEnabled || !url) return Promise.resolve();
+    const clip = audioSprite && audioSprite.clips[url];
+    if (clip) return playSpriteClip(clip);
     return new Promise((resolve) => {
       try {
         const audio = new Audio(url);
@@ -206,11 +249,13 @@ import { startGame } from './modules/game.js';
     if (storedPref === 'true') {
       audioCuesEnabled = true;
       ttsToggle.checked = true;
+      loadAudioSprite();
     }
 
     ttsToggle.addEventListener('change', (e) => {
       audioCuesEnabled = e.target.checked;
       localStorage.setItem('audioCuesEnabled', audioCuesEnabled.toString());
+      if (audioCuesEnabled) loadAudioSprite();
     });
   }
 
@@ -1,5 +1,5 @@
 import * as THREE from 'https://unpkg.com/three@0.180.0/build/three.module.js';
-import { TextureLoaderEx, makeFallbackTexture } from './loader.js';
+import { AssetPack, TextureLoaderEx, makeFallbackTexture } from './loader.js';
 import { TRASH_CATEGORIES } from './trash-manifest.js';
 
 export async function startGame({
@@ -29,7 +29,11 @@ export async function startGame({
   scene.add(new THREE.DirectionalLight(0xffffff, 1.0));
   scene.add(new THREE.AmbientLight(0xffffff, 0.6));
 
-  const loader = new TextureLoaderEx();
+  // One request for every startup texture when scripts/build_asset_pack.py has been run
+  const loader = new TextureLoaderEx(await AssetPack.load());
+  // Sprites and tiles start as tiny previews and sharpen as their full images arrive;
+  // textures built by scripts/ktx2.py load as KTX2 with their mip chains
+  await Promise.all([loader.loadPreviews(), loader.loadKTX2Manifest()]);
 
   // Tunables
   const groundSize = 120;
@@ -38,148 +42,174 @@ export async function startGame({
   const speed = 120 * 1.33;
   const friction = 0.85;
 
-  // Ground
-  async function loadTileSet(paths, fallbackColor, label) {
-    const texs = [];
-    for (const path of paths) {
-      const tex = await loader.loadTexOrFallback(path, fallbackColor, label);
-      texs.push(tex);
-    }
-    return texs;
+  // Ground: prefer a layout pre-baked by scripts/bake_ground.py (a few large textures,
+  // a handful of meshes); otherwise build the tile grid here, one mesh per tile.
+  async function loadBakedGround(group) {
+    const index = (loader.pack && loader.pack.json('assets/ground/ground.json')) ||
+      (await fetch('assets/ground/ground.json')
+        .then((r) => (r.ok ? r.json() : null))
+        .catch(() => null));
+    if (!index || !index.layouts || !index.layouts.length) return false;
+    const url = index.layouts[Math.floor(Math.random() * index.layouts.length)];
+    const layout = (loader.pack && loader.pack.json(url)) ||
+      (await fetch(url)
+        .then((r) => (r.ok ? r.json() : null))
+        .catch(() => null));
+    if (!layout || !layout.chunks) return false;
+    const textures = await Promise.all(
+      layout.chunks.map(async (c) => (await loader.tryLoadTex(loader.resolve(c.image))) || loader.tryLoadTex(c.image))
+    );
+    if (textures.some((t) => !t)) return false;
+    layout.chunks.forEach((c, k) => {
+      textures[k].anisotropy = renderer.capabilities.getMaxAnisotropy();
+      const plane = new THREE.Mesh(new THREE.PlaneGeometry(c.width, c.depth), new THREE.MeshLambertMaterial({ map: textures[k] }));
+      plane.rotation.x = -Math.PI / 2;
+      plane.position.set(c.x, 0, c.z);
+      group.add(plane);
+    });
+    return true;
   }
 
-  const grassTiles = await loadTileSet(
-    ['assets/tiles/grass_0.png', 'assets/tiles/grass_1.png'],
-    '#9ae66e',
-    'GR'
-  );
-  const roadTiles = await loadTileSet(
-    ['assets/tiles/asphalt_0.png', 'assets/tiles/asphalt_1.png'],
-    '#666666',
-    'RD'
-  );
-  const concreteTiles = await loadTileSet(
-    ['assets/tiles/concrete_0.png', 'assets/tiles/concrete_1.png'],
-    '#bdbdbd',
-    'CT'
-  );
+  async function buildTileGround(ground) {
+    function loadTileSet(paths, fallbackColor, label) {
+      return paths.map((path) => loader.loadProgressive(path, fallbackColor, label));
+    }
 
-  const ground = new THREE.Group();
-  const gridSize = 12;
-  const tileSize = 10;
-  // const groundSize = gridSize * tileSize; // This was the bug - groundSize is already defined
-  const tileTypes = Array.from({ length: gridSize }, () => new Array(gridSize).fill('grass'));
-
-  const centerIndex = Math.floor(gridSize / 2);
-  const roadRows = new Set([centerIndex]);
-  const roadCols = new Set([centerIndex]);
-  const desiredRowCount = 2 + Math.floor(Math.random() * 2); // 2-3 rows total
-  const desiredColCount = 2 + Math.floor(Math.random() * 2); // 2-3 cols total
-  while (roadRows.size < desiredRowCount) {
-    roadRows.add(Math.floor(Math.random() * gridSize));
-  }
-  while (roadCols.size < desiredColCount) {
-    roadCols.add(Math.floor(Math.random() * gridSize));
-  }
+    const grassTiles = loadTileSet(
+      ['assets/tiles/grass_0.png', 'assets/tiles/grass_1.png'],
+      '#9ae66e',
+      'GR'
+    );
+    const roadTiles = loadTileSet(
+      ['assets/tiles/asphalt_0.png', 'assets/tiles/asphalt_1.png'],
+      '#666666',
+      'RD'
+    );
+    const concreteTiles = loadTileSet(
+      ['assets/tiles/concrete_0.png', 'assets/tiles/concrete_1.png'],
+      '#bdbdbd',
+      'CT'
+    );
+
+    const gridSize = 12;
+    const tileSize = 10;
+    // const groundSize = gridSize * tileSize; // This was the bug - groundSize is already defined
+    const tileTypes = Array.from({ length: gridSize }, () => new Array(gridSize).fill('grass'));
+
+    const centerIndex = Math.floor(gridSize / 2);
+    const roadRows = new Set([centerIndex]);
+    const roadCols = new Set([centerIndex]);
+    const desiredRowCount = 2 + Math.floor(Math.random() * 2); // 2-3 rows total
+    const desiredColCount = 2 + Math.floor(Math.random() * 2); // 2-3 cols total
+    while (roadRows.size < desiredRowCount) {
+      roadRows.add(Math.floor(Math.random() * gridSize));
+    }
+    while (roadCols.size < desiredColCount) {
+      roadCols.add(Math.floor(Math.random() * gridSize));
+    }
 
-  for (let i = 0; i < gridSize; i++) {
-    for (let j = 0; j < gridSize; j++) {
-      if (roadRows.has(i) || roadCols.has(j)) {
-        tileTypes[i][j] = 'road';
+    for (let i = 0; i < gridSize; i++) {
+      for (let j = 0; j < gridSize; j++) {
+        if (roadRows.has(i) || roadCols.has(j)) {
+          tileTypes[i][j] = 'road';
+        }
       }
     }
-  }
-
-  const directions = [
-    [1, 0],
-    [-1, 0],
-    [0, 1],
-    [0, -1],
-  ];
 
-  for (let i = 0; i < gridSize; i++) {
-    for (let j = 0; j < gridSize; j++) {
-      if (tileTypes[i][j] !== 'grass') continue;
-      const nearRoad = directions.some(([di, dj]) => {
-        const ni = i + di;
-        const nj = j + dj;
-        return ni >= 0 && ni < gridSize && nj >= 0 && nj < gridSize && tileTypes[ni][nj] === 'road';
-      });
-      if (nearRoad && Math.random() < 0.6) {
-        tileTypes[i][j] = 'concrete';
+    const directions = [
+      [1, 0],
+      [-1, 0],
+      [0, 1],
+      [0, -1],
+    ];
+
+    for (let i = 0; i < gridSize; i++) {
+      for (let j = 0; j < gridSize; j++) {
+        if (tileTypes[i][j] !== 'grass') continue;
+        const nearRoad = directions.some(([di, dj]) => {
+          const ni = i + di;
+          const nj = j + dj;
+          return ni >= 0 && ni < gridSize && nj >= 0 && nj < gridSize && tileTypes[ni][nj] === 'road';
+        });
+        if (nearRoad && Math.random() < 0.6) {
+          tileTypes[i][j] = 'concrete';
+        }
       }
     }
-  }
 
-  for (let i = 0; i < gridSize; i++) {
-    for (let j = 0; j < gridSize; j++) {
-      if (tileTypes[i][j] !== 'grass') continue;
-      const nearConcrete = directions.some(([di, dj]) => {
-        const ni = i + di;
-        const nj = j + dj;
-        return ni >= 0 && ni < gridSize && nj >= 0 && nj < gridSize && tileTypes[ni][nj] === 'concrete';
-      });
-      if (nearConcrete && Math.random() < 0.35) {
-        tileTypes[i][j] = 'concrete';
+    for (let i = 0; i < gridSize; i++) {
+      for (let j = 0; j < gridSize; j++) {
+        if (tileTypes[i][j] !== 'grass') continue;
+        const nearConcrete = directions.some(([di, dj]) => {
+          const ni = i + di;
+          const nj = j + dj;
+          return ni >= 0 && ni < gridSize && nj >= 0 && nj < gridSize && tileTypes[ni][nj] === 'concrete';
+        });
+        if (nearConcrete && Math.random() < 0.35) {
+          tileTypes[i][j] = 'concrete';
+        }
       }
     }
-  }
 
-  const grassTextureIndices = Array.from({ length: gridSize }, () => new Array(gridSize).fill(-1));
-  const roadTextureByRow = new Map();
-  const roadTextureByCol = new Map();
-
-  for (let i = 0; i < gridSize; i++) {
-    for (let j = 0; j < gridSize; j++) {
-      let tileTexture = grassTiles[0];
-      const tileType = tileTypes[i][j];
-      if (tileType === 'road') {
-        let idx = -1;
-        if (roadRows.has(i)) {
-          if (!roadTextureByRow.has(i)) {
-            roadTextureByRow.set(i, Math.floor(Math.random() * roadTiles.length));
+    const grassTextureIndices = Array.from({ length: gridSize }, () => new Array(gridSize).fill(-1));
+    const roadTextureByRow = new Map();
+    const roadTextureByCol = new Map();
+
+    for (let i = 0; i < gridSize; i++) {
+      for (let j = 0; j < gridSize; j++) {
+        let tileTexture = grassTiles[0];
+        const tileType = tileTypes[i][j];
+        if (tileType === 'road') {
+          let idx = -1;
+          if (roadRows.has(i)) {
+            if (!roadTextureByRow.has(i)) {
+              roadTextureByRow.set(i, Math.floor(Math.random() * roadTiles.length));
+            }
+            idx = roadTextureByRow.get(i);
           }
-          idx = roadTextureByRow.get(i);
-        }
-        if (!roadRows.has(i) && roadCols.has(j)) {
-          if (!roadTextureByCol.has(j)) {
-            roadTextureByCol.set(j, Math.floor(Math.random() * roadTiles.length));
+          if (!roadRows.has(i) && roadCols.has(j)) {
+            if (!roadTextureByCol.has(j)) {
+              roadTextureByCol.set(j, Math.floor(Math.random() * roadTiles.length));
+            }
+            idx = roadTextureByCol.get(j);
           }
-          idx = roadTextureByCol.get(j);
-        }
-        if (idx < 0) idx = Math.floor(Math.random() * roadTiles.length);
-        tileTexture = roadTiles[idx % roadTiles.length];
-      } else if (tileType === 'concrete') {
-        const idx = Math.floor(Math.random() * concreteTiles.length);
-        tileTexture = concreteTiles[idx];
-      } else {
-        let idx = -1;
-        const neighborIndices = [];
-        if (i > 0 && tileTypes[i - 1][j] === 'grass') {
-          const ni = grassTextureIndices[i - 1][j];
-          if (ni >= 0) neighborIndices.push(ni);
-        }
-        if (j > 0 && tileTypes[i][j - 1] === 'grass') {
-          const ni = grassTextureIndices[i][j - 1];
-          if (ni >= 0) neighborIndices.push(ni);
-        }
-        if (neighborIndices.length && Math.random() < 0.75) {
-          idx = neighborIndices[Math.floor(Math.random() * neighborIndices.length)];
-        }
-        if (idx < 0) {
-          idx = Math.floor(Math.random() * grassTiles.length);
+          if (idx < 0) idx = Math.floor(Math.random() * roadTiles.length);
+          tileTexture = roadTiles[idx % roadTiles.length];
+        } else if (tileType === 'concrete') {
+          const idx = Math.floor(Math.random() * concreteTiles.length);
+          tileTexture = concreteTiles[idx];
+        } else {
+          let idx = -1;
+          const neighborIndices = [];
+          if (i > 0 && tileTypes[i - 1][j] === 'grass') {
+            const ni = grassTextureIndices[i - 1][j];
+            if (ni >= 0) neighborIndices.push(ni);
+          }
+          if (j > 0 && tileTypes[i][j - 1] === 'grass') {
+            const ni = grassTextureIndices[i][j - 1];
+            if (ni >= 0) neighborIndices.push(ni);
+          }
+          if (neighborIndices.length && Math.random() < 0.75) {
+            idx = neighborIndices[Math.floor(Math.random() * neighborIndices.length)];
+          }
+          if (idx < 0) {
+            idx = Math.floor(Math.random() * grassTiles.length);
+          }
+          grassTextureIndices[i][j] = idx;
+          tileTexture = grassTiles[idx];
         }
-        grassTextureIndices[i][j] = idx;
-        tileTexture = grassTiles[idx];
+        const groundMat = new THREE.MeshLambertMaterial({ map: tileTexture });
+        const plane = new THREE.Mesh(new THREE.PlaneGeometry(tileSize, tileSize), groundMat);
+        plane.rotation.x = -Math.PI / 2;
+        plane.position.x = (i - gridSize / 2) * tileSize + tileSize / 2;
+        plane.position.z = (j - gridSize / 2) * tileSize + tileSize / 2;
+        ground.add(plane);
       }
-      const groundMat = new THREE.MeshLambertMaterial({ map: tileTexture });
-      const plane = new THREE.Mesh(new THREE.PlaneGeometry(tileSize, tileSize), groundMat);
-      plane.rotation.x = -Math.PI / 2;
-      plane.position.x = (i - gridSize / 2) * tileSize + tileSize / 2;
-      plane.position.z = (j - gridSize / 2) * tileSize + tileSize / 2;
-      ground.add(plane);
     }
   }
+
+  const ground = new THREE.Group();
+  if (!(await loadBakedGround(ground))) await buildTileGround(ground);
   scene.add(ground);
 
   // Buildings: glass/metal/brick/stucco/houses
@@ -189,7 +219,10 @@ export async function startGame({
     for (let i = 0; i < count; i++) {
       const base = `assets/tiles/buildings/${prefix}/${prefix}_${i}.png`;
       const webp = base.replace(/\.png$/, '.webp');
-      const t = (await loader.tryLoadTex(webp)) || (await loader.tryLoadTex(base));
+      // A preview means the file existed at build time, so there is nothing to probe
+      const t = loader.preview(base)
+        ? loader.loadProgressive(base, '#d3c7b8', 'WALL')
+        : (await loader.tryLoadTex(webp)) || (await loader.tryLoadTex(base));
       if (t) list.push(t);
     }
     return list;
@@ -199,7 +232,7 @@ export async function startGame({
   const brickTexs = await loadCategory('brick');
   const stuccoTexs = await loadCategory('stucco');
   const paintTexs = await loadCategory('house_paint');
-  const fallbackWall = await loader.loadTexOrFallback('assets/tiles/building_wall_0.png', '#d3c7b8', 'WALL');
+  const fallbackWall = loader.loadProgressive('assets/tiles/building_wall_0.png', '#d3c7b8', 'WALL');
   const pick = (arr, fallback) => arr.length ? arr[Math.floor(Math.random()*arr.length)] : fallback;
   const makeMat = (tex, color) => new THREE.MeshLambertMaterial({ map: tex, color });
   const housePalette = [0xffffff, 0xfff1a8, 0xffd4d1, 0xcff0d6, 0xd6ebff, 0xf2f7ff, 0xf4e1ff];
@@ -256,13 +289,29 @@ export async function startGame({
     }
   }
 
+  // Sprites cropped by scripts/trim_sprites.py keep their original footprint: the plane
+  // shrinks to the trimmed rect and shifts to where that rect sat on the source canvas.
+  const spriteTrim = (loader.pack && loader.pack.json('assets/sprite-trim.json')) ||
+    (await fetch('assets/sprite-trim.json')
+      .then((res) => (res.ok ? res.json() : {}))
+      .catch(() => ({})));
+  function spriteGeometry(path, width, height) {
+    const trim = path && (spriteTrim[path] || spriteTrim[path.replace(/\.(png|webp)$/, (m) => (m === '.png' ? '.webp' : '.png'))]);
+    if (!trim) return new THREE.PlaneGeometry(width, height);
+    const geo = new THREE.PlaneGeometry((width * trim.w) / trim.sw, (height * trim.h) / trim.sh);
+    geo.translate(
+      width * ((trim.x + trim.w / 2) / trim.sw - 0.5),
+      -height * ((trim.y + trim.h / 2) / trim.sh - 0.5),
+      0
+    );
+    return geo;
+  }
+
   // Player hole: decals for each bin type
   const holeGroup = new THREE.Group();
   scene.add(holeGroup);
   let holeRadius = 2.0;
 
-  const holeGeo = new THREE.PlaneGeometry(1, 1);
-
   const binDefinitions = [
     { key: 'trash', path: 'assets/player/trashcan_hole.webp', fallbackColor: '#202020' },
     { key: 'paper', path: 'assets/player/paperbin.webp', fallbackColor: '#1d3d90' },
@@ -273,11 +322,13 @@ export async function startGame({
   const binMeshes = [];
   for (let i = 0; i < binDefinitions.length; i++) {
     const definition = binDefinitions[i];
-    const tex =
-      (await loader.tryLoadTex(definition.path)) ||
-      makeFallbackTexture(definition.fallbackColor, definition.key.slice(0, 2).toUpperCase());
+    const tex = loader.loadProgressive(
+      definition.path,
+      definition.fallbackColor,
+      definition.key.slice(0, 2).toUpperCase()
+    );
     const mat = new THREE.MeshBasicMaterial({ map: tex, transparent: true });
-    const mesh = new THREE.Mesh(holeGeo, mat);
+    const mesh = new THREE.Mesh(spriteGeometry(definition.path, 1, 1), mat);
     mesh.rotation.x = -Math.PI / 2;
     mesh.position.y = 0.021;
     mesh.scale.set(holeRadius * 2, holeRadius * 2, 1);
@@ -315,34 +366,21 @@ export async function startGame({
   const maxPerCat = 30;
   const trash = [];
   const spawnArea = groundSize * 0.45;
-  const pickTex = async (cat) => {
+  const pickTex = (cat) => {
     const candidates = cat.textures || [];
     if (!candidates.length) return null;
-    const indices = [...candidates.keys()];
-    // Shuffle indices to randomize attempts without repeats
-    for (let i = indices.length - 1; i > 0; i--) {
-      const j = Math.floor(Math.random() * (i + 1));
-      [indices[i], indices[j]] = [indices[j], indices[i]];
-    }
-    for (const idx of indices) {
-      const path = candidates[idx];
-      const tex =
-        (await loader.tryLoadTex(path)) ||
-        (path.endsWith('.webp')
-          ? await loader.tryLoadTex(path.replace(/\.webp$/, '.png'))
-          : null);
-      if (tex) return tex;
-    }
-    return null;
+    // The manifest only lists files that exist, in their shipped format, so no probing;
+    // its inline preview stands in until the sprite has downloaded
+    const pick = candidates[Math.floor(Math.random() * candidates.length)];
+    return loader.loadProgressive(pick.path, '#ffffff', cat.key.slice(0, 3).toUpperCase(), pick.preview);
   };
   for (const cat of categories) {
     const count = Math.floor(maxPerCat * (0.7 + Math.random() * 0.6));
     for (let i = 0; i < count; i++) {
-      const tex =
-        (await pickTex(cat)) || makeFallbackTexture('#ffffff', cat.key.slice(0, 3).toUpperCase());
+      const tex = pickTex(cat) || makeFallbackTexture('#ffffff', cat.key.slice(0, 3).toUpperCase());
       tex.wrapS = tex.wrapT = THREE.ClampToEdgeWrapping;
       const size = ITEM_SCALE * cat.baseSize * (0.85 + Math.random() * 0.5);
-      const geo = new THREE.PlaneGeometry(size, size);
+      const geo = spriteGeometry(tex.userData.path, size, size);
       const mat = new THREE.MeshBasicMaterial({ map: tex, transparent: true });
       const m = new THREE.Mesh(geo, mat);
       m.rotation.x = -Math.PI / 2;
@@ -365,11 +403,11 @@ export async function startGame({
   // Leaky Faucets
   const faucets = [];
   const numFaucets = 5;
-  const faucetTex = await loader.loadTexOrFallback('assets/interactables/faucet.png', '#cccccc', 'FAUCET');
+  const faucetTex = loader.loadProgressive('assets/interactables/faucet.png', '#cccccc', 'FAUCET');
 
   for (let i = 0; i < numFaucets; i++) {
     const faucetMat = new THREE.MeshBasicMaterial({ map: faucetTex, transparent: true });
-    const faucetGeo = new THREE.PlaneGeometry(2, 2);
+    const faucetGeo = spriteGeometry('assets/interactables/faucet.png', 2, 2);
     const faucet = new THREE.Mesh(faucetGeo, faucetMat);
     faucet.rotation.x = -Math.PI / 2;
     const x = (Math.random() - 0.5) * (spawnArea * 1.8);
@@ -1,14 +1,128 @@
 import * as THREE from 'https://unpkg.com/three@0.180.0/build/three.module.js';
+
+// Reader for the single-file pack written by scripts/build_asset_pack.py. The pack is
+// fetched once; entries are sliced out of the same ArrayBuffer without copying.
+export class AssetPack {
+  static async load(pointerUrl = 'assets/pack/pack.json') {
+    try {
+      const pointer = await (await fetch(pointerUrl)).json();
+      const res = await fetch(pointer.src);
+      if (!res.ok) return null;
+      return new AssetPack(await res.arrayBuffer());
+    } catch (e) {
+      return null;
+    }
+  }
+
+  constructor(buffer) {
+    const view = new DataView(buffer);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    if (magic !== 'RHPK' || view.getUint16(4, true) !== 1) throw new Error('Unsupported asset pack');
+    const count = view.getUint32(8, true);
+    const decoder = new TextDecoder();
+    this.buffer = buffer;
+    this.entries = new Map();
+    let pos = 16;
+    for (let i = 0; i < count; i++) {
+      const offset = view.getUint32(pos, true);
+      const length = view.getUint32(pos + 4, true);
+      const nameLen = view.getUint16(pos + 16, true);
+      const mimeLen = view.getUint8(pos + 18);
+      pos += 20;
+      const name = decoder.decode(new Uint8Array(buffer, pos, nameLen));
+      pos += nameLen;
+      const mime = decoder.decode(new Uint8Array(buffer, pos, mimeLen));
+      pos += mimeLen;
+      this.entries.set(name, { offset, length, mime });
+    }
+  }
+
+  has(path) {
+    return this.entries.has(path);
+  }
+
+  bytes(path) {
+    const e = this.entries.get(path);
+    return e ? new Uint8Array(this.buffer, e.offset, e.length) : null;
+  }
+
+  blob(path) {
+    const e = this.entries.get(path);
+    return e ? new Blob([this.bytes(path)], { type: e.mime }) : null;
+  }
+
+  json(path) {
+    const bytes = this.bytes(path);
+    return bytes ? JSON.parse(new TextDecoder().decode(bytes)) : null;
+  }
+}
+
 export class TextureLoaderEx {
-  constructor() {
+  constructor(pack = null) {
     this.loader = new THREE.TextureLoader();
+    this.pack = pack;
+    this.previews = {};
+    this.ktx2 = {};
+    this.progressive = new Map();
+  }
+
+  async json(url) {
+    return (this.pack && this.pack.json(url)) ||
+      (await fetch(url)
+        .then((r) => (r.ok ? r.json() : null))
+        .catch(() => null));
+  }
+
+  // Placeholders from scripts/build_previews.py, keyed by web path; optional
+  async loadPreviews(url = 'assets/previews.json') {
+    const data = await this.json(url);
+    if (data && data.format === 'rgba4444') {
+      this.previewSize = data.size;
+      this.previews = data.previews || {};
+    }
+  }
+
+  // KTX2 files with their mip chains from scripts/ktx2.py, keyed by the image they
+  // replace; optional
+  async loadKTX2Manifest(url = 'assets/texture-ktx2.json') {
+    const data = await this.json(url);
+    if (data && data.textures) this.ktx2 = data.textures;
+  }
+
+  // The file to load for an image path: its KTX2 when one was built, else the WebP. With a
+  // pack loaded, only a packed KTX2 counts: fetching it on its own would cost a request
+  // and many times the bytes of the WebP already in the pack.
+  resolve(path) {
+    const webp = path.endsWith('.png') ? path.replace(/\.png$/, '.webp') : path;
+    const entry = this.ktx2[webp] || this.ktx2[path];
+    if (!entry || (this.pack && !this.pack.has(entry.path))) return webp;
+    return entry.path;
+  }
+
+  preview(path) {
+    const entry = this.previews[path] || this.previews[path.replace(/\.png$/, '.webp')];
+    return entry ? entry.data : null;
   }
 
   async tryLoadTex(path) {
+    if (path.endsWith('.ktx2')) {
+      try {
+        const bytes = this.pack && this.pack.bytes(path);
+        const buffer = bytes
+          ? bytes.buffer.slice(bytes.byteOffset, bytes.byteOffset + bytes.byteLength)
+          : await fetch(path).then((r) => (r.ok ? r.arrayBuffer() : Promise.reject(new Error(r.status))));
+        return await parseKTX2(buffer);
+      } catch (e) {
+        return null;
+      }
+    }
+    // Packed textures decode from an object URL over the pack's buffer: no request
+    const blob = this.pack && this.pack.blob(path);
+    const url = blob ? URL.createObjectURL(blob) : path;
     try {
       const tex = await new Promise((resolve, reject) => {
         this.loader.load(
-          path,
+          url,
           (t) => resolve(t),
           undefined,
           (err) => reject(err)
@@ -17,16 +131,114 @@ export class TextureLoaderEx {
       return tex;
     } catch (e) {
       return null;
+    } finally {
+      if (blob) URL.revokeObjectURL(url);
     }
   }
 
   async loadTexOrFallback(path, color, label) {
     const webp = path.endsWith('.png') ? path.replace(/\.png$/, '.webp') : path;
-    let tex = await this.tryLoadTex(webp);
+    const best = this.resolve(path);
+    let tex = await this.tryLoadTex(best);
+    if (!tex && best !== webp) tex = await this.tryLoadTex(webp);
     if (!tex) tex = await this.tryLoadTex(path);
     if (tex) return tex;
     return makeFallbackTexture(color, label);
   }
+
+  // Returns at once with the texture's preview (or a fallback) and swaps in the full image
+  // once it has loaded, so startup does not wait on every download. One texture per path;
+  // userData.loaded resolves to whether the full image arrived.
+  loadProgressive(path, color, label, preview = null) {
+    if (this.progressive.has(path)) return this.progressive.get(path);
+    const data = preview || this.preview(path);
+    const tex = data ? previewTexture(data, this.previewSize) : makeFallbackTexture(color, label);
+    tex.userData.path = path;
+    tex.userData.loaded = (async () => {
+      const webp = path.endsWith('.png') ? path.replace(/\.png$/, '.webp') : path;
+      const best = this.resolve(path);
+      const full =
+        (await this.tryLoadTex(best)) ||
+        (best !== webp ? await this.tryLoadTex(webp) : null) ||
+        (webp !== path ? await this.tryLoadTex(path) : null);
+      if (!full) return false;
+      // The GPU storage was allocated at the preview's (or fallback's) size and three
+      // only re-allocates it after dispose(); without this the larger upload is rejected
+      // and the preview stays. Wrapping, repeat and anisotropy live on this object and
+      // carry over to the re-upload.
+      tex.dispose();
+      tex.image = full.image;
+      tex.mipmaps = full.mipmaps;
+      tex.generateMipmaps = full.generateMipmaps;
+      tex.minFilter = full.minFilter;
+      tex.needsUpdate = true;
+      return true;
+    })();
+    this.progressive.set(path, tex);
+    return tex;
+  }
+}
+
+
+// Reads the KTX2 subset scripts/ktx2.py writes: RGBA8, a full mip chain, no or zlib
+// supercompression. Every level becomes ImageData handed to WebGL as-is, so there is
+// no image decode and no mipmap generation at load time. Rows are stored top first
+// like an image, so the default flipY applies unchanged.
+const KTX2_IDENTIFIER = [0xab, 0x4b, 0x54, 0x58, 0x20, 0x32, 0x30, 0xbb, 0x0d, 0x0a, 0x1a, 0x0a];
+
+export async function parseKTX2(buffer) {
+  const view = new DataView(buffer);
+  const id = new Uint8Array(buffer, 0, 12);
+  if (KTX2_IDENTIFIER.some((b, i) => id[i] !== b)) throw new Error('Not a KTX2 file');
+  const vkFormat = view.getUint32(12, true);
+  const width = view.getUint32(20, true);
+  const height = view.getUint32(24, true);
+  const levelCount = view.getUint32(40, true);
+  const scheme = view.getUint32(44, true);
+  // VK_FORMAT_R8G8B8A8_UNORM / _SRGB; supercompression none / zlib
+  if ((vkFormat !== 37 && vkFormat !== 43) || (scheme !== 0 && scheme !== 3)) {
+    throw new Error(`Unsupported KTX2 texture (format ${vkFormat}, supercompression ${scheme})`);
+  }
+  const mipmaps = await Promise.all(
+    Array.from({ length: levelCount }, async (_, i) => {
+      const offset = Number(view.getBigUint64(80 + i * 24, true));
+      const length = Number(view.getBigUint64(88 + i * 24, true));
+      let data = new Uint8ClampedArray(buffer, offset, length);
+      if (scheme === 3) {
+        const stream = new Blob([data]).stream().pipeThrough(new DecompressionStream('deflate'));
+        data = new Uint8ClampedArray(await new Response(stream).arrayBuffer());
+      }
+      return new ImageData(data, Math.max(1, width >> i), Math.max(1, height >> i));
+    })
+  );
+  const tex = new THREE.Texture(mipmaps[0]);
+  tex.mipmaps = mipmaps;
+  tex.generateMipmaps = false;
+  tex.minFilter = THREE.LinearMipmapLinearFilter;
+  tex.needsUpdate = true;
+  return tex;
+}
+
+
+// Decodes one preview: size x size RGBA4444, big-endian nibbles R, G, B, A, top row first.
+// Linear filtering blurs it when stretched over the full sprite.
+export function previewTexture(data, size = 8) {
+  const bytes = Uint8Array.from(atob(data), (c) => c.charCodeAt(0));
+  const pixels = new ImageData(size, size);
+  for (let i = 0; i < size * size; i++) {
+    const hi = bytes[2 * i];
+    const lo = bytes[2 * i + 1];
+    pixels.data[4 * i] = (hi >> 4) * 17;
+    pixels.data[4 * i + 1] = (hi & 15) * 17;
+    pixels.data[4 * i + 2] = (lo >> 4) * 17;
+    pixels.data[4 * i + 3] = (lo & 15) * 17;
+  }
+  const canvas = document.createElement('canvas');
+  canvas.width = canvas.height = size;
+  canvas.getContext('2d').putImageData(pixels, 0, 0);
+  const tex = new THREE.CanvasTexture(canvas);
+  tex.needsUpdate = true;
+  return tex;
 }
 
 
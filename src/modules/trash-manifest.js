@@ -1,10 +1,12 @@
+// Generated by scripts/build_trash_manifest.py from the files under assets/trash.
+// Do not edit by hand; re-run the script after adding or removing sprites.
 export const TRASH_CATEGORIES = [
   {
     key: 'bottles',
     baseSize: 0.7,
     binKey: 'bottles',
     textures: [
-      'assets/trash/bottles/bottles1.webp',
+      { path: 'assets/trash/bottles/bottles1.webp', format: 'webp', width: 1024, height: 1536, bytes: 177706, hash: '0406c887e5d1771c', preview: 'AAAAACNBNoU2hSNBAAAAAAAAAAAUUkefR58jUgAAAAAAABJRer2c35zfer0SQQAAAAACQmm/e99732m/AkIAAAAAA0F6vYvfi996vQNBAAAAABJCnN+M75zvi98SQQAAAAATUYvffO9873vfE0EAAAAAAAA2c1imWKY2gwAAAAA=' },
     ],
   },
   {
@@ -12,11 +14,11 @@ export const TRASH_CATEGORIES = [
     baseSize: 0.6,
     binKey: 'bottles',
     textures: [
-      'assets/trash/cans/cans2.webp',
-      'assets/trash/cans/cans3.webp',
-      'assets/trash/cans/cans4.webp',
-      'assets/trash/cans/cans5.webp',
-      'assets/trash/cans/cans6.webp',
+      { path: 'assets/trash/cans/cans2.webp', format: 'webp', width: 324, height: 447, bytes: 48212, hash: '285ce390a1381abe', preview: 'AAAiIEREZmZmZkREMREAACIhd32Ij3ZvmZ+qr4iOIiIVZ2d/mZ+Zn2VvmJ9njyVnJXgpzyi/Ob85vyi/Kc8leCaHXO9L3zrPOs8q3zvvJogmd2zvre+M73zvve+N7yZ3FFY63zvvXO9c70vvKt8kViIhJnconCiuKK8onCaHERE=' },
+      { path: 'assets/trash/cans/cans3.webp', format: 'webp', width: 333, height: 474, bytes: 56696, hash: '6c203425918ce849', preview: 'AAAAACIgIiMzMyIiAAAAAAAAZVeIjnd/iI+Zn3d8IiEhEYY+mZ+Zn3d/d3+If3UWIRLIH8gfuC+4L7gfyA91GCIS2l/8f9pf2U/ZX+pvdBciIcgf+j/Kb9p/yW/pL2QWiICnHtgPyl/aT6hP1w8yFAAAZBOWGpYdlh6WHYUXAAA=' },
+      { path: 'assets/trash/cans/cans4.webp', format: 'webp', width: 327, height: 458, bytes: 51636, hash: '0e37763498dd8483', preview: 'VVBVVmZqd3yIi2ZpVEMAAEQ2qZ+Yn3d/d3+6r3d/IiGXG6k/mG+Ib4dfmE/KL1QWqRvbH9sf2x/bH9sf2x9lFagaqi+aL3kvmi+JL6ofRBWYGf0f2x/bH8sf2x/8HyIUVBXKH7of2x/KH9sfqB4hEQAAVBOYF5cZqBiHFiIhAAA=' },
+      { path: 'assets/trash/cans/cans5.webp', format: 'webp', width: 330, height: 479, bytes: 51272, hash: '972955ed9907851b', preview: 'AAAiIWVWZmh3eWZnREMAABERd36Zn3d/d3+qr5mfREMyNnV/h4+Hj3Zvdn91f1NXQkWVn4SPhI+Ej4SPhY9jZzI1uL/Kz7i/yr/Kz8m/Y2YhJJWflZ+Gj1ZfhY+Ej2NWIiFjbnR/ZG9kb3R/dH8yMwAAIiFTU1NVU1VTVCIhAAA=' },
+      { path: 'assets/trash/cans/cans6.webp', format: 'webp', width: 314, height: 510, bytes: 46206, hash: '430c9bee4f543103', preview: 'AAAiIVREZVZVVlVUIREAADMziI6Ij3d/iI+qr4iOREI2O2dviI+If2Zvd39XXyUnNjtJT0lPSU9JT0lPSD82Nzc6nJ+sr4yPjI+Lf5ufNjc2OWpvam9qb3t/Wl9aXzU2IyM3PUhPSU9IPzg/Nj0iIgAAiAASEiQkJCQiEggAAAA=' },
     ],
   },
   {
@@ -24,29 +26,29 @@ export const TRASH_CATEGORIES = [
     baseSize: 0.9,
     binKey: 'paper',
     textures: [
-      'assets/trash/newspapers/news1.webp',
-      'assets/trash/newspapers/news2.webp',
-      'assets/trash/newspapers/news3.webp',
-      'assets/trash/newspapers/news4.webp',
-      'assets/trash/newspapers/news5.webp',
-      'assets/trash/newspapers/news6.webp',
-      'assets/trash/newspapers/news7.webp',
-      'assets/trash/newspapers/news8.webp',
+      { path: 'assets/trash/newspapers/news1.webp', format: 'webp', width: 473, height: 501, bytes: 76020, hash: 'e8a80ad0c835cd3d', preview: '/6D/8P/w//D/oGRAyZC7sFVBd2WZiJmKmYyZj2ZlyZBVR6mfiH+pn5mPqZ+qm/+wZmmpn7hvyE+5b6mfu69EQlVWd2+5b8hfqF+qn6qfmYiWYGVcqp+pn6qfqZ+Zj2VX/6BVQ3dvh312andnVVRDMbuwu4BEQf+Au4C7sLuw/7A=' },
+      { path: 'assets/trash/newspapers/news2.webp', format: 'webp', width: 477, height: 498, bytes: 74882, hash: 'b8f42c5e9dbe8e3e', preview: 'mZD6oIiA/6CqoKqgqqCqoLuwMzGIjoiMmYqZiJiGREG7sIh4qY+If6qfmI+qn2VYQzGYfulP2U+pn6mfqp9VWpmIqp+If7qfmZ+6r3dvVURmWJmPqp+6n6qfqp9mWviAQzFmVXZnd2qHfWZuRDH/8MyQyZD/8P+g+qCIgP+gqqA=' },
+      { path: 'assets/trash/newspapers/news3.webp', format: 'webp', width: 463, height: 504, bytes: 71990, hash: '369bde43ebc6d885', preview: 'u7CZkLuwqqCZkLuAyZDMwP/wu4CId6mcqZhVVFMxu7C7sHdkuq+qn7qfup+6nnZkZmS7rqmfuq/IT8hPqp92aIh5u6/Lr6qfup+6n4h/dmdmWZmPmY+7r7qfmH93bWVBVTFlVYd5iH6pj3ZtVUL/sLuwqqCZkJlgVERUQsmQzJA=' },
+      { path: 'assets/trash/newspapers/news4.webp', format: 'webp', width: 486, height: 463, bytes: 78660, hash: 'fd0de02081cfbe4d', preview: 'zJDMkJlgRDOWYLuwmZC7sPuw+7CId6mfmY6qmoh2MyLMkGZTuq+pn5iPmY+6r5iLRDG6ramfuq+qn6mfu69mXGVVuq+7r8u/mY+7r4d/ZlxERYh/mH+qn7uvmI93b2VUREGHaIdtmI+Yf4h/ZliqoLuAqqCqoERCiHV2ZoRAiIA=' },
+      { path: 'assets/trash/newspapers/news5.webp', format: 'webp', width: 471, height: 478, bytes: 59484, hash: '4518044866bbf7c7', preview: 'AAAAAAAAAAD/8ERCAAAAAAAAREJ3ZaqZqp27v2VTAABmV93Pqp+Zn6qfqq+6q//wZmi7r7u/qq+6r6qfy7+HdmZYd3/Mv6qvzL+7v8y/mYxEQWZuqp/Mv7uvqp+Zn5mMAABlVndvqp+qn5mMmIdUQgAA//B2aIh2REIAAAAAAAA=' },
+      { path: 'assets/trash/newspapers/news6.webp', format: 'webp', width: 483, height: 495, bytes: 54246, hash: '93111400fc088aa4', preview: 'AAAAAAAAAABmYAAAAAAAAAAAVVB3Zaqcuq5mUwAAAACIhqquqq+qn6qvqq52YwAAiHzLv7uvu7+qn5mfy752Y2ZnmY/Lv6qvy7/Lv8u/h3gAAGZYmY/Lv7uvmZ93e1VSAAAAAGZoiH93fGZUAAAAAAAAAAAAAEQyAAAAAAAAAAA=' },
+      { path: 'assets/trash/newspapers/news7.webp', format: 'webp', width: 479, height: 480, bytes: 58160, hash: 'ace62637d2714ed0', preview: 'AAAAAAAAAABUQWVTAAAAAFVQVUOZh6qcqp/Lv2VSAABlVt3PmZ+qr6qvu6+qnIiAd2m7r8u/qp/Mv6qfzL+IhWZTiH/Mv6qfu6/Mv7uvmYcAAGZXmZ/Mv7uvmI+If2ZmAABVUGZsiH93fXd4VUMAAAAAAABVUlVUVVAAAAAAAAA=' },
+      { path: 'assets/trash/newspapers/news8.webp', format: 'webp', width: 459, height: 492, bytes: 52474, hash: '52a404e584b94dff', preview: 'AAAAAAAAAAAAAAAAAAAAAAAAAABEQYiGqpuZhwAAAACIdqqbqZ+qr6qfzL+HdQAAiHrdz6qfu7+qn6qfqp5mY4h1qq+7r6qfu7+qr8y/uqwAAIh5u7/Lv93PzL+pn3ZqAABEQHdsu6+Ifnd4VUIAAAAAAABVQnZlREEAAAAAAAA=' },
     ],
   },
   {
     key: 'plastic_bags',
-    baseSize: 1,
+    baseSize: 1.0,
     binKey: 'trash',
     textures: [
-      'assets/trash/plastic_bags/bag1.webp',
-      'assets/trash/plastic_bags/bag2.webp',
-      'assets/trash/plastic_bags/bag3.webp',
-      'assets/trash/plastic_bags/bag4.webp',
-      'assets/trash/plastic_bags/bag5.webp',
-      'assets/trash/plastic_bags/bag6.webp',
-      'assets/trash/plastic_bags/bag7.webp',
-      'assets/trash/plastic_bags/bag8.webp',
+      { path: 'assets/trash/plastic_bags/bag1.webp', format: 'webp', width: 455, height: 507, bytes: 64884, hash: '66c90975ec94b1d1', preview: 'AAAjMliYR3YAACIgRWZEQAAAWIk1bGqtIzFYjGmdV3cAADVVWJ9YnUZ5WJxXh1iIEiFprHvPe79In1mvaa4iISIhaa9qv3vPfN9831mvIiFGdmvPar97z3vPa89rzzRDNFNJr1q/e89rz2vPSJ4AAAAAEiI1ZlmuSJ01ViMzAAA=' },
+      { path: 'assets/trash/plastic_bags/bag2.webp', format: 'webp', width: 441, height: 506, bytes: 62842, hash: 'f544b9e2e3056035', preview: 'AAAAADNCV3ZFYwAAAAAAAAAAIjFpnTVYaatFY1icR3wAACIjaq82Z1maaas0RUd7AAA0U2mvWr9JrmqvR41HdyIher58z1q/Sa9qv3zfV4dXh3zfe89qv3zfWr97v1ibRWV831q/a897z3vPWr81ZoiAR4hIm0eLSa9InUiaIjE=' },
+      { path: 'assets/trash/plastic_bags/bag3.webp', format: 'webp', width: 448, height: 456, bytes: 49358, hash: 'b2fe604f5d535e19', preview: 'AAAAAAAARWU0QgAAAAAAAAAAAABGdmq/NVM0QliJEiEAACMxaa9HiyMyWJxHjSIiAABFZ3vPWa9Yn2muR4wIgAAAar9qv3vPe897z1ibAAAzQmq/a89qv3vPe89qvyIhNFRrz3vPe89qv2vPN3oAAAiAN3lInmq/ar9IjjZmAAA=' },
+      { path: 'assets/trash/plastic_bags/bag4.webp', format: 'webp', width: 459, height: 456, bytes: 59964, hash: '33d1a540f00e3dd4', preview: 'AAA0QliKRWMAAEZ2RmUAAAAAV4g2emmsIzJYnGmrNEMAAGmaNmlpq0eJSJlpqUZ2AABpqlmvaa9av0iear8iMyIhe897z2q/e89832u/WJo0VHvPar9rz3zfar97z1iJAABIm2vPfN97z1qva881ZgAANVNHilieR41InjVmAAA=' },
+      { path: 'assets/trash/plastic_bags/bag5.webp', format: 'webp', width: 459, height: 482, bytes: 55742, hash: 'cc40c03ad1532e18', preview: 'AAAAAAAAAABUIlQiAAAAAAAAZSJVIgAAdiuoOwAAAAAAAIYsqUpVUHYsqE0iEQAAAACGKqg+liqoL8pPqDkAAAAAhynbT7lPyk/KT7lNZSIAAJc4yk/aT8pP20/rX4c2AACXO9pPuU/bT8pPuT91JwAAMxKoPYctuT+4PEMUREA=' },
+      { path: 'assets/trash/plastic_bags/bag6.webp', format: 'webp', width: 423, height: 483, bytes: 60288, hash: 'bce651eb23e70829', preview: 'AAAAAIc1diYAAAAA8AAAAAAAMxG5TXUrAAAiIJg8digAAJg3qD6WLCIRdjWXPYYnAACoSrlPqD+XPblOqD9UJDIS21/KT9tP61/rX9tPdSV2JblP20/bX8pPuU/aT2UjhzbJT7k/61/JT8pPuT4yIQAAMxOGJqg9hiunLYYmAAA=' },
+      { path: 'assets/trash/plastic_bags/bag7.webp', format: 'webp', width: 437, height: 449, bytes: 56944, hash: 'd02bad66135a1241', preview: 'AAAAAGUimDpEEgAAZSMzIQAAIiC5TYYuMxEzEag+dSYAAIY2yk+nL4YsmDqoPzISAACpTNpPuU+5T8pPlz4AAFQiyk65T9pP20/bT5c8AAAzE9pPuU/bT9pPyT/aTzISQxKoLZg/yk/bT7g/lysAAAAAAABlI5crhyiGJkMSAAA=' },
+      { path: 'assets/trash/plastic_bags/bag8.webp', format: 'webp', width: 457, height: 463, bytes: 57940, hash: '760c1cde1d627b9d', preview: 'AAAAAIc2VBIAAIc0ZSMAAAAAZSOoPmUkAACoTHUpAAAAAKhIqD5UFEQTqD6GKQAAAAC5TrlPly6oP8pPlzkAAFQiuT7bT9pPyU/rT5c4AABmJdpP2k/KT8pP2k+XOQAAlzfKT8lP2k/KT8pPmDgAACIAhiaXN7k7qDmGJkQRAAA=' },
     ],
   },
   {
@@ -54,10 +56,10 @@ export const TRASH_CATEGORIES = [
     baseSize: 0.7,
     binKey: 'trash',
     textures: [
-      'assets/trash/coffee_cups/coffee1.webp',
-      'assets/trash/coffee_cups/coffee2.webp',
-      'assets/trash/coffee_cups/coffee3.webp',
-      'assets/trash/coffee_cups/coffee4.webp',
+      { path: 'assets/trash/coffee_cups/coffee1.webp', format: 'webp', width: 410, height: 515, bytes: 46592, hash: '7a8161ab78b074fd', preview: 'AAAzM3doZmqIiXd4MiMAACIliI+Ij8zP3d/Mz7uvIiV3e4iPqp+Zn5mfmZ93f3d8IRSXX4dvh3+Hf4dvh18iFSIhdC+VL5UvlS+VL2MfIRIAAHQtxi/GL8Yvxi90HgAAAABTGpUvlS+VL5QvUxsAAAAAIRJ0GYQrhCtjGSESAAA=' },
+      { path: 'assets/trash/coffee_cups/coffee2.webp', format: 'webp', width: 436, height: 502, bytes: 49230, hash: '752b41adc4f59c52', preview: 'AAAzM2ZpVVuZm4iJMzMAADMzd36Ij8zP3d+7v5mfMzNmZ4iPmZ+pn5mfmZ+If2ZoIiF2T5dvh2+Hf4d/dU8hEgAAZC2FL6Y/pj+EL1MeAAAAAIU6pz/pT+lPlj90KwAAAAAyF4Uvpz+nP3QvQhkAAAAAIRJ0KoQthC10GiISAAA=' },
+      { path: 'assets/trash/coffee_cups/coffee3.webp', format: 'webp', width: 418, height: 517, bytes: 43138, hash: '05dc96919dfe2836', preview: 'AAAiImZmd3h3d0Q1EREAABETiI+qr8zP///d34d8IiF3eoiPmY+Hf3d/mZ93f1VXMzSHf4iPmZ+Zn4d/dm4iIjMwYx+VL4QvhC+EH1IcAAAAAHQsti+2L7YvpR9TGQAAAABjGrYvti+2L6UfMhYAAAAAIRJ0GoQchBxTGSERAAA=' },
+      { path: 'assets/trash/coffee_cups/coffee4.webp', format: 'webp', width: 423, height: 510, bytes: 46288, hash: '1edccb222dc04367', preview: 'AAAREmVXd3iIiGZXERIAACERiI6Yj8zP7u/u76qvERN2aHd/mZ93f3d/iI93f3drMyOHf4iPqZ+pn4iPh39DNgAAZC6VL4QvhC+EH2MfIREAAIY76U/ZT9lP2U+FLgAAAABDGaY/pz+nP6Y/UxsAAAAAIhOEHJQflR+EHUIVAAA=' },
     ],
   },
   {
@@ -65,10 +67,10 @@ export const TRASH_CATEGORIES = [
     baseSize: 0.8,
     binKey: 'trash',
     textures: [
-      'assets/trash/food_wrappers/candy1.webp',
-      'assets/trash/food_wrappers/candy2.webp',
-      'assets/trash/food_wrappers/candy3.webp',
-      'assets/trash/food_wrappers/candy4.webp',
+      { path: 'assets/trash/food_wrappers/candy1.webp', format: 'webp', width: 516, height: 436, bytes: 59100, hash: '35c3877aad14ae9d', preview: 'AAAAAAAAAAAiIDEVQhqAAAAAIiBCFZMqtC5jH2MfEAJyGqMu5D/EP6VPYh9jHzIVgymkP3ZfmH92b3MvUx9TGUIVpC9lT1VPiH+TL2MfUxwhE6QvpU+GX6Q/oy9CGCEVIiCTLrQvoytiFhERAAAAAAAAUhYREQAAAAAAAAAAAAA=' },
+      { path: 'assets/trash/food_wrappers/candy2.webp', format: 'webp', width: 450, height: 530, bytes: 66040, hash: 'bb1f6c5c8ab92880', preview: 'UhOTJ5QolCiUKJQolChSE2QmyD/IP8g/uD/JP8g/ZCaGJ5UvdC9zH4Mvcy+VL4Ynlyi3P5Yvli+WL6cvuD+GJ5co6z/JP8k/2j/JP8k/ZSiXKNo/yT/rP+o/ly+4P2MXdSbaP9o/hi+XL6YvtS9iFlIUlCqUKpQqlCqUKpQqUhQ=' },
+      { path: 'assets/trash/food_wrappers/candy3.webp', format: 'webp', width: 677, height: 397, bytes: 73708, hash: '1494d648775da6a6', preview: 'AABEQAADMiVjRoRIhFlCJFI2tW7Gf/eP54/Wf8Z/YzdzSLVvVC+FX4dviH+Xf3NIc0e0T5MvdV+Hb5d/pm+DSXNHtE+kL4Q/1n/Vf+Z/hFmDRsVvpU+FH7ZP1X/3j5Rag0XWf/ePpV+1b7VtpFpSNTEhMiMRExABAAAAAAAAAAA=' },
+      { path: 'assets/trash/food_wrappers/candy4.webp', format: 'webp', width: 462, height: 313, bytes: 39986, hash: 'fe6e895b0fa39e0f', preview: 'AAAAAAAAAAAAAAAAEREhEgAAAAAAAPAAMhWFGnUadRUAAFUAQxWWHNkvpi+WL7goEAJ1GNkvpi9zH4Mfly+nKpYcpx9SH6Mvgy+WL5YsQxWnGpYfYx+mL8gvlhxDEwAAUxaWHacehhsiFAAAAAAAACICQxP/AAAAAAAAAAAAAAA=' },
     ],
   },
   {
@@ -76,9 +78,9 @@ export const TRASH_CATEGORIES = [
     baseSize: 0.5,
     binKey: 'compost',
     textures: [
-      'assets/trash/fruit_peels/banana.webp',
-      'assets/trash/fruit_peels/lemon.webp',
-      'assets/trash/fruit_peels/orange.webp',
+      { path: 'assets/trash/fruit_peels/banana.webp', format: 'webp', width: 583, height: 767, bytes: 62308, hash: '83c57a9f070ac2a2', preview: 'AAAAAAAAAAAAAAAAAAAAAAAAAAAAAHUpMxUAAAAAAAAAAAAAdiXKL2QkAAAAAIgAAAAAALktyS+XKyIgMhFUFAAAMiHJL6gvqC+XLqgthiUiIZcpqC6oL8ovqCtDEgAAZSaYJ0MVuS1lJKgodihVUAAAAABUJHUjAAAAAAAAAAA=' },
+      { path: 'assets/trash/fruit_peels/lemon.webp', format: 'webp', width: 432, height: 351, bytes: 37118, hash: '6b117307168938c1', preview: 'AAAAAAAA/wAAAAAAQxVDFTIRMyEAAAAAAAAAAGUshyp2KHUrQhEAAAAAMhOWH5crlym4L5cdQxdDF7ceyB+XKmUnyS/6H+kf6R/pH7gvZBcyIYYtyB/qH+kfyB+GLCIRAAAyEXYrhi+GL3UqMhEAAAAAAAAAADIRMiEAAAAAAAA=' },
+      { path: 'assets/trash/fruit_peels/orange.webp', format: 'webp', width: 474, height: 547, bytes: 53494, hash: '3c4a98dc49e8d974', preview: 'AAD/ADITMhUyE1VQAAAAADISlRyVH4UcyC+mHUMTAACFGtcfYxYAAHUZ6C+mHSIRdBqmHzIUVBgyE9gv6C9DFTIRUxmFLHQWQxToL/kvZBcAAAAAAAAyEaYs6S/YLzIUAABkGKYqxy75L+gvhRoAAAAAQhKWKaYrpipkFYgAAAA=' },
     ],
   },
 ];